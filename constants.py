@@ -133,6 +133,15 @@ REGEN_DP_CHAMBER = (
 RUNLINE_OD = 0.75 * IN2M
 RUNLINE_WALL_THICKNESS = 0.065 * IN2M
 
+CEA_EFFICIENCY_FACTOR = 0.9  # [1] Efficiency factor on CEA cstar, applied squared to specific impulse
+CEA_TABLE_FILE = None  # [string] CEA table interpolated by run_CEA relative to the main folder (e.g. "data/cea_tables/cea_tables.npz" from utils/make_cea_file.py, or a legacy CSV such as "new_cea.csv"), None always runs CEA
+CEA_TABLE_FUEL = "ethanol"  # [string] Fuel of CEA_TABLE_FILE when it is a legacy CSV, .npz tables name their own fuels
+CEA_TABLE_METHOD = "linear"  # [string] Interpolation of the CEA table: "linear" or "cubic"
+CEA_DECK_MIX_RATIOS = 15  # [1] Most mixture ratios in one problem of a multi-point CEA deck, the CEA limit
+CEA_DECK_PRESSURE_RATIOS = 10  # [1] Most exit pressure ratios in one problem of a multi-point CEA deck, within the CEA limit on nozzle points
+CEA_WORKERS = None  # [1] Processes solving the unique CEA problems of a sweep before the design loop, None for one per CPU
+CEA_CACHE_FILE = "data/cea_cache.sqlite"  # [string] SQLite file of CEA results kept between runs, relative to the main folder, None disables it
+
 # Propellant Properties
 
 WATER_PERCENTAGE = 0  # [1] Percentage of water in the ethanol & IPA mixtures
@@ -163,6 +172,73 @@ MAX_POWER = 12000  # max pump power [W]
 
 FAR_ALTITUDE = 615.09  # [m] altitude of FAR launch site
 RAIL_HEIGHT = 18.29  # [m] height of the rail
+RAIL_ANGLE = 0 * np.pi / 180  # [rad] rail angle from vertical, tilted downrange, used by the 2-D trajectory model
+WIND_SPEED = 0  # [m/s] wind speed at WIND_REFERENCE_HEIGHT, positive downrange, used by the 2-D trajectory model
+WIND_REFERENCE_HEIGHT = 10  # [m] height above the launch site at which WIND_SPEED is measured
+WIND_SHEAR_EXPONENT = 0  # [1] power law exponent of the wind profile, 0 for constant wind and about 1/7 over open ground
+
+# Trajectory Constants
+
+TRAJECTORY_MODEL = "euler"  # [string] Trajectory model used by main: "euler", "adaptive", "estimate", "surrogate" or "2d"
+TRAJECTORY_CALIBRATION_SAMPLES = 50  # [1] Number of designs flown numerically to calibrate the "estimate" model
+TRAJECTORY_SURROGATE_SAMPLES = 200  # [1] Number of designs flown numerically to fit the "surrogate" model
+TRAJECTORY_SURROGATE_TRAINING_MODEL = "euler"  # [string] Trajectory model that trains the surrogate and flies its fallbacks
+TRAJECTORY_SURROGATE_TOLERANCE = 0.01  # [1] Largest relative standard error of apogee and max acceleration accepted from the surrogate
+TRAJECTORY_TIME_STEP = 0.05  # [s] Time step of the trajectory integrator
+TRAJECTORY_FAST_COAST = True  # [bool] Propagate the coast after burnout in closed form instead of stepping through it, about 4x faster but apogee and max Mach move by up to TRAJECTORY_FAST_COAST_TOLERANCE
+TRAJECTORY_FAST_COAST_TOLERANCE = 1.5e-2  # [1] Largest relative change of apogee and max Mach expected from the closed-form coast at TRAJECTORY_TIME_STEP, the error of the stepped coast, which shrinks with the time step
+TRAJECTORY_JIT = True  # [bool] Fly calculate_trajectory and calculate_trajectory_batch with the numba-compiled kernel when numba is installed and DRAG_MODEL is "reference"
+COAST_LAYER_THICKNESS = 250  # [m] Thickness of the constant-density layers of the closed-form coast
+THRUST_CURVE = None  # [string] Thrust curve of the Euler, 2-D and adaptive trajectory models: None for constant thrust, "blowdown", or a CSV path relative to the main folder
+BLOWDOWN_REGULATED_FRACTION = 0.8  # [1] Fraction of the burn before the "blowdown" thrust curve starts to fall
+BLOWDOWN_FINAL_FRACTION = 0.5  # [1] Thrust at the end of the "blowdown" thrust curve as a fraction of nominal
+HISTORY_DECIMATION = 1  # [1] Integration steps per recorded step of trajectory histories
+HISTORY_CANDIDATES = 0  # [1] Number of highest-apogee rockets whose trajectory histories main saves, 0 disables them
+DRAG_COEFFICIENT = 0.4  # [1] Drag coefficient of the reference vehicle when no drag table is given
+DRAG_TABLE_FILE = None  # [string] Drag coefficient vs Mach CSV (e.g. a RASAero export) relative to the main folder, None uses DRAG_COEFFICIENT
+DRAG_MACH_STEP = 0.01  # [1] Mach spacing the drag table is resampled to
+DRAG_MODEL = "reference"  # [string] Drag model of the numerical trajectory models: "reference" scales the drag table of the reference vehicle by length and diameter, "buildup" sums skin friction, nose, base and fin drag of each design
+DRAG_BUILDUP_MAX_MACH = 5  # [1] Largest Mach number of the component buildup tables, faster flight uses their last point
+NOSECONE_FINENESS = 5  # [1] Nosecone length to diameter ratio assumed by the component buildup, as in structures
+TRAJECTORY_RELATIVE_TOLERANCE = 1e-6  # [1] Relative error tolerance of the adaptive trajectory integrator
+TRAJECTORY_ABSOLUTE_TOLERANCE = 1e-3  # [1] Absolute error tolerance of the adaptive trajectory integrator
+TRAJECTORY_CACHE_SIZE = 100000  # [1] Maximum number of cached trajectories, 0 disables the cache
+TRAJECTORY_CACHE_MASS_TOLERANCE = 0.01  # [kg] Wet mass quantization of the trajectory cache key
+TRAJECTORY_CACHE_MASS_FLOW_TOLERANCE = 0.001  # [kg/s] Mass flow rate quantization of the trajectory cache key
+TRAJECTORY_CACHE_THRUST_TOLERANCE = 1  # [N] Thrust quantization of the trajectory cache key
+TRAJECTORY_CACHE_GEOMETRY_TOLERANCE = 0.001  # [m] Diameter, fin height and length quantization of the trajectory cache key
+TRAJECTORY_CACHE_AREA_TOLERANCE = 1e-6  # [m^2] Exit area quantization of the trajectory cache key
+TRAJECTORY_CACHE_PRESSURE_TOLERANCE = 10  # [Pa] Exit pressure quantization of the trajectory cache key
+TRAJECTORY_CACHE_TIME_TOLERANCE = 0.01  # [s] Burn time quantization of the trajectory cache key
+APOGEE_CORRECTION_FACTOR = 0.651  # [1] Empirical correction applied to the simulated apogee
+
+# Dispersion Constants
+
+DISPERSION_CANDIDATES = 0  # [1] Number of highest-apogee rockets given a Monte Carlo dispersion, 0 disables it
+DISPERSION_SAMPLES = 1000  # [1] Monte Carlo samples per rocket
+DISPERSION_PERCENTILES = [5, 50, 95]  # [%] Percentiles of apogee and rail exit velocity reported
+DISPERSION_THRUST_SIGMA = 0.03  # [1] Standard deviation of the relative thrust error
+DISPERSION_ISP_SIGMA = 0.02  # [1] Standard deviation of the relative specific impulse error
+DISPERSION_DRAG_SIGMA = 0.1  # [1] Standard deviation of the relative drag coefficient error
+DISPERSION_MASS_SIGMA = 0.03  # [1] Standard deviation of the relative dry mass error
+
+# Inverse Sizing Constants
+
+TARGET_APOGEE = None  # [m] Apogee every rocket is sized to reach (e.g. 30000 * FT2M), None uses the inputs as given
+INVERSE_SIZING_VARIABLE = "propellant"  # [string] Quantity solved for to reach TARGET_APOGEE: "propellant" or "thrust"
+INVERSE_MIN_LOAD_FRACTION = 0.2  # [1] Smallest fraction of the COPV-limited propellant load considered
+INVERSE_MIN_THRUST_TO_WEIGHT = 2  # [1] Smallest thrust-to-weight ratio considered
+INVERSE_MAX_THRUST_TO_WEIGHT = 10  # [1] Largest thrust-to-weight ratio considered
+INVERSE_SIZING_TOLERANCE = 1e-3  # [1] Relative apogee error the solved load fraction or thrust-to-weight ratio is accepted at
+
+# Recovery Constants
+
+DROGUE_DIAMETER = 3 * FT2M  # [m] Nominal diameter of the drogue parachute
+DROGUE_DRAG_COEFFICIENT = 1.5  # [1] Drag coefficient of the drogue parachute
+MAIN_DIAMETER = 12 * FT2M  # [m] Nominal diameter of the main parachute
+MAIN_DRAG_COEFFICIENT = 2.2  # [1] Drag coefficient of the main parachute
+MAIN_DEPLOY_HEIGHT = 1500 * FT2M  # [m] Height above the launch site at which the main parachute opens
+RECOVERY_TIME_STEP = 0.5  # [s] Time step of the descent integration
 
 # Components
 
@@ -190,6 +266,11 @@ LIPO_CELL_DISCHARGE_CURRENT = 80  # [A] maximum discharge current of a LiPo cell
 # Misc
 
 GRAVITY = 9.81  # [m/s^2] acceleration due to gravity
+AIR_GAMMA = 1.4  # [1] Ratio of specific heats of air
+AIR_GAS_CONSTANT = 287.05  # [J/kg-K] Specific gas constant of air
+SUTHERLAND_REFERENCE_VISCOSITY = 1.716e-5  # [Pa-s] Viscosity of air at SUTHERLAND_REFERENCE_TEMPERATURE
+SUTHERLAND_REFERENCE_TEMPERATURE = 273.15  # [K] Reference temperature of Sutherland's law
+SUTHERLAND_CONSTANT = 110.4  # [K] Sutherland constant of air
 
 # Assumptions
 
@@ -198,3 +279,5 @@ MASS_GROWTH_FACTOR = 1  # [1] iteration growth factor [NEED TO DISCUSS]
 # Fins
 
 FIN_THICKNESS = 0.16 * IN2M  # not sure if this is valid, should discuss further [m]
+FIN_ROOT_CHORD = 0.5  # [m] Fin root chord of the trajectory models when a design does not give one
+FIN_TIP_CHORD = 0.075  # [m] Fin tip chord of the trajectory models when a design does not give one
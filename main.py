@@ -37,10 +37,11 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 import constants as c
 from scripts import (
+    apogee_sizing,
     avionics,
-    fluidsystems,
     structures,
     propulsion,
+    recovery,
     vehicle,
     trajectory,
     CoM,
@@ -90,23 +91,6 @@ def main():
     # This section creates a dataframe to store the results of the rocket analysis
     # Owner: Nick Nielsen
 
-    CEA_DATA = pd.read_csv("new_cea.csv")
-    ATMOSPHERE_DATA = pd.read_csv("atmosphere.csv")
-
-    CEA_CHAMBER_PRESSURES = CEA_DATA.iloc[:, 0].values
-    CEA_EXIT_PRESSURES = CEA_DATA.iloc[:, 1].values
-    CEA_MIXTURE_RATIOS = CEA_DATA.iloc[:, 2].values
-
-    trajectoryDF = pd.DataFrame(
-        columns=[
-            "Altitude [ft]",
-            "Total Impulse [lbm-s]",
-            "Max Acceleration [g]",
-            "Rail Exit Velocity [ft/s]",
-            "Rail Exit Acceleration [g]",
-        ]
-    )
-
     fluidsystemsDF = pd.DataFrame(
         columns=[
             "Fluid Systems Mass [lbm]",
@@ -191,6 +175,8 @@ def main():
             "Pumpfed Max Acceleration [g]",
             "Pumpfed Rail Exit Velocity [ft/s]",
             "Pumpfed Rail Exit Acceleration [g]",
+            "Pumpfed Max Dynamic Pressure [psi]",
+            "Pumpfed Max Mach [-]",
             "Pumpfed Chamber Pressure [psi]",
             "Pumpfed C* [m/s]",
             "Pumpfed Isp [s]",
@@ -253,16 +239,24 @@ def main():
     bar = pb.ProgressBar(maxval=numberPossibleRockets, widgets=widgets)
     # Create a progress bar with the number of possible rockets as the max value
 
+    # CEA Prepass
+    # Solves each unique combustion problem of the sweep once, pressure-fed and pumpfed, for the loop to look up
+    ceaConditions = []
+    for pressureColumn in ["Chamber pressure (psi)", "Pumpfed Chamber Pressure (psi)"]:
+        ceaConditions += zip(
+            possibleRocketsDF[pressureColumn] * c.PSI2PA,
+            possibleRocketsDF["Exit pressure (psi)"] * c.PSI2PA,
+            propCombos.loc[possibleRocketsDF["Propellant combination"], "Fuel"],
+            possibleRocketsDF["Core O:F Ratio (mass)"],
+        )
+    ceaResults = propulsion.run_CEA_sweep(ceaConditions, c.CEA_WORKERS)
+
     bar.start()  # Start the progress bar
 
-    for idx, rocket in possibleRocketsDF.iterrows():
+    trajectoryInputs = []  # Trajectory inputs of every rocket within limits
+    pumpfedTrajectoryInputs = []  # Trajectory inputs of every pumpfed rocket
 
-        # Mass Estimation & Initialization
-        vehicleMassEstimate = 300  # [lbs] Estimate of the vehicle mass
-        vehicleMassEstimate = (
-            vehicleMassEstimate * c.LB2KG
-        )  # [kg] Convert the vehicle mass to kilograms
-        vehicleMass = -np.inf  # [kg] Initialize the vehicle mass
+    for idx, rocket in possibleRocketsDF.iterrows():
 
         # Continous Inputs
         chamberPressure = rocket[
@@ -334,7 +328,81 @@ def main():
         # Avionics
         avionicsMass = avionics.calculate_avionics()
 
-        # Fluid Systems
+        # Combustion
+        [
+            cstar,
+            specificImpulse,
+            expansionRatio,
+            fuelTemp,
+            oxTemp,
+            characteristicLength,
+        ] = ceaResults[(chamberPressure, exitPressure, fuel, mixRatio)]
+
+        # Inverse Sizing
+        # Solves for the propellant load or thrust that reaches the target apogee instead of using the inputs as given
+        loadFraction = 1  # [1] Fraction of the COPV-limited propellant load carried
+        if c.TARGET_APOGEE is not None:
+            [loadFraction, thrustToWeight, _] = apogee_sizing.size_for_apogee(
+                c.TARGET_APOGEE,
+                c.INVERSE_SIZING_VARIABLE,
+                thrustToWeight,
+                oxidizer,
+                fuel,
+                mixRatio,
+                chamberPressure,
+                exitPressure,
+                cstar,
+                specificImpulse,
+                expansionRatio,
+                characteristicLength,
+                copvPressure,
+                copvVolume,
+                copvMass,
+                copvLength,
+                tankOD,
+                tankThickness,
+                finNumber,
+                finHeight,
+                finTipChord,
+                finRootChord,
+                avionicsMass,
+            )
+            if np.isnan(loadFraction):
+                possibleRocketsDF.drop(
+                    idx, inplace=True
+                )  # Drop the rocket if it cannot reach the target apogee
+                continue
+
+        # Fluid Systems, Structures, Propulsion, Mass & Length
+        [
+            fluidsystemsResults,
+            structuresResults,
+            propulsionResults,
+            massResults,
+            totalLength,
+        ] = vehicle.size_vehicle(
+            thrustToWeight,
+            oxidizer,
+            fuel,
+            mixRatio,
+            chamberPressure,
+            exitPressure,
+            cstar,
+            specificImpulse,
+            expansionRatio,
+            characteristicLength,
+            copvPressure,
+            loadFraction * copvVolume,
+            copvMass,
+            copvLength,
+            tankOD,
+            tankThickness,
+            finNumber,
+            finHeight,
+            finTipChord,
+            finRootChord,
+            avionicsMass,
+        )
         [
             fluidsystemsMass,
             oxTankPressure,
@@ -352,34 +420,7 @@ def main():
             oxTankMass,
             fuelTankLength,
             fuelTankMass,
-        ] = fluidsystems.fluids_sizing(
-            oxidizer,
-            fuel,
-            mixRatio,
-            chamberPressure,
-            copvPressure,
-            copvVolume,
-            copvMass,
-            tankOD,
-            tankThickness,
-        )
-
-        # Combustion
-        [
-            cstar,
-            specificImpulse,
-            expansionRatio,
-            fuelTemp,
-            oxTemp,
-            characteristicLength,
-        ] = propulsion.run_CEA(
-            chamberPressure,
-            exitPressure,
-            fuel,
-            mixRatio,
-        )
-
-        # Structures
+        ] = fluidsystemsResults
         [
             lowerAirframeLength,
             lowerAirframeMass,
@@ -392,81 +433,26 @@ def main():
             noseconeLength,
             noseconeMass,
             structuresMass,
-        ] = structures.calculate_structures(
-            lowerPlumbingLength,
-            upperPlumbingLength,
-            copvLength,
-            tankOD,
-            finNumber,
-            finHeight,
-            finTipChord,
-            finRootChord,
-        )
-
-        while abs(vehicleMassEstimate - vehicleMass) > c.CONVERGE_TOLERANCE:
-            
-            vehicleMass = vehicleMassEstimate
-            [
-                idealThrust,
-                seaLevelThrust,
-                oxMassFlowRate,
-                fuelMassFlowRate,
-                burnTime,
-                thrustChamberLength,
-                combustionChamberLength,
-                convergeLength,
-                divergeLength,
-                chamberOD,
-                contractionRatio,
-                chamberMass,
-                injectorMass,
-                totalPropulsionMass,
-                totalMassFlowRate,
-                exitArea,
-            ] = propulsion.calculate_propulsion(
-                thrustToWeight,
-                vehicleMass,
-                chamberPressure,
-                exitPressure,
-                cstar,
-                specificImpulse,
-                expansionRatio,
-                characteristicLength,
-                mixRatio,
-                oxPropMass,
-                fuelPropMass,
-                tankOD,
-            )
-
-            [
-                vehicleDryMassEstimate,
-                vehicleMassEstimate,
-                vehicleMassRatioEstimate,
-            ] = vehicle.calculate_mass(
-                avionicsMass,
-                fluidsystemsMass,
-                oxPropMass,
-                fuelPropMass,
-                totalPropulsionMass,
-                structuresMass,
-            )
-
-        totalDryMass = vehicleDryMassEstimate
-        totalWetMass = vehicleMassEstimate
-        MassRatio = vehicleMassRatioEstimate
-
-        ## Mass
-
-        ## Length
-        [totalLength] = vehicle.calculate_length(
-            noseconeLength,
-            copvLength,
-            recoveryBayLength,
-            upperAirframeLength,
-            totalTankLength,
-            lowerAirframeLength,
+        ] = structuresResults
+        [
+            idealThrust,
+            seaLevelThrust,
+            oxMassFlowRate,
+            fuelMassFlowRate,
+            burnTime,
             thrustChamberLength,
-        )
+            combustionChamberLength,
+            convergeLength,
+            divergeLength,
+            chamberOD,
+            contractionRatio,
+            chamberMass,
+            injectorMass,
+            totalPropulsionMass,
+            totalMassFlowRate,
+            exitArea,
+        ] = propulsionResults
+        [totalDryMass, totalWetMass, MassRatio] = massResults
 
         isWithinLimits = vehicle.check_limits(
             maxThrustLim,
@@ -492,8 +478,9 @@ def main():
                 continue  # Skip the rest of the loop if the rocket is not within limits
 
         # Trajectory
-        [altitude, maxAccel, railExitVelo, railExitAccel, totalImpulse] = (
-            trajectory.calculate_trajectory(
+        # Flown for every rocket at once with the batched trajectory engine after the loop
+        trajectoryInputs.append(
+            [
                 totalWetMass,
                 totalMassFlowRate,
                 idealThrust,
@@ -504,20 +491,9 @@ def main():
                 exitPressure,
                 burnTime,
                 totalLength,
-                ATMOSPHERE_DATA,
-                plots=0,
-            )
-        )
-
-        trajectoryDF = trajectoryDF._append(
-            {
-                "Altitude [ft]": altitude * c.M2FT,
-                "Total Impulse [lbm-s]": totalImpulse * c.N2LBF,
-                "Max Acceleration [g]": maxAccel / c.GRAVITY,
-                "Rail Exit Velocity [ft/s]": railExitVelo * c.M2FT,
-                "Rail Exit Acceleration [g]": railExitAccel / c.GRAVITY,
-            },
-            ignore_index=True,
+                finRootChord,
+                finTipChord,
+            ]
         )
 
         fluidsystemsDF = fluidsystemsDF._append(
@@ -619,9 +595,9 @@ def main():
             fuelTemp,
             oxTemp,
             pumpfedCharacteristicLength,
-        ] = propulsion.run_CEA(pumpfedChamberPressure, exitPressure, fuel, mixRatio)
+        ] = ceaResults[(pumpfedChamberPressure, exitPressure, fuel, mixRatio)]
 
-        pumpfedVehicleMassEstimate = vehicleMass
+        pumpfedVehicleMassEstimate = totalWetMass
         pumpfedVehicleMass = -np.inf
 
         while (
@@ -827,34 +803,25 @@ def main():
             tankOD,
         )
 
-        [
-            pumpfedAltitude,
-            pumpfedMaxAccel,
-            pumpfedRailExitVelo,
-            pumpfedRailExitAccel,
-            pumpfedTotalImpulse,
-        ] = trajectory.calculate_trajectory(
-            pumpfedTotalWetMass,
-            pumpfedTotalMassFlowRate,
-            pumpfedJetThrust,
-            tankOD,
-            finNumber,
-            finHeight,
-            pumpfedExitArea,
-            exitPressure,
-            pumpfedBurnTime,
-            pumpfedTotalLength,
-            ATMOSPHERE_DATA,
-            plots=0,
+        pumpfedTrajectoryInputs.append(
+            [
+                pumpfedTotalWetMass,
+                pumpfedTotalMassFlowRate,
+                pumpfedJetThrust,
+                tankOD,
+                finNumber,
+                finHeight,
+                pumpfedExitArea,
+                exitPressure,
+                pumpfedBurnTime,
+                pumpfedTotalLength,
+                finRootChord,
+                finTipChord,
+            ]
         )
 
         pumpfedDF = pumpfedDF._append(
             {
-                "Pumpfed Altitude [ft]": pumpfedAltitude * c.M2FT,
-                "Pumpfed Total Impulse [lbm-s]": pumpfedTotalImpulse * c.N2LBF,
-                "Pumpfed Max Acceleration [g]": pumpfedMaxAccel / c.GRAVITY,
-                "Pumpfed Rail Exit Velocity [ft/s]": pumpfedRailExitVelo * c.M2FT,
-                "Pumpfed Rail Exit Acceleration [g]": pumpfedRailExitAccel / c.GRAVITY,
                 "Pumpfed Chamber Pressure [psi]": pumpfedChamberPressure * c.PA2PSI,
                 "Pumpfed C* [m/s]": pumpfedCstar,
                 "Pumpfed Isp [s]": pumpfedSpecificImpulse,
@@ -921,6 +888,102 @@ def main():
         number = idx.split("#")[1]  # Get the number of the rocket
         bar.update(int(number))  # Update the progress bar
 
+    # Trajectory
+    # This section flies every rocket at once with the trajectory model selected in constants.py
+
+    [
+        altitude,
+        maxAccel,
+        railExitVelo,
+        railExitAccel,
+        totalImpulse,
+        maxDynamicPressure,
+        maxMach,
+    ] = trajectory.calculate_trajectories(trajectoryInputs)
+
+    trajectoryDF = pd.DataFrame(
+        {
+            "Altitude [ft]": altitude * c.M2FT,
+            "Total Impulse [lbm-s]": totalImpulse * c.N2LBF,
+            "Max Acceleration [g]": maxAccel / c.GRAVITY,
+            "Rail Exit Velocity [ft/s]": railExitVelo * c.M2FT,
+            "Rail Exit Acceleration [g]": railExitAccel / c.GRAVITY,
+            "Max Dynamic Pressure [psi]": maxDynamicPressure * c.PA2PSI,
+            "Max Mach [-]": maxMach,
+        }
+    )
+
+    # Dispersion
+    # Monte Carlo apogee and rail exit velocity spread of the highest-apogee rockets, left empty for the rest
+    candidates = np.argsort(altitude)[::-1][: c.DISPERSION_CANDIDATES]
+    if len(candidates) > 0:
+        [altitudePercentiles, exitVeloPercentiles] = trajectory.calculate_dispersions(
+            np.asarray(trajectoryInputs)[candidates]
+        )
+        for i, percentile in enumerate(c.DISPERSION_PERCENTILES):
+            trajectoryDF[f"Altitude P{percentile} [ft]"] = np.nan
+            trajectoryDF.loc[candidates, f"Altitude P{percentile} [ft]"] = (
+                altitudePercentiles[:, i] * c.M2FT
+            )
+            trajectoryDF[f"Rail Exit Velocity P{percentile} [ft/s]"] = np.nan
+            trajectoryDF.loc[candidates, f"Rail Exit Velocity P{percentile} [ft/s]"] = (
+                exitVeloPercentiles[:, i] * c.M2FT
+            )
+
+    # Recovery
+    # Descent of every rocket from apogee under the drogue and main parachutes
+    [
+        landingVelocity,
+        mainDeployVelocity,
+        descentTime,
+        driftRadius,
+    ] = recovery.calculate_descent_batch(
+        altitude,
+        [inputs[0] - inputs[1] * inputs[8] for inputs in trajectoryInputs],
+    )
+    trajectoryDF["Main Deploy Velocity [ft/s]"] = mainDeployVelocity * c.M2FT
+    trajectoryDF["Landing Velocity [ft/s]"] = landingVelocity * c.M2FT
+    trajectoryDF["Descent Time [s]"] = descentTime
+    trajectoryDF["Drift Radius [ft]"] = driftRadius * c.M2FT
+
+    # Histories
+    # Full time histories of the highest-apogee rockets, streamed to .npy files in the output folder
+    historyFolder = os.path.join("data/outputs", folderName, "histories")
+    for candidate in np.argsort(altitude)[::-1][: c.HISTORY_CANDIDATES]:
+        os.makedirs(historyFolder, exist_ok=True)
+        candidateInputs = trajectoryInputs[candidate]
+        history = trajectory.allocate_history(
+            *[candidateInputs[i] for i in (0, 1, 2, 6, 7, 8)],
+            fileName=os.path.join(historyFolder, f"rocket_{candidate}.npy"),
+        )
+        trajectory.calculate_trajectory(
+            *candidateInputs[:10],
+            0,
+            history,
+            finRootChord=candidateInputs[10],
+            finTipChord=candidateInputs[11],
+        )
+
+    [
+        pumpfedAltitude,
+        pumpfedMaxAccel,
+        pumpfedRailExitVelo,
+        pumpfedRailExitAccel,
+        pumpfedTotalImpulse,
+        pumpfedMaxDynamicPressure,
+        pumpfedMaxMach,
+    ] = trajectory.calculate_trajectories(pumpfedTrajectoryInputs)
+
+    pumpfedDF["Pumpfed Altitude [ft]"] = pumpfedAltitude * c.M2FT
+    pumpfedDF["Pumpfed Total Impulse [lbm-s]"] = pumpfedTotalImpulse * c.N2LBF
+    pumpfedDF["Pumpfed Max Acceleration [g]"] = pumpfedMaxAccel / c.GRAVITY
+    pumpfedDF["Pumpfed Rail Exit Velocity [ft/s]"] = pumpfedRailExitVelo * c.M2FT
+    pumpfedDF["Pumpfed Rail Exit Acceleration [g]"] = pumpfedRailExitAccel / c.GRAVITY
+    pumpfedDF["Pumpfed Max Dynamic Pressure [psi]"] = (
+        pumpfedMaxDynamicPressure * c.PA2PSI
+    )
+    pumpfedDF["Pumpfed Max Mach [-]"] = pumpfedMaxMach
+
     results_file.create_results_file(
         folderName,
         fluidsystemsDF.round(c.OUTPUT_PRECISION),
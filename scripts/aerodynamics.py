@@ -0,0 +1,408 @@
+# Rocket 4 Aerodynamics Script
+# Description: Loads a drag coefficient vs Mach curve once, resamples it onto a uniform Mach grid and provides O(1)
+# linearly interpolated lookups for scalar Mach numbers and arrays of Mach numbers.
+# The curve is read from c.DRAG_TABLE_FILE, e.g. a RASAero aerodynamic export with "Mach", "Alpha", "CD Power-Off"
+# and "CD Power-On" columns, or any CSV with "Mach" and "CD" columns. Without a table, the drag coefficient is the
+# constant c.DRAG_COEFFICIENT. The curve is for the reference vehicle that the trajectory models scale by length and
+# diameter.
+# With c.DRAG_MODEL = "buildup", drag is instead summed from components: turbulent skin friction of the body and fins
+# from the Reynolds number, nosecone pressure drag, base drag and fin leading and trailing edge drag. The Mach-dependent
+# parts are tabulated once on the same uniform Mach grid, and the geometry of each design is reduced to a few areas by
+# calculate_drag_geometry, so a step costs one Mach lookup, one viscosity lookup and two logarithms.
+
+import math
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import constants as c
+from scripts import atmosphere
+
+
+def load_drag_table(dragTableFile):
+    """
+    Reads a drag table and resamples it onto a uniform Mach grid starting at Mach 0.
+
+    Parameters
+    ----------
+    dragTableFile : str or None
+        Path to the drag table, relative to the main folder. None gives a constant drag coefficient.
+
+    Returns
+    -------
+    powerOffCoefficients : numpy.ndarray
+        Drag coefficient with the engine off at each grid Mach number [-].
+    powerOnCoefficients : numpy.ndarray
+        Drag coefficient with the engine on at each grid Mach number [-].
+    """
+
+    if dragTableFile is None:
+        constant = np.full(2, float(c.DRAG_COEFFICIENT))
+        return [constant, constant.copy()]
+
+    table = pd.read_csv(
+        os.path.join(os.path.dirname(__file__), "..", dragTableFile),
+        skipinitialspace=True,
+    )
+    if "Alpha" in table.columns:
+        table = table[table["Alpha"] == table["Alpha"].min()]  # Zero angle of attack
+    table = table.sort_values("Mach")
+
+    if "CD Power-Off" in table.columns:
+        powerOff = table["CD Power-Off"].to_numpy(dtype=float)
+        powerOn = table["CD Power-On"].to_numpy(dtype=float)
+    else:
+        powerOff = powerOn = table["CD"].to_numpy(dtype=float)
+
+    machs = table["Mach"].to_numpy(dtype=float)
+    machGrid = np.arange(0, machs[-1] + c.DRAG_MACH_STEP, c.DRAG_MACH_STEP)
+
+    return [
+        np.ascontiguousarray(np.interp(machGrid, machs, powerOff)),
+        np.ascontiguousarray(np.interp(machGrid, machs, powerOn)),
+    ]
+
+
+POWER_OFF_COEFFICIENTS, POWER_ON_COEFFICIENTS = load_drag_table(
+    c.DRAG_TABLE_FILE
+)  # [1] Drag coefficients on the uniform Mach grid
+LAST_INDEX = len(POWER_OFF_COEFFICIENTS) - 1  # [1] Index of the last grid point
+
+
+def get_drag_coefficient(mach, burning):
+    """
+    Linearly interpolates the drag coefficient at a single Mach number.
+    Mach numbers beyond the table use its last point.
+
+    Parameters
+    ----------
+    mach : float
+        Mach number [-].
+    burning : bool
+        Use the power-on curve instead of the power-off curve.
+
+    Returns
+    -------
+    dragCoefficient : float
+        Drag coefficient of the reference vehicle [-].
+    """
+
+    coefficients = POWER_ON_COEFFICIENTS if burning else POWER_OFF_COEFFICIENTS
+
+    position = abs(mach) / c.DRAG_MACH_STEP
+    if position >= LAST_INDEX:
+        return float(coefficients[LAST_INDEX])
+
+    index = int(position)
+    fraction = position - index
+    return float(
+        coefficients[index] + fraction * (coefficients[index + 1] - coefficients[index])
+    )
+
+
+def get_drag_coefficient_array(machs, burning):
+    """
+    Vectorized version of get_drag_coefficient for an array of Mach numbers.
+
+    Parameters
+    ----------
+    machs : array_like
+        Mach numbers [-].
+    burning : array_like
+        Use the power-on curve instead of the power-off curve, per Mach number or for all of them.
+
+    Returns
+    -------
+    dragCoefficients : numpy.ndarray
+        Drag coefficients of the reference vehicle [-].
+    """
+
+    position = np.minimum(np.abs(np.asarray(machs, dtype=float)) / c.DRAG_MACH_STEP, LAST_INDEX)
+    index = np.minimum(position.astype(np.intp), LAST_INDEX - 1)
+    fraction = position - index
+
+    powerOff = POWER_OFF_COEFFICIENTS[index] + fraction * (
+        POWER_OFF_COEFFICIENTS[index + 1] - POWER_OFF_COEFFICIENTS[index]
+    )
+    powerOn = POWER_ON_COEFFICIENTS[index] + fraction * (
+        POWER_ON_COEFFICIENTS[index + 1] - POWER_ON_COEFFICIENTS[index]
+    )
+
+    return np.where(burning, powerOn, powerOff)
+
+
+def build_buildup_tables(maxMach):
+    """
+    Tabulates the Mach-dependent factors of the component buildup on the uniform Mach grid.
+
+    Parameters
+    ----------
+    maxMach : float
+        Largest Mach number of the tables [-].
+
+    Returns
+    -------
+    frictionFactors : numpy.ndarray
+        Compressibility correction of the turbulent skin friction coefficient (Raymer) [-].
+    noseCoefficients : numpy.ndarray
+        Pressure drag coefficient of a tangent ogive nosecone of fineness c.NOSECONE_FINENESS, based on its base
+        area. Zero below Mach 0.8, Hoerner's cone wave drag scaled to an ogive above Mach 1.2, and a linear rise
+        in between [-].
+    baseCoefficients : numpy.ndarray
+        Base drag coefficient of a blunt base, based on the base area [-].
+    finCoefficients : numpy.ndarray
+        Drag coefficient of rounded fin leading edges plus blunt trailing edges, based on the fin frontal area [-].
+    """
+
+    machs = np.arange(0, maxMach + c.DRAG_MACH_STEP, c.DRAG_MACH_STEP)
+    supersonicMachs = np.maximum(machs, 1)
+
+    frictionFactors = (1 + 0.144 * machs**2) ** -0.65
+
+    sinAngle = math.sin(math.atan(1 / (2 * c.NOSECONE_FINENESS)))  # [1] sine of the equivalent cone half angle
+    waveMachs = np.maximum(machs, 1.2)
+    noseCoefficients = (
+        0.7
+        * (2.1 * sinAngle**2 + 0.5 * sinAngle / np.sqrt(waveMachs**2 - 1))
+        * np.clip((machs - 0.8) / 0.4, 0, 1)
+    )
+
+    baseCoefficients = np.where(machs < 1, 0.12 + 0.13 * machs**2, 0.25 / supersonicMachs)
+
+    leadingEdgeCoefficients = np.where(
+        machs < 0.9,
+        (1 - np.minimum(machs, 0.9) ** 2) ** -0.417 - 1,
+        np.where(
+            machs < 1,
+            1 - 1.785 * (machs - 0.9),
+            1.214 - 0.502 / supersonicMachs**2 + 0.1095 / supersonicMachs**4,
+        ),
+    )
+    finCoefficients = leadingEdgeCoefficients + baseCoefficients
+
+    return [
+        np.ascontiguousarray(frictionFactors),
+        np.ascontiguousarray(noseCoefficients),
+        np.ascontiguousarray(baseCoefficients),
+        np.ascontiguousarray(finCoefficients),
+    ]
+
+
+FRICTION_FACTORS, NOSE_COEFFICIENTS, BASE_COEFFICIENTS, FIN_COEFFICIENTS = build_buildup_tables(
+    c.DRAG_BUILDUP_MAX_MACH
+)  # [1] Component buildup factors on the uniform Mach grid
+BUILDUP_LAST_INDEX = len(FRICTION_FACTORS) - 1  # [1] Index of the last buildup grid point
+
+
+def calculate_drag_geometry(
+    tankOD, finNumber, finHeight, totalLength, finRootChord, finTipChord, exitArea, dragMultiplier=1
+):
+    """
+    Reduces the geometry of a design to the areas the drag model multiplies at every step. Works on floats or on
+    arrays of designs.
+
+    Parameters
+    ----------
+    tankOD : array_like
+        Outer diameter of the tank [m].
+    finNumber : array_like
+        Number of fins [-].
+    finHeight : array_like
+        Fin semi-span [m].
+    totalLength : array_like
+        Total length of the rocket [m].
+    finRootChord : array_like
+        Fin root chord [m].
+    finTipChord : array_like
+        Fin tip chord [m].
+    exitArea : array_like
+        Exit area of the nozzle, which fills part of the base while the engine burns [m^2].
+    dragMultiplier : array_like, optional
+        Factor applied to the drag of the design, used for dispersions [-].
+
+    Returns
+    -------
+    dragGeometry : list
+        With c.DRAG_MODEL = "reference", [dragScale]: the drag area per unit drag coefficient of the reference
+        vehicle [m^2]. With "buildup", [totalLength [m], finChord [m] (mean fin chord), bodyFrictionArea [m^2]
+        and finFrictionArea [m^2] (form factor times wetted area), noseArea [m^2], finFrontalArea [m^2],
+        baseArea [m^2] and burningBaseArea [m^2] (base area outside the nozzle exit)].
+    """
+
+    bodyArea = np.pi * tankOD**2 / 4  # [m^2] cross-sectional area of the airframe
+
+    if c.DRAG_MODEL == "reference":
+        referenceArea = bodyArea + finNumber * finHeight * c.FIN_THICKNESS  # [m^2] reference area of the rocket
+        return [(totalLength / 6.35) * (tankOD / 0.203) * referenceArea * dragMultiplier]
+    if c.DRAG_MODEL != "buildup":
+        raise ValueError(f"Unknown drag model: {c.DRAG_MODEL}")
+
+    # Body: cylinder plus a conical estimate of the nosecone surface, with Hoerner's body form factor
+    noseLength = c.NOSECONE_FINENESS * tankOD  # [m]
+    wettedBodyArea = np.pi * tankOD * (totalLength - noseLength) + np.pi * tankOD / 2 * np.sqrt(
+        noseLength**2 + tankOD**2 / 4
+    )  # [m^2]
+    fineness = totalLength / tankOD  # [1]
+    bodyFormFactor = 1 + 60 / fineness**3 + 0.0025 * fineness  # [1]
+
+    # Fins: both faces of a trapezoidal planform, with a thin airfoil form factor
+    finChord = (finRootChord + finTipChord) / 2  # [m]
+    wettedFinArea = 2 * finNumber * finHeight * finChord  # [m^2]
+    finFormFactor = 1 + 2 * c.FIN_THICKNESS / finChord  # [1]
+
+    # Drag is linear in the areas, so the multiplier scales them and leaves the Reynolds lengths alone
+    return [
+        totalLength,
+        finChord,
+        bodyFormFactor * wettedBodyArea * dragMultiplier,
+        finFormFactor * wettedFinArea * dragMultiplier,
+        bodyArea * dragMultiplier,
+        finNumber * finHeight * c.FIN_THICKNESS * dragMultiplier,
+        bodyArea * dragMultiplier,
+        np.maximum(bodyArea - exitArea, 0) * dragMultiplier,
+    ]
+
+
+def calculate_friction_coefficient(reynoldsNumber):
+    """
+    Turbulent flat plate skin friction coefficient (Raymer), with the Reynolds number held at 1e4 or more so the
+    launch rail does not divide by zero.
+
+    Parameters
+    ----------
+    reynoldsNumber : float
+        Reynolds number based on the running length [-].
+
+    Returns
+    -------
+    frictionCoefficient : float
+        Incompressible skin friction coefficient [-].
+    """
+
+    return 0.455 / math.log10(max(reynoldsNumber, 1e4)) ** 2.58
+
+
+def get_drag_area(mach, speed, altitude, density, burning, dragGeometry):
+    """
+    Drag coefficient times reference area at a single flight condition.
+
+    Parameters
+    ----------
+    mach : float
+        Mach number [-].
+    speed : float
+        Airspeed [m/s].
+    altitude : float
+        Geometric altitude above sea level, for the viscosity [m].
+    density : float
+        Air density [kg/m^3].
+    burning : bool
+        The engine is on.
+    dragGeometry : list
+        Geometry of the design from calculate_drag_geometry with the same c.DRAG_MODEL.
+
+    Returns
+    -------
+    dragArea : float
+        Drag area, so drag is dynamic pressure times drag area [m^2].
+    """
+
+    if c.DRAG_MODEL == "reference":
+        return get_drag_coefficient(mach, burning) * dragGeometry[0]
+
+    (
+        totalLength,
+        finChord,
+        bodyFrictionArea,
+        finFrictionArea,
+        noseArea,
+        finFrontalArea,
+        baseArea,
+        burningBaseArea,
+    ) = dragGeometry
+
+    position = min(abs(mach) / c.DRAG_MACH_STEP, BUILDUP_LAST_INDEX)
+    index = min(int(position), BUILDUP_LAST_INDEX - 1)
+    fraction = position - index
+
+    def lookup(table):
+        return table[index] + fraction * (table[index + 1] - table[index])
+
+    unitReynolds = density * abs(speed) / atmosphere.get_viscosity(altitude)  # [1/m]
+    friction = lookup(FRICTION_FACTORS) * (
+        calculate_friction_coefficient(unitReynolds * totalLength) * bodyFrictionArea
+        + calculate_friction_coefficient(unitReynolds * finChord) * finFrictionArea
+    )
+
+    return float(
+        friction
+        + lookup(NOSE_COEFFICIENTS) * noseArea
+        + lookup(FIN_COEFFICIENTS) * finFrontalArea
+        + lookup(BASE_COEFFICIENTS) * (burningBaseArea if burning else baseArea)
+    )
+
+
+def get_drag_area_array(machs, speeds, altitudes, densities, burning, dragGeometry):
+    """
+    Vectorized version of get_drag_area for arrays of flight conditions and designs.
+
+    Parameters
+    ----------
+    machs : array_like
+        Mach numbers [-].
+    speeds : array_like
+        Airspeeds [m/s].
+    altitudes : array_like
+        Geometric altitudes above sea level [m].
+    densities : array_like
+        Air densities [kg/m^3].
+    burning : array_like
+        The engine is on, per design or for all of them.
+    dragGeometry : list of array_like
+        Geometry of each design from calculate_drag_geometry with the same c.DRAG_MODEL.
+
+    Returns
+    -------
+    dragAreas : numpy.ndarray
+        Drag areas [m^2].
+    """
+
+    if c.DRAG_MODEL == "reference":
+        return get_drag_coefficient_array(machs, burning) * dragGeometry[0]
+
+    (
+        totalLength,
+        finChord,
+        bodyFrictionArea,
+        finFrictionArea,
+        noseArea,
+        finFrontalArea,
+        baseArea,
+        burningBaseArea,
+    ) = dragGeometry
+
+    position = np.minimum(np.abs(np.asarray(machs, dtype=float)) / c.DRAG_MACH_STEP, BUILDUP_LAST_INDEX)
+    index = np.minimum(position.astype(np.intp), BUILDUP_LAST_INDEX - 1)
+    fraction = position - index
+
+    def lookup(table):
+        return table[index] + fraction * (table[index + 1] - table[index])
+
+    unitReynolds = (
+        np.asarray(densities) * np.abs(speeds) / atmosphere.get_viscosity_array(altitudes)
+    )  # [1/m]
+    friction = lookup(FRICTION_FACTORS) * (
+        0.455 / np.log10(np.maximum(unitReynolds * totalLength, 1e4)) ** 2.58 * bodyFrictionArea
+        + 0.455 / np.log10(np.maximum(unitReynolds * finChord, 1e4)) ** 2.58 * finFrictionArea
+    )
+
+    return (
+        friction
+        + lookup(NOSE_COEFFICIENTS) * noseArea
+        + lookup(FIN_COEFFICIENTS) * finFrontalArea
+        + lookup(BASE_COEFFICIENTS) * np.where(burning, burningBaseArea, baseArea)
+    )
@@ -0,0 +1,215 @@
+# Rocket 4 Apogee Sizing Script
+# Description: Inverse mode of the sizing pipeline. Sizes one design with vehicle.size_vehicle, flies its trajectory
+# and uses a bracketing root-finder to solve for the propellant load or thrust that reaches a target apogee.
+# Each design takes a handful of trajectory evaluations instead of a dense grid of sweep inputs.
+
+import os
+import sys
+
+import numpy as np
+from scipy.optimize import brentq
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import constants as c
+from scripts import trajectory, vehicle
+
+
+def calculate_design_apogee(
+    loadFraction,
+    thrustToWeight,
+    oxidizer,
+    fuel,
+    mixRatio,
+    chamberPressure,
+    exitPressure,
+    cstar,
+    specificImpulse,
+    expansionRatio,
+    characteristicLength,
+    copvPressure,
+    copvVolume,
+    copvMass,
+    copvLength,
+    tankOD,
+    tankThickness,
+    finNumber,
+    finHeight,
+    finTipChord,
+    finRootChord,
+    avionicsMass,
+):
+    """
+    Sizes a pressure-fed design with vehicle.size_vehicle, as main does, and flies it with c.TRAJECTORY_MODEL.
+
+    Parameters
+    ----------
+    loadFraction : float
+        Fraction of the COPV-limited propellant load carried, applied as a fraction of the COPV helium volume that
+        fluids sizing may use [1].
+    thrustToWeight : float
+        Thrust-to-weight ratio at launch, which also sets the burn time of the propellant load [1].
+    oxidizer : str
+        Oxidizer name.
+    fuel : str
+        Fuel name.
+    mixRatio : float
+        Core oxidizer to fuel mass ratio [1].
+    chamberPressure : float
+        Chamber pressure [Pa].
+    exitPressure : float
+        Nozzle exit pressure [Pa].
+    cstar : float
+        Characteristic velocity from run_CEA [m/s].
+    specificImpulse : float
+        Specific impulse from run_CEA [s].
+    expansionRatio : float
+        Nozzle expansion ratio from run_CEA [1].
+    characteristicLength : float
+        Characteristic chamber length from run_CEA [m].
+    copvPressure : float
+        COPV maximum pressure [Pa].
+    copvVolume : float
+        COPV volume [m^3].
+    copvMass : float
+        COPV mass [kg].
+    copvLength : float
+        COPV length [m].
+    tankOD : float
+        Tank outer diameter [m].
+    tankThickness : float
+        Tank wall thickness [m].
+    finNumber : int
+        Number of fins [1].
+    finHeight : float
+        Fin height [m].
+    finTipChord : float
+        Fin tip chord [m].
+    finRootChord : float
+        Fin root chord [m].
+    avionicsMass : float
+        Avionics mass [kg].
+
+    Returns
+    -------
+    apogee : float
+        Corrected apogee, as reported by the trajectory models [m].
+    """
+
+    [_, _, propulsionResults, massResults, totalLength] = vehicle.size_vehicle(
+        thrustToWeight,
+        oxidizer,
+        fuel,
+        mixRatio,
+        chamberPressure,
+        exitPressure,
+        cstar,
+        specificImpulse,
+        expansionRatio,
+        characteristicLength,
+        copvPressure,
+        loadFraction * copvVolume,
+        copvMass,
+        copvLength,
+        tankOD,
+        tankThickness,
+        finNumber,
+        finHeight,
+        finTipChord,
+        finRootChord,
+        avionicsMass,
+    )
+    [idealThrust, _, _, _, burnTime, *_, totalMassFlowRate, exitArea] = propulsionResults
+    [_, totalWetMass, _] = massResults
+
+    # Trajectory
+    [apogee, *_] = trajectory.calculate_trajectories(
+        [
+            totalWetMass,
+            totalMassFlowRate,
+            idealThrust,
+            tankOD,
+            finNumber,
+            finHeight,
+            exitArea,
+            exitPressure,
+            burnTime,
+            totalLength,
+            finRootChord,
+            finTipChord,
+        ]
+    )
+
+    return float(apogee[0])
+
+
+def size_for_apogee(targetApogee, variable, thrustToWeight, *designInputs):
+    """
+    Solves for the propellant load or thrust that makes a design reach a target apogee with Brent's method.
+    With the propellant load fixed, thrust and burn time are tied together, so solving for thrust also solves for
+    burn time.
+
+    Parameters
+    ----------
+    targetApogee : float
+        Corrected apogee to reach [m].
+    variable : str
+        "propellant" to solve for the fraction of the COPV-limited propellant load between
+        c.INVERSE_MIN_LOAD_FRACTION and 1 at the given thrust-to-weight ratio, or "thrust" to solve for the
+        thrust-to-weight ratio between c.INVERSE_MIN_THRUST_TO_WEIGHT and c.INVERSE_MAX_THRUST_TO_WEIGHT with the
+        full propellant load.
+    thrustToWeight : float
+        Thrust-to-weight ratio used when solving for the propellant load [1].
+    *designInputs
+        The calculate_design_apogee inputs from oxidizer to avionicsMass.
+
+    Returns
+    -------
+    loadFraction : float
+        Fraction of the COPV-limited propellant load carried, NaN if the target is out of reach [1].
+    thrustToWeight : float
+        Thrust-to-weight ratio at launch, NaN if the target is out of reach [1].
+    apogee : float
+        Apogee of the solved design, or of the closest bound if the target is out of reach [m].
+    """
+
+    if variable == "propellant":
+        bounds = [c.INVERSE_MIN_LOAD_FRACTION, 1]
+
+        def design(value):
+            return [value, thrustToWeight]
+
+    elif variable == "thrust":
+        bounds = [c.INVERSE_MIN_THRUST_TO_WEIGHT, c.INVERSE_MAX_THRUST_TO_WEIGHT]
+
+        def design(value):
+            return [1, value]
+
+    else:
+        raise ValueError(f"Unknown inverse sizing variable: {variable}")
+
+    def apogee_error(value):
+        return calculate_design_apogee(*design(value), *designInputs) - targetApogee
+
+    lowerError = apogee_error(bounds[0])
+    upperError = apogee_error(bounds[1])
+    if np.sign(lowerError) == np.sign(upperError):
+        closestApogee = targetApogee + min(lowerError, upperError, key=abs)
+        return [np.nan, np.nan, closestApogee]
+
+    # Step in the solved variable that moves the apogee by the tolerance, at the average slope across the bounds
+    apogeeSlope = abs(upperError - lowerError) / (bounds[1] - bounds[0])  # [m]
+    solution = brentq(
+        apogee_error,
+        bounds[0],
+        bounds[1],
+        xtol=c.INVERSE_SIZING_TOLERANCE * targetApogee / apogeeSlope,
+        rtol=c.INVERSE_SIZING_TOLERANCE,
+    )
+    [loadFraction, solvedThrustToWeight] = design(solution)
+
+    return [
+        loadFraction,
+        solvedThrustToWeight,
+        targetApogee + apogee_error(solution),
+    ]
@@ -0,0 +1,190 @@
+# Rocket 4 Atmosphere Script
+# Description: Loads atmosphere.csv once into contiguous NumPy arrays and provides O(1) linearly interpolated
+# lookups of the standard atmosphere for scalar altitudes and arrays of altitudes.
+# Table columns (see utils/make_atmosphere_file.py):
+#   altitude [m], pressure [Pa], density [kg/m^3], speed of sound [m/s], dynamic viscosity [Pa-s]
+# Older tables are still accepted, with the speed of sound derived from the ideal gas law and the viscosity from
+# Sutherland's law.
+
+import os
+import sys
+
+import numpy as np
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import constants as c
+
+ATMOSPHERE_FILE = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "atmosphere.csv")
+)  # [string] Path to the atmosphere table
+
+_table = np.loadtxt(ATMOSPHERE_FILE, delimiter=",", ndmin=2)
+
+ALTITUDES = np.ascontiguousarray(_table[:, 0])  # [m] Table altitudes
+PRESSURES = np.ascontiguousarray(_table[:, 1])  # [Pa] Static pressure
+DENSITIES = np.ascontiguousarray(_table[:, 2])  # [kg/m^3] Density
+if _table.shape[1] > 3:
+    SPEEDS_OF_SOUND = np.ascontiguousarray(_table[:, 3])  # [m/s] Speed of sound
+else:
+    SPEEDS_OF_SOUND = np.sqrt(
+        c.AIR_GAMMA * PRESSURES / DENSITIES
+    )  # [m/s] Speed of sound of an ideal gas
+if _table.shape[1] > 4:
+    VISCOSITIES = np.ascontiguousarray(_table[:, 4])  # [Pa-s] Dynamic viscosity
+else:
+    _temperatures = PRESSURES / (DENSITIES * c.AIR_GAS_CONSTANT)  # [K] Ideal gas temperature
+    VISCOSITIES = (
+        c.SUTHERLAND_REFERENCE_VISCOSITY
+        * (_temperatures / c.SUTHERLAND_REFERENCE_TEMPERATURE) ** 1.5
+        * (c.SUTHERLAND_REFERENCE_TEMPERATURE + c.SUTHERLAND_CONSTANT)
+        / (_temperatures + c.SUTHERLAND_CONSTANT)
+    )  # [Pa-s] Dynamic viscosity from Sutherland's law
+
+ALTITUDE_START = float(ALTITUDES[0])  # [m] First altitude in the table
+ALTITUDE_STEP = float(ALTITUDES[1] - ALTITUDES[0])  # [m] Uniform altitude spacing
+LAST_INDEX = len(ALTITUDES) - 1  # [1] Index of the last table row
+
+if not np.allclose(np.diff(ALTITUDES), ALTITUDE_STEP):
+    raise ValueError(f"{ATMOSPHERE_FILE} must use a uniform altitude step")
+
+
+def locate(altitude):
+    """
+    Finds the table row below a scalar altitude and the fractional distance to the next row.
+    Altitudes outside the table are clamped to the first or last row.
+
+    Parameters
+    ----------
+    altitude : float
+        Geometric altitude above sea level [m].
+
+    Returns
+    -------
+    index : int
+        Index of the table row at or below the altitude [1].
+    fraction : float
+        Fractional distance from that row to the next one [1].
+    """
+
+    position = (altitude - ALTITUDE_START) / ALTITUDE_STEP
+
+    if position <= 0:
+        return 0, 0.0
+    if position >= LAST_INDEX:
+        return LAST_INDEX - 1, 1.0
+
+    index = int(position)
+    return index, position - index
+
+
+def get_atmosphere(altitude):
+    """
+    Linearly interpolates the atmosphere table at a single altitude.
+
+    Parameters
+    ----------
+    altitude : float
+        Geometric altitude above sea level [m].
+
+    Returns
+    -------
+    pressure : float
+        Static pressure [Pa].
+    density : float
+        Density [kg/m^3].
+    speedOfSound : float
+        Speed of sound [m/s].
+    """
+
+    index, fraction = locate(altitude)
+
+    pressure = PRESSURES[index] + fraction * (PRESSURES[index + 1] - PRESSURES[index])
+    density = DENSITIES[index] + fraction * (DENSITIES[index + 1] - DENSITIES[index])
+    speedOfSound = SPEEDS_OF_SOUND[index] + fraction * (
+        SPEEDS_OF_SOUND[index + 1] - SPEEDS_OF_SOUND[index]
+    )
+
+    return [float(pressure), float(density), float(speedOfSound)]
+
+
+def get_atmosphere_array(altitudes):
+    """
+    Vectorized version of get_atmosphere for an array of altitudes.
+
+    Parameters
+    ----------
+    altitudes : array_like
+        Geometric altitudes above sea level [m].
+
+    Returns
+    -------
+    pressures : numpy.ndarray
+        Static pressures [Pa].
+    densities : numpy.ndarray
+        Densities [kg/m^3].
+    speedsOfSound : numpy.ndarray
+        Speeds of sound [m/s].
+    """
+
+    position = np.clip(
+        (np.asarray(altitudes, dtype=float) - ALTITUDE_START) / ALTITUDE_STEP,
+        0,
+        LAST_INDEX,
+    )
+    index = np.minimum(position.astype(np.intp), LAST_INDEX - 1)
+    fraction = position - index
+
+    pressures = PRESSURES[index] + fraction * (PRESSURES[index + 1] - PRESSURES[index])
+    densities = DENSITIES[index] + fraction * (DENSITIES[index + 1] - DENSITIES[index])
+    speedsOfSound = SPEEDS_OF_SOUND[index] + fraction * (
+        SPEEDS_OF_SOUND[index + 1] - SPEEDS_OF_SOUND[index]
+    )
+
+    return [pressures, densities, speedsOfSound]
+
+
+def get_viscosity(altitude):
+    """
+    Linearly interpolates the dynamic viscosity at a single altitude.
+
+    Parameters
+    ----------
+    altitude : float
+        Geometric altitude above sea level [m].
+
+    Returns
+    -------
+    viscosity : float
+        Dynamic viscosity [Pa-s].
+    """
+
+    index, fraction = locate(altitude)
+
+    return float(VISCOSITIES[index] + fraction * (VISCOSITIES[index + 1] - VISCOSITIES[index]))
+
+
+def get_viscosity_array(altitudes):
+    """
+    Vectorized version of get_viscosity for an array of altitudes.
+
+    Parameters
+    ----------
+    altitudes : array_like
+        Geometric altitudes above sea level [m].
+
+    Returns
+    -------
+    viscosities : numpy.ndarray
+        Dynamic viscosities [Pa-s].
+    """
+
+    position = np.clip(
+        (np.asarray(altitudes, dtype=float) - ALTITUDE_START) / ALTITUDE_STEP,
+        0,
+        LAST_INDEX,
+    )
+    index = np.minimum(position.astype(np.intp), LAST_INDEX - 1)
+    fraction = position - index
+
+    return VISCOSITIES[index] + fraction * (VISCOSITIES[index + 1] - VISCOSITIES[index])
@@ -0,0 +1,290 @@
+# Rocket 4 CEA Table Script
+# Description: Loads a table of CEA results on a regular (chamber pressure, mixture ratio, exit pressure) grid once and
+# interpolates c*, specific impulse and expansion ratio from it, for a single point or for arrays of points.
+# The table is read from c.CEA_TABLE_FILE, either an .npz file as written by utils/make_cea_file.py holding the grid of
+# every fuel it was built for and a JSON header describing them, or a legacy headerless CSV with columns chamber
+# pressure [bar], mixture ratio [1], exit pressure [bar], c* [m/s], specific impulse [s] and expansion ratio [1], for
+# the fuel c.CEA_TABLE_FUEL. c* and specific impulse already include the efficiency factor the table was built with.
+# Points outside the grid are reported as such so run_CEA can solve them with live CEA instead of extrapolating.
+
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from scipy.interpolate import RegularGridInterpolator
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import constants as c
+
+GRID_DECIMALS = 9  # Decimals kept when recovering the grid axes from the table columns
+GRID_TOLERANCE = 1e-9  # Fraction of an axis span within which a point on the edge of the grid counts as inside it
+CEA_TABLE_VERSION = 1  # Version of the .npz table format, stored in its header
+CEA_TABLE_AXES = ["fuel", "chamberPressure", "mixRatio", "exitPressure"]  # Axes of an .npz table, in order
+CEA_TABLE_OUTPUTS = ["cstar", "specificImpulse", "expansionRatio"]  # Values at every grid point, in order
+CEA_TABLE_UNITS = {
+    "chamberPressure": "Pa",
+    "mixRatio": "1",
+    "exitPressure": "Pa",
+    "cstar": "m/s",
+    "specificImpulse": "s",
+    "expansionRatio": "1",
+}  # Units of the axes and values of an .npz table
+
+
+def build_cea_interpolator(axes, values):
+    """
+    Builds the interpolator of one fuel.
+
+    Parameters
+    ----------
+    axes : list of numpy.ndarray
+        Ascending chamber pressures [Pa], mixture ratios [1] and exit pressures [Pa] of the grid.
+    values : numpy.ndarray
+        c* [m/s], specific impulse [s] and expansion ratio [1] at every grid point, shape (Pc, O/F, Pe, 3).
+
+    Returns
+    -------
+    interpolator : scipy.interpolate.RegularGridInterpolator
+        Interpolator over the grid returning NaN outside it.
+    """
+
+    # Cubic interpolation needs four points along every axis
+    method = c.CEA_TABLE_METHOD if min(len(axis) for axis in axes) >= 4 else "linear"
+    return RegularGridInterpolator(
+        axes, values, method=method, bounds_error=False, fill_value=np.nan
+    )
+
+
+def read_cea_csv(ceaTableFile):
+    """
+    Reads a legacy CSV table of one fuel and arranges it on its regular grid.
+
+    Parameters
+    ----------
+    ceaTableFile : str
+        Path to the table.
+
+    Returns
+    -------
+    axes : list of numpy.ndarray
+        Ascending chamber pressures [Pa], mixture ratios [1] and exit pressures [Pa] of the grid.
+    values : numpy.ndarray
+        c* [m/s], specific impulse [s] and expansion ratio [1] at every grid point, shape (Pc, O/F, Pe, 3).
+    """
+
+    table = pd.read_csv(ceaTableFile, header=None).to_numpy(dtype=float)
+
+    # Grid axes and the position of every row on them
+    axes = []
+    indices = []
+    for column in range(3):
+        [axis, index] = np.unique(
+            table[:, column].round(GRID_DECIMALS), return_inverse=True
+        )
+        axes.append(axis)
+        indices.append(index)
+
+    if len(table) != len(axes[0]) * len(axes[1]) * len(axes[2]):
+        raise ValueError(f"CEA table {ceaTableFile} is not a full regular grid")
+
+    values = np.full((len(axes[0]), len(axes[1]), len(axes[2]), 3), np.nan)
+    values[indices[0], indices[1], indices[2]] = table[:, 3:6]
+
+    axes[0] = axes[0] / c.PA2BAR  # [bar] to [Pa]
+    axes[2] = axes[2] / c.PA2BAR  # [bar] to [Pa]
+
+    return [axes, values]
+
+
+def write_cea_npz(ceaTableFile, grids, header, efficiencyFactor):
+    """
+    Writes the grids of several fuels to one .npz table. The arrays are stored uncompressed so loading them is a copy.
+    The file is written to a temporary file that replaces ceaTableFile once complete.
+
+    Parameters
+    ----------
+    ceaTableFile : str
+        Path of the table.
+    grids : dict
+        [axes, values] of each fuel, see read_cea_csv, by fuel name.
+    header : dict
+        Description of how the table was made, e.g. the generator and its version. The format version, axes, units,
+        fuels and efficiency factor are added to it.
+    efficiencyFactor : float
+        Efficiency factor the c* and specific impulse values were computed with [1].
+    """
+
+    fuels = [fuel.lower() for fuel in grids]
+    header = {
+        **header,
+        "version": CEA_TABLE_VERSION,
+        "axes": CEA_TABLE_AXES,
+        "outputs": CEA_TABLE_OUTPUTS,
+        "units": CEA_TABLE_UNITS,
+        "fuels": fuels,
+        "efficiencyFactor": efficiencyFactor,
+    }
+
+    # Fuel index i of the fuel axis is stored as arrays named after the other axes with suffix _i
+    arrays = {"header": np.array(json.dumps(header))}
+    for index, [axes, values] in enumerate(grids.values()):
+        for name, axis in zip(CEA_TABLE_AXES[1:], axes):
+            arrays[f"{name}_{index}"] = np.asarray(axis, dtype=float)
+        arrays[f"values_{index}"] = np.asarray(values, dtype=float)
+
+    with open(ceaTableFile + ".tmp", mode="wb") as file:
+        np.savez(file, **arrays)
+    os.replace(ceaTableFile + ".tmp", ceaTableFile)
+
+
+def read_cea_npz(ceaTableFile, efficiencyFactor):
+    """
+    Reads an .npz table and checks that its header matches this version of the code and the efficiency factor the
+    values are used with.
+
+    Parameters
+    ----------
+    ceaTableFile : str
+        Path to the table.
+    efficiencyFactor : float
+        Efficiency factor the table must have been built with [1].
+
+    Returns
+    -------
+    grids : dict
+        [axes, values] of each fuel, see read_cea_csv, by lower case fuel name.
+    header : dict
+        Header of the table.
+    """
+
+    with np.load(ceaTableFile, allow_pickle=False) as table:
+        header = json.loads(str(table["header"]))
+        if header.get("version") != CEA_TABLE_VERSION:
+            raise ValueError(
+                f"CEA table {ceaTableFile} has format version {header.get('version')}, expected {CEA_TABLE_VERSION}"
+            )
+        if header["axes"] != CEA_TABLE_AXES or header["units"] != CEA_TABLE_UNITS:
+            raise ValueError(f"CEA table {ceaTableFile} has axes or units this version cannot read")
+        if not np.isclose(header["efficiencyFactor"], efficiencyFactor):
+            raise ValueError(
+                f"CEA table {ceaTableFile} was built with efficiency factor {header['efficiencyFactor']}, "
+                f"not {efficiencyFactor}"
+            )
+
+        grids = {
+            fuel: [[table[f"{name}_{index}"] for name in CEA_TABLE_AXES[1:]], table[f"values_{index}"]]
+            for index, fuel in enumerate(header["fuels"])
+        }
+
+    return [grids, header]
+
+
+def load_cea_table(ceaTableFile, fuel):
+    """
+    Reads a CEA table and builds the interpolator of every fuel in it.
+
+    Parameters
+    ----------
+    ceaTableFile : str or None
+        Path to the table, relative to the main folder. Files ending in .npz are read with read_cea_npz, anything
+        else as a legacy CSV. None gives no table.
+    fuel : str
+        Fuel of a legacy CSV table (e.g., "ethanol") [N/A]. .npz tables name their own fuels.
+
+    Returns
+    -------
+    interpolators : dict
+        Interpolator of each fuel in the table, by lower case fuel name.
+    """
+
+    if ceaTableFile is None:
+        return {}
+
+    tableFile = os.path.join(os.path.dirname(__file__), "..", ceaTableFile)
+    if tableFile.endswith(".npz"):
+        grids = read_cea_npz(tableFile, c.CEA_EFFICIENCY_FACTOR)[0]
+    else:
+        grids = {fuel.lower(): read_cea_csv(tableFile)}
+
+    return {tableFuel: build_cea_interpolator(axes, values) for tableFuel, [axes, values] in grids.items()}
+
+
+CEA_TABLES = load_cea_table(
+    c.CEA_TABLE_FILE, c.CEA_TABLE_FUEL
+)  # Interpolator of each tabulated fuel
+
+
+def get_cea_table_array(chamberPressure, exitPressure, fuel, mixRatio):
+    """
+    Interpolates CEA results for many points of one fuel.
+
+    Parameters
+    ----------
+    chamberPressure : array_like
+        Pressure within the combustion chamber [Pa].
+    exitPressure : array_like
+        Pressure at the nozzle exit [Pa].
+    fuel : str
+        Name of the fuel (e.g., "methane", "ethanol") [N/A].
+    mixRatio : array_like
+        Mixture ratio of oxidizer to fuel by mass [-].
+
+    Returns
+    -------
+    cstar : numpy.ndarray
+        Characteristic velocity, reduced by the efficiency factor of the table [m/s].
+    specificImpulse : numpy.ndarray
+        Specific impulse, reduced by the efficiency factor of the table squared [s].
+    expansionRatio : numpy.ndarray
+        Nozzle expansion ratio, area of exit to throat [-].
+    inTable : numpy.ndarray
+        Boolean mask of the points inside the table. The outputs of the other points are NaN.
+    """
+
+    [chamberPressure, exitPressure, mixRatio] = np.broadcast_arrays(
+        np.asarray(chamberPressure, dtype=float),
+        np.asarray(exitPressure, dtype=float),
+        np.asarray(mixRatio, dtype=float),
+    )
+    interpolator = CEA_TABLES.get(fuel.lower())
+    if interpolator is None:
+        nan = np.full(chamberPressure.shape, np.nan)
+        return [nan, nan.copy(), nan.copy(), np.zeros(chamberPressure.shape, dtype=bool)]
+
+    # Points on the edges of the grid, up to round-off from unit conversions, are inside it
+    points = np.stack([chamberPressure, mixRatio, exitPressure], axis=-1)
+    for axis, grid in enumerate(interpolator.grid):
+        tolerance = GRID_TOLERANCE * (grid[-1] - grid[0])
+        points[..., axis] = np.where(
+            np.abs(points[..., axis] - grid[0]) <= tolerance, grid[0], points[..., axis]
+        )
+        points[..., axis] = np.where(
+            np.abs(points[..., axis] - grid[-1]) <= tolerance, grid[-1], points[..., axis]
+        )
+
+    values = interpolator(points).reshape(points.shape)
+    inTable = ~np.isnan(values).any(axis=-1)
+
+    return [values[..., 0], values[..., 1], values[..., 2], inTable]
+
+
+def get_cea_table(chamberPressure, exitPressure, fuel, mixRatio):
+    """
+    Interpolates CEA results for a single point, see get_cea_table_array.
+
+    Returns
+    -------
+    result : list or None
+        [cstar [m/s], specificImpulse [s], expansionRatio [-]], or None if the point is outside the table.
+    """
+
+    [cstar, specificImpulse, expansionRatio, inTable] = get_cea_table_array(
+        chamberPressure, exitPressure, fuel, mixRatio
+    )
+    if not inTable:
+        return None
+
+    return [float(cstar), float(specificImpulse), float(expansionRatio)]
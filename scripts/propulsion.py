@@ -4,17 +4,136 @@
 
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 
 import numpy as np
 import CEA_Wrap as CEA
 from CoolProp.CoolProp import PropsSI
 import pandas as pd
-from bisect import bisect_left
 
 # Add the parent directory to sys.path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 import constants as c
+from scripts import cea_table
+from utils import cea_cache
+
+CEA_DECK_PLOT_KEYS = "p o/f pip isp cf ae"  # Columns CEA writes to the .plt file of a multi-point deck
+
+
+def get_propellant_settings(fuel):
+    """
+    CEA propellant names and injection temperatures of a fuel burned with liquid oxygen.
+
+    Parameters
+    ----------
+    fuel : str
+        Name of the fuel (e.g., "methane", "ethanol", "jet-a") [N/A].
+
+    Returns
+    -------
+    fuelCEA : str
+        Name of the fuel under CEA naming conventions [N/A].
+    fuelTemp : float
+        Temperature of the fuel at the injection point [K].
+    oxidizerCEA : str
+        Name of the oxidizer under CEA naming conventions [N/A].
+    oxTemp : float
+        Temperature of the oxidizer at the injection point [K].
+    characteristicLength : float
+        Characteristic length of the combustion chamber, based on propellant choice [m].
+    """
+
+    if fuel.lower() == "methane":
+        fuelCEA = "CH4(L)"
+        fuelTemp = 111  # [K] temperature of fuel upon injection into combustion [CHANGE TO MAX ALLOWABLE]
+        characteristicLength = 35 * c.IN2M  # [ADD SOURCE]
+    elif fuel.lower() == "ethanol":
+        fuelCEA = "C2H5OH(L)"
+        characteristicLength = 45 * c.IN2M  # [ADD SOURCE]
+        fuelTemp = c.T_AMBIENT
+    elif fuel.lower() == "jet-a":
+        fuelCEA = "Jet-A(L)"
+        characteristicLength = 45 * c.IN2M
+        fuelTemp = c.T_AMBIENT
+
+    oxTemp = 90  # [K] temperature of oxidizer upon injection into combustion
+    oxidizerCEA = "O2(L)"
+
+    return [fuelCEA, fuelTemp, oxidizerCEA, oxTemp, characteristicLength]
+
+
+def get_CEA_key(chamberPressure, exitPressure, fuel, mixRatio):
+    """
+    Cache key of a run_CEA problem, see utils/cea_cache.py.
+
+    Parameters
+    ----------
+    chamberPressure : float
+        Pressure within the combustion chamber [Pa].
+    exitPressure : float
+        Pressure at the nozzle exit [Pa].
+    fuel : str
+        Name of the fuel (e.g., "methane", "ethanol") [N/A].
+    mixRatio : float
+        Mixture ratio of oxidizer to fuel by mass [-].
+
+    Returns
+    -------
+    key : str
+        Cache key.
+    """
+
+    [_, fuelTemp, oxidizerCEA, oxTemp, _] = get_propellant_settings(fuel)
+    return cea_cache.make_cea_key(
+        fuel,
+        oxidizerCEA,
+        chamberPressure,
+        exitPressure,
+        mixRatio,
+        fuelTemp,
+        oxTemp,
+        c.CEA_EFFICIENCY_FACTOR,
+    )
+
+
+def get_CEA_cache_file():
+    """
+    Path of the CEA cache.
+
+    Returns
+    -------
+    cacheFile : str or None
+        Absolute path of c.CEA_CACHE_FILE, or None if the cache is disabled.
+    """
+
+    if c.CEA_CACHE_FILE is None:
+        return None
+    return os.path.abspath(os.path.join(os.path.dirname(__file__), "..", c.CEA_CACHE_FILE))
+
+
+def prefetch_CEA(conditions):
+    """
+    Loads the cached CEA results of many problems in one pass, so run_CEA finds them in memory.
+
+    Parameters
+    ----------
+    conditions : iterable
+        (chamberPressure [Pa], exitPressure [Pa], fuel, mixRatio [-]) of each problem.
+
+    Returns
+    -------
+    missingConditions : list
+        Unique conditions with no cached result, which run_CEA will still have to solve.
+    """
+
+    cacheFile = get_CEA_cache_file()
+    conditionsByKey = {get_CEA_key(*condition): condition for condition in conditions}
+    if cacheFile is None:
+        return list(conditionsByKey.values())
+
+    missingKeys = cea_cache.prefetch_cea_results(cacheFile, conditionsByKey.keys())
+    return [conditionsByKey[key] for key in missingKeys]
 
 
 def run_CEA(
@@ -54,29 +173,64 @@ def run_CEA(
         Characteristic length of the combustion chamber, based on propellant choice [m].
     """
 
-    # Unit conversion
-    EFFICIENCY_FACTOR = 0.9  # Efficiency factor for cstar and specific impulse
+    [_, fuelTemp, _, oxTemp, characteristicLength] = get_propellant_settings(fuel)
+
+    # Interpolated from the CEA table inside its grid, else solved
+    result = cea_table.get_cea_table(chamberPressure, exitPressure, fuel, mixRatio)
+    if result is None:
+        result = solve_CEA(chamberPressure, exitPressure, fuel, mixRatio)
+    [cstar, specificImpulse, expansionRatio] = result
 
+    return [
+        cstar,
+        specificImpulse,
+        expansionRatio,
+        fuelTemp,
+        oxTemp,
+        characteristicLength,
+    ]
+
+
+def solve_CEA(chamberPressure, exitPressure, fuel, mixRatio):
+    """
+    Solves one CEA problem of run_CEA with live CEA, unless the CEA cache already holds its result.
+
+    Parameters
+    ----------
+    chamberPressure : float
+        Pressure within the combustion chamber [Pa].
+    exitPressure : float
+        Pressure at the nozzle exit [Pa].
+    fuel : str
+        Name of the fuel (e.g., "methane", "ethanol") [N/A].
+    mixRatio : float
+        Mixture ratio of oxidizer to fuel by mass [-].
+
+    Returns
+    -------
+    cstar : float
+        Characteristic velocity of combustion products, reduced by efficiency factor [m/s].
+    specificImpulse : float
+        Specific impulse (Isp) of the engine, reduced by efficiency factor squared [s].
+    expansionRatio : float
+        Nozzle expansion ratio, area of exit to throat [-].
+    """
+
+    [fuelCEA, fuelTemp, oxidizerCEA, oxTemp, _] = get_propellant_settings(fuel)
+
+    # Results of problems solved before, in this run or an earlier one
+    cacheFile = get_CEA_cache_file()
+    if cacheFile is not None:
+        key = get_CEA_key(chamberPressure, exitPressure, fuel, mixRatio)
+        result = cea_cache.get_cea_result(cacheFile, key)
+        if result is not None:
+            return result
+
+    # Unit conversion
     chamberPressure = chamberPressure * c.PA2BAR  # [Pa] to [bar]
     exitPressure = exitPressure * c.PA2BAR  # [Pa] to [bar]
     pressureRatio = chamberPressure / exitPressure  # Pressure ratio
 
-    if fuel.lower() == "methane":
-        fuelCEA = "CH4(L)"
-        fuelTemp = 111  # [K] temperature of fuel upon injection into combustion [CHANGE TO MAX ALLOWABLE]
-        characteristicLength = 35 * c.IN2M  # [ADD SOURCE]
-    elif fuel.lower() == "ethanol":
-        fuelCEA = "C2H5OH(L)"
-        characteristicLength = 45 * c.IN2M  # [ADD SOURCE]
-        fuelTemp = c.T_AMBIENT
-    elif fuel.lower() == "jet-a":
-        fuelCEA = "Jet-A(L)"
-        characteristicLength = 45 * c.IN2M
-        fuelTemp = c.T_AMBIENT
-
-    oxTemp = 90  # [K] temperature of oxidizer upon injection into combustion
-    oxidizerCEA = "O2(L)"
-
     # CEA Propellant Object Setup
     fuel = CEA.Fuel(fuelCEA, temp=fuelTemp, wt_percent=98)
     gasoline = CEA.Fuel("C8H18(L),n-octa", temp=fuelTemp, wt_percent=2)
@@ -88,62 +242,417 @@ def run_CEA(
         pip=pressureRatio,
         materials=[fuel, gasoline, oxidizer],
         o_f=mixRatio,
-        filename="engineCEAoutput",
         pressure_units="bar",
     )
 
     data = rocket.run()
 
     # Extract CEA outputs
-    cstar = data.cstar * EFFICIENCY_FACTOR  # [m/s] characteristic velocity
-    specificImpulse = data.isp * EFFICIENCY_FACTOR**2  # [s] specific impulse
+    cstar = data.cstar * c.CEA_EFFICIENCY_FACTOR  # [m/s] characteristic velocity
+    specificImpulse = data.isp * c.CEA_EFFICIENCY_FACTOR**2  # [s] specific impulse
     expansionRatio = data.ae  # [-] nozzle expansion ratio
+
+    if cacheFile is not None:
+        cea_cache.put_cea_results(cacheFile, {key: [cstar, specificImpulse, expansionRatio]})
+
+    return [cstar, specificImpulse, expansionRatio]
+
+
+def run_CEA_array(chamberPressure, exitPressure, fuel, mixRatio, numberWorkers=1):
     """
-    
-    USE THIS IF YOU ARE USING THE MEGA CEA FILE
-    # Define a function to perform binary search on the CEA data with closest value fallback
-    # Sort the data by chamber pressure, exit pressure, and mixture ratio
-    # Extract the relevant columns
-    chamber_pressures = CEAdata.iloc[:, 0].values
-    mix_ratios = CEAdata.iloc[:, 1].values
-    exit_pressures = CEAdata.iloc[:, 2].values
-    # Perform binary search for chamber pressure
-    idx_chamber = bisect_left(chamber_pressures, chamberPressure)
-    if idx_chamber == len(chamber_pressures):
-        idx_chamber -= 1
-    elif idx_chamber > 0 and abs(
-        chamber_pressures[idx_chamber - 1] - chamberPressure
-    ) < abs(chamber_pressures[idx_chamber] - chamberPressure):
-        idx_chamber -= 1
-    # Perform binary search for mixture ratio
-    idx_mr = bisect_left(mix_ratios, mixRatio, lo=idx_chamber)
-    if idx_mr == len(mix_ratios):
-        idx_mr -= 1
-    elif idx_mr > 0 and abs(mix_ratios[idx_mr - 1] - mixRatio) < abs(
-        mix_ratios[idx_mr] - mixRatio
-    ):
-        idx_mr -= 1
-    # Perform binary search for exit pressure
-    idx_exit = bisect_left(exit_pressures, exitPressure, lo=idx_mr)
-    if idx_exit == len(exit_pressures):
-        idx_exit -= 1
-    elif idx_exit > 0 and abs(exit_pressures[idx_exit - 1] - exitPressure) < abs(
-        exit_pressures[idx_exit] - exitPressure
-    ):
-        idx_exit -= 1
-    # Retrieve the corresponding CEA values
-    cstar = CEAdata.iloc[idx_chamber, 3]  # [m/s] characteristic velocity
-    specificImpulse = CEAdata.iloc[idx_chamber, 4]  # [s] specific impulse
-    expansionRatio = CEAdata.iloc[idx_chamber, 5]  # [-] nozzle expansion ratio
+    Runs run_CEA for many problems, interpolating every point inside the CEA table at once and solving the rest with
+    solve_CEA.
+
+    Parameters
+    ----------
+    chamberPressure : array_like
+        Pressure within the combustion chamber [Pa].
+    exitPressure : array_like
+        Pressure at the nozzle exit [Pa].
+    fuel : str or array_like
+        Name of the fuel of every problem, or one fuel for all of them [N/A].
+    mixRatio : array_like
+        Mixture ratio of oxidizer to fuel by mass [-].
+    numberWorkers : int or None, optional
+        Number of processes solving the points outside the table, see solve_CEA_list. Defaults to 1.
+
+    Returns
+    -------
+    cstar : numpy.ndarray
+        Characteristic velocity of combustion products, reduced by efficiency factor [m/s].
+    specificImpulse : numpy.ndarray
+        Specific impulse (Isp) of the engine, reduced by efficiency factor squared [s].
+    expansionRatio : numpy.ndarray
+        Nozzle expansion ratio, area of exit to throat [-].
     """
+
+    [chamberPressure, exitPressure, mixRatio] = [
+        np.atleast_1d(np.asarray(value, dtype=float))
+        for value in np.broadcast_arrays(chamberPressure, exitPressure, mixRatio)
+    ]
+    fuel = np.broadcast_to(np.asarray(fuel, dtype=object), chamberPressure.shape)
+
+    cstar = np.full(chamberPressure.shape, np.nan)
+    specificImpulse = np.full(chamberPressure.shape, np.nan)
+    expansionRatio = np.full(chamberPressure.shape, np.nan)
+
+    outsideTable = []  # Flat indices of the points outside the table
+    for fuelName in set(fuel.ravel()):
+        isFuel = fuel == fuelName
+        [
+            cstar[isFuel],
+            specificImpulse[isFuel],
+            expansionRatio[isFuel],
+            inTable,
+        ] = cea_table.get_cea_table_array(
+            chamberPressure[isFuel], exitPressure[isFuel], fuelName, mixRatio[isFuel]
+        )
+        outsideTable += list(np.flatnonzero(isFuel)[~inTable])
+
+    # Live CEA, or the cache, for the points outside the table
+    results = solve_CEA_list(
+        [
+            (chamberPressure.flat[index], exitPressure.flat[index], fuel.flat[index], mixRatio.flat[index])
+            for index in outsideTable
+        ],
+        numberWorkers,
+    )
+    for index, result in zip(outsideTable, results):
+        [cstar.flat[index], specificImpulse.flat[index], expansionRatio.flat[index]] = result
+
+    return [cstar, specificImpulse, expansionRatio]
+
+
+def solve_CEA_list(conditions, numberWorkers=1):
+    """
+    Runs solve_CEA for many problems. Problems without a cached result are solved in multi-point CEA decks by
+    solve_CEA_batch, split over a process pool.
+
+    Parameters
+    ----------
+    conditions : list
+        (chamberPressure [Pa], exitPressure [Pa], fuel, mixRatio [-]) of each problem.
+    numberWorkers : int or None, optional
+        Number of worker processes, None for one per CPU. Defaults to 1, which solves every problem in this process.
+
+    Returns
+    -------
+    results : list
+        solve_CEA outputs of each problem.
+    """
+
+    missingConditions = prefetch_CEA(conditions)
+    numberWorkers = min(numberWorkers or os.cpu_count(), len(missingConditions))
+    if numberWorkers <= 1:
+        return solve_CEA_batch(conditions)
+
+    # Contiguous slices of the problems sorted by fuel and chamber pressure, so each worker's decks stay compact
+    missingConditions = sorted(missingConditions, key=lambda condition: (condition[2], condition[0]))
+    slices = np.array_split(np.arange(len(missingConditions)), numberWorkers)
+    with ProcessPoolExecutor(max_workers=numberWorkers) as pool:
+        missingResults = pool.map(
+            solve_CEA_batch,
+            [[missingConditions[index] for index in indices] for indices in slices],
+        )
+        missingResults = dict(
+            zip(missingConditions, [result for results in missingResults for result in results])
+        )
+
     return [
-        cstar,
-        specificImpulse,
-        expansionRatio,
-        fuelTemp,
-        oxTemp,
-        characteristicLength,
+        missingResults[condition] if condition in missingResults else solve_CEA(*condition)
+        for condition in conditions
+    ]
+
+
+def solve_CEA_batch(conditions):
+    """
+    Runs solve_CEA for many problems in this process, solving the problems without a cached result with one
+    multi-point CEA deck per fuel. If a deck cannot be run or read back, its problems are solved one at a time.
+
+    Parameters
+    ----------
+    conditions : list
+        (chamberPressure [Pa], exitPressure [Pa], fuel, mixRatio [-]) of each problem.
+
+    Returns
+    -------
+    results : list
+        solve_CEA outputs of each problem.
+    """
+
+    missingConditions = prefetch_CEA(conditions)
+    cacheFile = get_CEA_cache_file()
+
+    missingResults = {}
+    for fuelName in dict.fromkeys(condition[2] for condition in missingConditions):
+        fuelConditions = [condition for condition in missingConditions if condition[2] == fuelName]
+        [chamberPressures, exitPressures, _, mixRatios] = zip(*fuelConditions)
+        try:
+            [cstar, specificImpulse, expansionRatio] = run_CEA_deck(
+                chamberPressures, exitPressures, fuelName, mixRatios
+            )
+        except (RuntimeError, ValueError, OSError):  # CEA failed, its output could not be read, or it is missing
+            for condition in fuelConditions:
+                missingResults[condition] = solve_CEA(*condition)
+            continue
+
+        fuelResults = {
+            condition: [float(cstar[index]), float(specificImpulse[index]), float(expansionRatio[index])]
+            for index, condition in enumerate(fuelConditions)
+        }
+        missingResults.update(fuelResults)
+        if cacheFile is not None:
+            cea_cache.put_cea_results(
+                cacheFile,
+                {get_CEA_key(*condition): result for condition, result in fuelResults.items()},
+            )
+
+    return [
+        missingResults[condition] if condition in missingResults else solve_CEA(*condition)
+        for condition in conditions
+    ]
+
+
+def make_CEA_deck(fuel, problems):
+    """
+    Writes a CEA input deck of many rocket problems of one fuel. Each problem has one chamber pressure and lists of
+    mixture ratios and pressure ratios, which CEA solves for every combination.
+
+    Parameters
+    ----------
+    fuel : str
+        Name of the fuel (e.g., "methane", "ethanol") [N/A].
+    problems : list
+        [chamberPressure [bar], mixRatios [-], pressureRatios [-]] of each problem.
+
+    Returns
+    -------
+    deck : str
+        Contents of the CEA input file.
+    """
+
+    [fuelCEA, fuelTemp, oxidizerCEA, oxTemp, _] = get_propellant_settings(fuel)
+    materials = [
+        CEA.Fuel(fuelCEA, temp=fuelTemp, wt_percent=98),
+        CEA.Fuel("C8H18(L),n-octa", temp=fuelTemp, wt_percent=2),
+        CEA.Oxidizer(oxidizerCEA, temp=oxTemp),
     ]
+    reactants = "react\n" + "".join(material.get_CEA_str() for material in materials)
+
+    deck = ""
+    for chamberPressure, mixRatios, pressureRatios in problems:
+        deck += "problem rocket equilibrium\n"
+        deck += f"   p(bar) = {chamberPressure:0.5f}\n"
+        deck += "   o/f = " + ",".join(f"{mixRatio:0.5f}" for mixRatio in mixRatios) + "\n"
+        deck += "   pip = " + ",".join(f"{pressureRatio:0.5f}" for pressureRatio in pressureRatios) + "\n"
+        deck += reactants
+        deck += f"output\n   plot {CEA_DECK_PLOT_KEYS}\nend\n"
+
+    return deck
+
+
+def make_CEA_deck_problems(chamberPressure, mixRatio, pressureRatio):
+    """
+    Groups points into the problems of a multi-point CEA deck. CEA solves every combination of the mixture ratios and
+    pressure ratios of a problem, so mixture ratios of one chamber pressure share a problem only when they need the
+    same pressure ratios, and no point is solved that was not asked for. Problems are split where CEA limits the
+    number of mixture ratios and pressure ratios per problem.
+
+    Parameters
+    ----------
+    chamberPressure : numpy.ndarray
+        Pressure within the combustion chamber of each point [Pa].
+    mixRatio : numpy.ndarray
+        Mixture ratio of oxidizer to fuel by mass of each point [-].
+    pressureRatio : numpy.ndarray
+        Ratio of chamber to exit pressure of each point [-].
+
+    Returns
+    -------
+    problems : list
+        [chamberPressure [Pa], mixRatios [-], pressureRatios [-]] of each problem.
+    """
+
+    problems = []
+    for problemPressure in np.unique(chamberPressure):
+        atPressure = chamberPressure == problemPressure
+
+        # Mixture ratios by the pressure ratios they need
+        groups = {}
+        for problemMixRatio in np.unique(mixRatio[atPressure]):
+            pressureRatios = tuple(np.unique(pressureRatio[atPressure & (mixRatio == problemMixRatio)]))
+            groups.setdefault(pressureRatios, []).append(problemMixRatio)
+
+        for pressureRatios, mixRatios in groups.items():
+            for i in range(0, len(mixRatios), c.CEA_DECK_MIX_RATIOS):
+                for j in range(0, len(pressureRatios), c.CEA_DECK_PRESSURE_RATIOS):
+                    problems.append(
+                        [
+                            problemPressure,
+                            np.array(mixRatios[i : i + c.CEA_DECK_MIX_RATIOS]),
+                            np.array(pressureRatios[j : j + c.CEA_DECK_PRESSURE_RATIOS]),
+                        ]
+                    )
+
+    return problems
+
+
+def run_CEA_deck(chamberPressure, exitPressure, fuel, mixRatio):
+    """
+    Solves many CEA problems of one fuel with a single CEA run. The points are grouped into problems by
+    make_CEA_deck_problems and the results are read back from the .plt file of the run. Results are not cached, see
+    solve_CEA_batch.
+
+    Parameters
+    ----------
+    chamberPressure : array_like
+        Pressure within the combustion chamber [Pa].
+    exitPressure : array_like
+        Pressure at the nozzle exit [Pa].
+    fuel : str
+        Name of the fuel (e.g., "methane", "ethanol") [N/A].
+    mixRatio : array_like
+        Mixture ratio of oxidizer to fuel by mass [-].
+
+    Returns
+    -------
+    cstar : numpy.ndarray
+        Characteristic velocity of combustion products, reduced by efficiency factor [m/s].
+    specificImpulse : numpy.ndarray
+        Specific impulse (Isp) of the engine, reduced by efficiency factor squared [s].
+    expansionRatio : numpy.ndarray
+        Nozzle expansion ratio, area of exit to throat [-].
+    """
+
+    [chamberPressure, exitPressure, mixRatio] = [
+        np.atleast_1d(np.asarray(value, dtype=float))
+        for value in np.broadcast_arrays(chamberPressure, exitPressure, mixRatio)
+    ]
+    pressureRatio = chamberPressure / exitPressure
+
+    problems = make_CEA_deck_problems(chamberPressure, mixRatio, pressureRatio)
+
+    # CEA_Wrap runs a deck through the CEA backend of a problem object
+    [fuelCEA, fuelTemp, oxidizerCEA, oxTemp, _] = get_propellant_settings(fuel)
+    backend = getattr(
+        CEA.RocketProblem(
+            pressure=1,
+            materials=[CEA.Fuel(fuelCEA, temp=fuelTemp), CEA.Oxidizer(oxidizerCEA, temp=oxTemp)],
+            o_f=1,
+            pressure_units="bar",
+        ),
+        "CEA",
+        None,
+    )
+    if not hasattr(backend, "run_cea_backend"):
+        raise RuntimeError("This version of CEA_Wrap cannot run CEA decks")
+
+    deck = make_CEA_deck(
+        fuel,
+        [[pressure * c.PA2BAR, mixRatios, pressureRatios] for pressure, mixRatios, pressureRatios in problems],
+    )
+    [_, pltFile] = backend.run_cea_backend(contents=deck)
+    results = read_CEA_deck(pltFile, problems)
+
+    [cstar, specificImpulse, expansionRatio] = np.array(
+        [results[point] for point in zip(chamberPressure, mixRatio, pressureRatio)]
+    ).T
+
+    return [cstar, specificImpulse, expansionRatio]
+
+
+def read_CEA_deck(pltFile, problems):
+    """
+    Reads the results of a multi-point CEA deck from its .plt file. CEA writes a chamber row, a throat row and a row
+    per pressure ratio for every mixture ratio of every problem, in deck order.
+
+    Parameters
+    ----------
+    pltFile : str
+        Contents of the .plt file, with the columns of CEA_DECK_PLOT_KEYS.
+    problems : list
+        [chamberPressure, mixRatios [-], pressureRatios [-]] of each problem of the deck, see make_CEA_deck.
+
+    Returns
+    -------
+    results : dict
+        [cstar [m/s], specificImpulse [s], expansionRatio [-]], reduced by the efficiency factor, by
+        (chamberPressure, mixRatio, pressureRatio).
+    """
+
+    rows = np.array(
+        [line.split() for line in pltFile.splitlines() if line.strip() and not line.lstrip().startswith("#")],
+        dtype=float,
+    ).reshape(-1, len(CEA_DECK_PLOT_KEYS.split()))
+    expectedRows = sum(len(mixRatios) * (2 + len(pressureRatios)) for _, mixRatios, pressureRatios in problems)
+    if len(rows) != expectedRows:
+        raise RuntimeError(f"CEA deck returned {len(rows)} rows instead of {expectedRows}")
+
+    results = {}
+    position = 0
+    for chamberPressure, mixRatios, pressureRatios in problems:
+        for mixRatio in mixRatios:
+            caseRows = rows[position : position + 2 + len(pressureRatios)]
+            position += 2 + len(pressureRatios)
+
+            exitRows = caseRows[2:]
+            if not np.isclose(caseRows[0, 1], mixRatio, rtol=1e-3) or not np.allclose(
+                exitRows[:, 2], pressureRatios, rtol=1e-3
+            ):
+                raise RuntimeError("CEA deck rows are not in the expected order")
+
+            for pressureRatio, exitRow in zip(pressureRatios, exitRows):
+                [_, _, _, exitVelocity, thrustCoefficient, expansionRatio] = exitRow
+                results[(chamberPressure, mixRatio, pressureRatio)] = [
+                    exitVelocity / thrustCoefficient * c.CEA_EFFICIENCY_FACTOR,  # [m/s] cstar = Isp / CF
+                    exitVelocity / c.GRAVITY * c.CEA_EFFICIENCY_FACTOR**2,  # [m/s] to [s]
+                    expansionRatio,
+                ]
+
+    return results
+
+
+def run_CEA_sweep(conditions, numberWorkers=None):
+    """
+    Runs run_CEA once for every unique problem of a sweep, so a design loop can look its results up instead of
+    solving the same combustion problem for every variant sharing it.
+
+    Parameters
+    ----------
+    conditions : iterable
+        (chamberPressure [Pa], exitPressure [Pa], fuel, mixRatio [-]) of each design, repeats allowed.
+    numberWorkers : int or None, optional
+        Number of processes solving problems outside the table and the cache, see solve_CEA_list. Defaults to one per
+        CPU.
+
+    Returns
+    -------
+    ceaResults : dict
+        run_CEA outputs of each unique problem, by (chamberPressure, exitPressure, fuel, mixRatio).
+    """
+
+    conditions = list(dict.fromkeys(conditions))
+    if len(conditions) == 0:
+        return {}
+
+    [chamberPressures, exitPressures, fuels, mixRatios] = zip(*conditions)
+    [cstar, specificImpulse, expansionRatio] = run_CEA_array(
+        chamberPressures, exitPressures, np.array(fuels, dtype=object), mixRatios, numberWorkers
+    )
+
+    ceaResults = {}
+    for index, condition in enumerate(conditions):
+        [_, fuelTemp, _, oxTemp, characteristicLength] = get_propellant_settings(condition[2])
+        ceaResults[condition] = [
+            float(cstar[index]),
+            float(specificImpulse[index]),
+            float(expansionRatio[index]),
+            fuelTemp,
+            oxTemp,
+            characteristicLength,
+        ]
+
+    return ceaResults
 
 
 def calculate_propulsion(
@@ -0,0 +1,202 @@
+# Rocket 4 Recovery Script
+# Description: Batched descent of every design from apogee under drogue and main parachutes. Rockets are stepped
+# together as NumPy arrays with the shared atmosphere table. Within a step the density is held constant and the
+# vertical speed follows the exact solution for quadratic drag, relaxing towards the terminal velocity of the deployed
+# chute, so the step stays stable through main deployment. The rocket drifts with the wind profile of the 2-D
+# trajectory model, starting from apogee above the launch site.
+
+import math
+import os
+import sys
+
+import numpy as np
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import constants as c
+from scripts import atmosphere
+
+
+def calculate_drag_area(diameter, dragCoefficient):
+    """
+    Drag area of a parachute.
+
+    Parameters
+    ----------
+    diameter : float
+        Nominal diameter of the parachute [m].
+    dragCoefficient : float
+        Drag coefficient of the parachute, based on its nominal area [-].
+
+    Returns
+    -------
+    dragArea : float
+        Drag coefficient times nominal area [m^2].
+    """
+
+    return dragCoefficient * math.pi * diameter**2 / 4
+
+
+def relax_descent_speed(speed, terminalSpeed, dt):
+    """
+    Exact descent speed and distance fallen after dt with constant gravity, density and drag area, starting from
+    any speed. Faster than terminal the rocket slows down (coth branch), slower it speeds up (tanh branch).
+
+    Parameters
+    ----------
+    speed : numpy.ndarray
+        Descent speed at the start of the step, positive downwards [m/s].
+    terminalSpeed : numpy.ndarray
+        Terminal descent speed for the step [m/s].
+    dt : float
+        Time step [s].
+
+    Returns
+    -------
+    speed : numpy.ndarray
+        Descent speed at the end of the step [m/s].
+    distance : numpy.ndarray
+        Distance fallen during the step [m].
+    """
+
+    ratio = speed / terminalSpeed
+    tau = c.GRAVITY * dt / terminalSpeed  # [1] step length in drag relaxation times
+    fast = ratio > 1
+
+    # Slower than terminal: u = ut tanh(tau + atanh(u0/ut))
+    start = np.arctanh(np.minimum(ratio, 1 - 1e-12))
+    slowSpeed = terminalSpeed * np.tanh(start + tau)
+    slowDistance = terminalSpeed**2 / c.GRAVITY * (
+        np.logaddexp(start + tau, -(start + tau)) - np.logaddexp(start, -start)
+    )  # ln(cosh(start + tau) / cosh(start))
+
+    # Faster than terminal: u = ut coth(tau + acoth(u0/ut))
+    start = np.arctanh(1 / np.maximum(ratio, 1 + 1e-12))
+    fastSpeed = terminalSpeed / np.tanh(start + tau)
+    fastDistance = terminalSpeed**2 / c.GRAVITY * (
+        np.log(-np.expm1(-2 * (start + tau)))
+        - np.log(-np.expm1(-2 * start))
+        + tau
+    )  # ln(sinh(start + tau) / sinh(start))
+
+    return [
+        np.where(fast, fastSpeed, slowSpeed),
+        np.where(fast, fastDistance, slowDistance),
+    ]
+
+
+def calculate_descent_batch(
+    apogee,
+    dryMass,
+    drogueDragArea=None,
+    mainDragArea=None,
+    mainDeployHeight=None,
+    windSpeed=None,
+):
+    """
+    Descends every rocket from apogee to the launch site altitude, under the drogue until mainDeployHeight and the
+    main below it.
+
+    Parameters
+    ----------
+    apogee : array_like
+        Apogee of each rocket as reported by the trajectory models, above sea level [m].
+    dryMass : array_like
+        Burnout mass of each rocket [kg].
+    drogueDragArea : array_like, optional
+        Drag area of the drogue [m^2]. Defaults to the c.DROGUE_DIAMETER and c.DROGUE_DRAG_COEFFICIENT chute.
+    mainDragArea : array_like, optional
+        Drag area of the main [m^2]. Defaults to the c.MAIN_DIAMETER and c.MAIN_DRAG_COEFFICIENT chute.
+    mainDeployHeight : array_like, optional
+        Height above the launch site at which the main opens [m]. Defaults to c.MAIN_DEPLOY_HEIGHT.
+    windSpeed : array_like, optional
+        Wind speed at c.WIND_REFERENCE_HEIGHT [m/s]. Defaults to c.WIND_SPEED.
+
+    Returns
+    -------
+    landingVelocity : numpy.ndarray
+        Descent speed at touchdown [m/s].
+    mainDeployVelocity : numpy.ndarray
+        Descent speed when the main opens [m/s].
+    descentTime : numpy.ndarray
+        Time from apogee to touchdown [s].
+    driftRadius : numpy.ndarray
+        Horizontal distance drifted from apogee to touchdown [m].
+    """
+
+    apogee = np.atleast_1d(np.asarray(apogee, dtype=float))
+    numberRockets = len(apogee)
+    parameters = [
+        dryMass,
+        calculate_drag_area(c.DROGUE_DIAMETER, c.DROGUE_DRAG_COEFFICIENT)
+        if drogueDragArea is None
+        else drogueDragArea,
+        calculate_drag_area(c.MAIN_DIAMETER, c.MAIN_DRAG_COEFFICIENT)
+        if mainDragArea is None
+        else mainDragArea,
+        c.MAIN_DEPLOY_HEIGHT if mainDeployHeight is None else mainDeployHeight,
+        c.WIND_SPEED if windSpeed is None else windSpeed,
+    ]
+    activeParameters = [
+        np.broadcast_to(np.asarray(parameter, dtype=float), (numberRockets,)).copy()
+        for parameter in parameters
+    ]
+
+    # Initial Conditions
+    dt = c.RECOVERY_TIME_STEP  # [s] time step of the descent
+    time = 0  # [s] time since apogee shared by every rocket
+
+    # Active state, compressed whenever rockets land
+    ids = np.arange(numberRockets)  # [1] index of each active rocket in the outputs
+    altitude = np.maximum(apogee, c.FAR_ALTITUDE)  # [m]
+    speed = np.zeros(numberRockets)  # [m/s] descent speed, positive downwards
+    drift = np.zeros(numberRockets)  # [m] signed horizontal drift
+    mainOpen = np.zeros(numberRockets, dtype=bool)  # main parachute has opened
+
+    # Outputs
+    landingVelocity = np.zeros(numberRockets)
+    mainDeployVelocity = np.zeros(numberRockets)
+    descentTime = np.zeros(numberRockets)
+    driftRadius = np.zeros(numberRockets)
+
+    while len(ids) > 0:
+        mass, drogueArea, mainArea, deployHeight, wind = activeParameters
+        height = altitude - c.FAR_ALTITUDE  # [m] height above the launch site
+
+        _, rho, _ = atmosphere.get_atmosphere_array(altitude)
+        underMain = height <= deployHeight
+        dragArea = np.where(underMain, mainArea, drogueArea)  # [m^2]
+        terminalSpeed = np.sqrt(2 * mass * c.GRAVITY / (rho * dragArea))  # [m/s]
+        windAtHeight = wind * (
+            np.maximum(height, 0) / c.WIND_REFERENCE_HEIGHT
+        ) ** c.WIND_SHEAR_EXPONENT  # [m/s] wind at the current height
+
+        # Speed when the main opens, recorded on the first step under it
+        opening = underMain & ~mainOpen
+        mainDeployVelocity[ids[opening]] = speed[opening]
+        mainOpen |= underMain
+
+        [speed, distance] = relax_descent_speed(speed, terminalSpeed, dt)
+
+        # Rockets reaching the ground finish part way through the step
+        landing = distance >= height
+        fraction = np.where(landing, height / np.maximum(distance, 1e-12), 1)  # [1] fraction of the step flown
+        altitude = altitude - distance
+        drift = drift + windAtHeight * fraction * dt
+        time = time + dt
+
+        if np.any(landing):
+            landed = ids[landing]
+            landingVelocity[landed] = speed[landing]
+            descentTime[landed] = time - (1 - fraction[landing]) * dt
+            driftRadius[landed] = np.abs(drift[landing])
+
+            keep = ~landing
+            ids = ids[keep]
+            altitude = altitude[keep]
+            speed = speed[keep]
+            drift = drift[keep]
+            mainOpen = mainOpen[keep]
+            activeParameters = [parameter[keep] for parameter in activeParameters]
+
+    return [landingVelocity, mainDeployVelocity, descentTime, driftRadius]
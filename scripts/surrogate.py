@@ -0,0 +1,132 @@
+# Rocket 4 Surrogate Script
+# Description: Quadratic least-squares response surface that stands in for the trajectory integrator during large sweeps.
+# The surface is fit between the logarithms of the inputs and outputs, which keeps the power-law behaviour of the
+# rocket equation and drag nearly quadratic. Each prediction carries the standard error of the regression, which in
+# log space is a relative uncertainty, so callers can fall back to the integrator wherever the surrogate is unsure or
+# has to extrapolate beyond its training data.
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+
+def build_features(scaledInputs, quadratic):
+    """
+    Builds the regression matrix of a linear or full quadratic polynomial.
+
+    Parameters
+    ----------
+    scaledInputs : numpy.ndarray
+        Standardized inputs, one row per design [-].
+    quadratic : bool
+        Include squares and cross products of the inputs [-].
+
+    Returns
+    -------
+    features : numpy.ndarray
+        Polynomial terms, one row per design [-].
+    """
+
+    columns = [np.ones(len(scaledInputs)), *scaledInputs.T]
+    if quadratic:
+        numberInputs = scaledInputs.shape[1]
+        for i in range(numberInputs):
+            for j in range(i, numberInputs):
+                columns.append(scaledInputs[:, i] * scaledInputs[:, j])
+
+    return np.column_stack(columns)
+
+
+def fit_surrogate(inputs, outputs):
+    """
+    Fits a response surface to a sample of real flights. Inputs that do not vary across the sample are dropped,
+    and the quadratic terms are only used when there are enough samples to fit them.
+
+    Parameters
+    ----------
+    inputs : array_like
+        Positive training inputs, one row per design.
+    outputs : array_like
+        Positive training outputs, one row per design.
+
+    Returns
+    -------
+    surrogate : dict
+        Fitted coefficients and everything predict_surrogate needs to scale inputs and estimate uncertainty.
+    """
+
+    inputs = np.log(np.asarray(inputs, dtype=float))
+    outputs = np.log(np.asarray(outputs, dtype=float))
+
+    lower = inputs.min(axis=0)  # Training bounds, used as the trust region
+    upper = inputs.max(axis=0)
+    varying = upper > lower
+    center = (upper + lower)[varying] / 2
+    scale = (upper - lower)[varying] / 2
+    scaledInputs = (inputs[:, varying] - center) / scale
+
+    numberVarying = int(np.sum(varying))
+    numberQuadraticTerms = 1 + numberVarying + numberVarying * (numberVarying + 1) // 2
+    quadratic = len(inputs) >= 2 * numberQuadraticTerms
+
+    # Largest distance from a training design to its nearest neighbour, beyond which a design lies in a gap of the
+    # sample even when it is inside the training bounds. The zero column only keeps the tree valid when no input varies
+    tree = cKDTree(np.column_stack([np.zeros(len(inputs)), scaledInputs]))
+    trustRadius = float(np.max(tree.query(tree.data, k=2)[0][:, 1])) if len(inputs) > 1 else 0.0
+
+    features = build_features(scaledInputs, quadratic)
+    coefficients, _, rank, _ = np.linalg.lstsq(features, outputs, rcond=None)
+    residuals = outputs - features @ coefficients
+    degreesOfFreedom = max(len(inputs) - rank, 1)
+
+    return {
+        "lower": lower,
+        "upper": upper,
+        "varying": varying,
+        "center": center,
+        "scale": scale,
+        "tree": tree,
+        "trustRadius": trustRadius,
+        "quadratic": quadratic,
+        "coefficients": coefficients,
+        "covariance": np.linalg.pinv(features.T @ features),
+        "residualVariance": np.sum(residuals**2, axis=0) / degreesOfFreedom,
+    }
+
+
+def predict_surrogate(surrogate, inputs):
+    """
+    Evaluates a fitted surrogate and the standard error of each prediction.
+
+    Parameters
+    ----------
+    surrogate : dict
+        Surrogate from fit_surrogate.
+    inputs : array_like
+        Positive inputs to predict, one row per design.
+
+    Returns
+    -------
+    outputs : numpy.ndarray
+        Predicted outputs, one row per design.
+    uncertainties : numpy.ndarray
+        Relative standard error of each predicted output, one row per design [1].
+    inBounds : numpy.ndarray
+        True where the design lies inside the bounds of the training data and no farther from its nearest training
+        design than the training designs are from each other [-].
+    """
+
+    inputs = np.log(np.asarray(inputs, dtype=float).reshape(-1, len(surrogate["lower"])))
+
+    scaledInputs = (inputs[:, surrogate["varying"]] - surrogate["center"]) / surrogate["scale"]
+    features = build_features(scaledInputs, surrogate["quadratic"])
+
+    outputs = np.exp(features @ surrogate["coefficients"])
+    leverage = np.einsum("ij,jk,ik->i", features, surrogate["covariance"], features)
+    uncertainties = np.sqrt(np.outer(1 + leverage, surrogate["residualVariance"]))
+    inBounds = np.all(
+        (inputs >= surrogate["lower"]) & (inputs <= surrogate["upper"]), axis=1
+    )
+    nearestDistances = surrogate["tree"].query(np.column_stack([np.zeros(len(inputs)), scaledInputs]))[0]
+    inBounds &= nearestDistances <= surrogate["trustRadius"]
+
+    return [outputs, uncertainties, inBounds]
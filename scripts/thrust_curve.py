@@ -0,0 +1,200 @@
+# Rocket 4 Thrust Curve Script
+# Description: Thrust and mass flow curves for the trajectory integrators. A curve is a normalized shape, given as
+# thrust and mass flow fractions of the nominal jetThrust and mDotTotal at fractions of the burn, so one curve can be
+# applied to every design in a sweep. Before a flight the shape is stretched so the propellant load is unchanged and
+# preprocessed into cumulative impulse and cumulative mass at every integrator time step, which leaves one O(1)
+# array read per step.
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import constants as c
+
+
+def blowdown_curve(regulatedFraction, finalFraction, numberPoints=101):
+    """
+    Parametric pressure-fed curve: constant thrust while the regulator holds tank pressure, followed by a linear
+    blowdown tail as the ullage gas expands.
+
+    Parameters
+    ----------
+    regulatedFraction : float
+        Fraction of the burn before the blowdown starts [1].
+    finalFraction : float
+        Thrust and mass flow at the end of the burn as a fraction of nominal [1].
+    numberPoints : int, optional
+        Number of points in the curve [-].
+
+    Returns
+    -------
+    timeFractions : numpy.ndarray
+        Fraction of the burn at each point, from 0 to 1 [1].
+    thrustFractions : numpy.ndarray
+        Thrust as a fraction of nominal [1].
+    massFlowFractions : numpy.ndarray
+        Mass flow rate as a fraction of nominal [1].
+    """
+
+    timeFractions = np.linspace(0, 1, numberPoints)
+    tail = np.clip(
+        (timeFractions - regulatedFraction) / max(1 - regulatedFraction, 1e-12), 0, 1
+    )
+    fractions = 1 - (1 - finalFraction) * tail
+
+    return [timeFractions, fractions, fractions.copy()]
+
+
+def load_thrust_curve(thrustCurve):
+    """
+    Reads a thrust curve setting.
+
+    Parameters
+    ----------
+    thrustCurve : None, str or list
+        None for constant thrust, "blowdown" for blowdown_curve with c.BLOWDOWN_REGULATED_FRACTION and
+        c.BLOWDOWN_FINAL_FRACTION, the path of a CSV (relative to the main folder) with "Time Fraction",
+        "Thrust Fraction" and "Mass Flow Fraction" columns, or a [timeFractions, thrustFractions,
+        massFlowFractions] list.
+
+    Returns
+    -------
+    curve : list of numpy.ndarray or None
+        [timeFractions, thrustFractions, massFlowFractions] with time fractions from 0 to 1, or None for constant
+        thrust.
+    """
+
+    if thrustCurve is None:
+        return None
+    if isinstance(thrustCurve, str) and thrustCurve == "blowdown":
+        return blowdown_curve(c.BLOWDOWN_REGULATED_FRACTION, c.BLOWDOWN_FINAL_FRACTION)
+    if isinstance(thrustCurve, str):
+        table = pd.read_csv(
+            os.path.join(os.path.dirname(__file__), "..", thrustCurve), skipinitialspace=True
+        )
+        thrustCurve = [
+            table["Time Fraction"],
+            table["Thrust Fraction"],
+            table["Mass Flow Fraction"],
+        ]
+
+    timeFractions, thrustFractions, massFlowFractions = [
+        np.asarray(values, dtype=float) for values in thrustCurve
+    ]
+    timeFractions = (timeFractions - timeFractions[0]) / (timeFractions[-1] - timeFractions[0])
+
+    return [timeFractions, thrustFractions, massFlowFractions]
+
+
+DEFAULT_CURVE = load_thrust_curve(c.THRUST_CURVE)  # Curve used when a trajectory is not given one
+
+
+def cumulative_integral(knots, values, times):
+    """
+    Exact integral of a piecewise-linear curve from its first knot to each of the given times.
+    Times beyond the last knot are integrated up to the last knot.
+
+    Parameters
+    ----------
+    knots : numpy.ndarray
+        Increasing knot positions.
+    values : numpy.ndarray
+        Curve value at each knot.
+    times : numpy.ndarray
+        Positions to integrate up to.
+
+    Returns
+    -------
+    integrals : numpy.ndarray
+        Integral at each position.
+    """
+
+    knotIntegrals = np.concatenate(
+        [[0], np.cumsum(np.diff(knots) * (values[1:] + values[:-1]) / 2)]
+    )
+    times = np.clip(times, knots[0], knots[-1])
+    index = np.clip(np.searchsorted(knots, times, side="right") - 1, 0, len(knots) - 2)
+    partial = times - knots[index]
+
+    return knotIntegrals[index] + partial * (values[index] + np.interp(times, knots, values)) / 2
+
+
+def calculate_burn_time(burnTime, curve):
+    """
+    Duration of a curve-shaped burn that uses the same propellant as burnTime at the nominal mass flow.
+
+    Parameters
+    ----------
+    burnTime : array_like
+        Burn time at the nominal mass flow rate [s].
+    curve : list of numpy.ndarray
+        Curve from load_thrust_curve.
+
+    Returns
+    -------
+    curveBurnTime : array_like
+        Duration of the shaped burn [s].
+    """
+
+    timeFractions, _, massFlowFractions = curve
+    meanMassFlowFraction = cumulative_integral(
+        timeFractions, massFlowFractions, timeFractions[-1:]
+    )[0]
+
+    return burnTime / meanMassFlowFraction
+
+
+def build_thrust_tables(jetThrust, mDotTotal, burnTime, curve):
+    """
+    Preprocesses a curve for a set of rockets into cumulative impulse and mass at every time step of the
+    trajectory integrators, padded with the burnout values.
+
+    Parameters
+    ----------
+    jetThrust : array_like
+        Nominal engine thrust of each rocket [N].
+    mDotTotal : array_like
+        Nominal total mass flow rate of each rocket [kg/s].
+    burnTime : array_like
+        Burn time of each rocket at the nominal mass flow rate [s].
+    curve : list of numpy.ndarray
+        Curve from load_thrust_curve.
+
+    Returns
+    -------
+    cumulativeImpulse : numpy.ndarray
+        Jet impulse delivered by the start of each step, one row per rocket [Ns].
+    cumulativeMass : numpy.ndarray
+        Propellant used by the start of each step, one row per rocket [kg].
+    burnSteps : numpy.ndarray
+        Number of steps with the engine on for each rocket [-].
+    """
+
+    jetThrust, mDotTotal, burnTime = np.broadcast_arrays(
+        *[np.atleast_1d(np.asarray(value, dtype=float)) for value in (jetThrust, mDotTotal, burnTime)]
+    )
+    timeFractions, thrustFractions, massFlowFractions = curve
+    dt = c.TRAJECTORY_TIME_STEP
+
+    curveBurnTime = calculate_burn_time(burnTime, curve)  # [s]
+    burnSteps = np.ceil(curveBurnTime / dt).astype(int)  # [1]
+    stepTimes = np.arange(burnSteps.max() + 2) * dt  # [s] start of each step, plus the end of the last one
+
+    # Integrals in normalized time, scaled back by the burn duration
+    stepFractions = stepTimes / curveBurnTime[:, np.newaxis]
+    cumulativeImpulse = (
+        jetThrust[:, np.newaxis]
+        * curveBurnTime[:, np.newaxis]
+        * cumulative_integral(timeFractions, thrustFractions, stepFractions)
+    )
+    cumulativeMass = (
+        mDotTotal[:, np.newaxis]
+        * curveBurnTime[:, np.newaxis]
+        * cumulative_integral(timeFractions, massFlowFractions, stepFractions)
+    )
+
+    return [cumulativeImpulse, cumulativeMass, burnSteps]
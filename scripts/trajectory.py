@@ -1,13 +1,49 @@
+import math
 import os
 import sys
+from collections import OrderedDict
 import matplotlib.pyplot as plt
 import numpy as np
-import pandas as pd
+from scipy.integrate import solve_ivp
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 import constants as c
+from scripts import aerodynamics, atmosphere, surrogate, thrust_curve, trajectory_kernel
+from utils import history_file
 
-atmosphereDF = pd.read_csv("atmosphere.csv")
+trajectoryCache = OrderedDict()  # Quantized trajectory inputs to outputs, in least recently used order
+trajectoryCacheStats = {"hits": 0, "misses": 0}  # Trajectory cache counters
+TRAJECTORY_CACHE_SETTINGS = [
+    "AIR_GAMMA",
+    "AIR_GAS_CONSTANT",
+    "APOGEE_CORRECTION_FACTOR",
+    "BLOWDOWN_FINAL_FRACTION",
+    "BLOWDOWN_REGULATED_FRACTION",
+    "COAST_LAYER_THICKNESS",
+    "DRAG_BUILDUP_MAX_MACH",
+    "DRAG_COEFFICIENT",
+    "DRAG_MACH_STEP",
+    "DRAG_MODEL",
+    "DRAG_TABLE_FILE",
+    "FAR_ALTITUDE",
+    "FIN_THICKNESS",
+    "GRAVITY",
+    "NOSECONE_FINENESS",
+    "RAIL_ANGLE",
+    "RAIL_HEIGHT",
+    "SUTHERLAND_CONSTANT",
+    "SUTHERLAND_REFERENCE_TEMPERATURE",
+    "SUTHERLAND_REFERENCE_VISCOSITY",
+    "THRUST_CURVE",
+    "TRAJECTORY_ABSOLUTE_TOLERANCE",
+    "TRAJECTORY_FAST_COAST",
+    "TRAJECTORY_JIT",
+    "TRAJECTORY_RELATIVE_TOLERANCE",
+    "TRAJECTORY_TIME_STEP",
+    "WIND_REFERENCE_HEIGHT",
+    "WIND_SHEAR_EXPONENT",
+    "WIND_SPEED",
+]  # Constants that change trajectory results, part of every cache key so changing one in-process never reuses a result
 
 
 def calculate_trajectory(
@@ -21,11 +57,15 @@ def calculate_trajectory(
     exitPressure,
     burnTime,
     totalLength,
-    atmosphereDF,
     plots,
+    history=None,
+    thrustCurve=None,
+    finRootChord=None,
+    finTipChord=None,
 ):
     """
-    _summary_
+    Integrates the 1-D vertical ascent of the rocket to apogee. Only running reductions are kept
+    unless a history is requested, so a flight allocates no per-step lists.
 
     Parameters
     ----------
@@ -51,96 +91,1257 @@ def calculate_trajectory(
         Total Length of Rocket [m].
     plots : bool
         Boolean for plotting, 1 = on, 0 = off [-].
+    history : dict, optional
+        Preallocated buffers from allocate_history to record the time history into, every "decimation"-th
+        step and the last one. The number of recorded steps is stored under "steps" [-]. File-backed
+        buffers are saved when the flight ends.
+    thrustCurve : str or list, optional
+        Thrust and mass flow curve scaling jetThrust and mDotTotal, see thrust_curve.load_thrust_curve.
+        Defaults to c.THRUST_CURVE.
+    finRootChord : float, optional
+        Fin root chord [m]. Defaults to c.FIN_ROOT_CHORD.
+    finTipChord : float, optional
+        Fin tip chord [m]. Defaults to c.FIN_TIP_CHORD.
 
     Returns
     -------
     altitude : float
         Final altitude of the rocket [m].
-    maxMach : float
-        Maximum Mach number of the rocket [-].
     maxAccel : float
         Maximum acceleration of the rocket [m/s^2].
     exitVelo : float
-        Exit velocity of the rocket [m/s].
+        Rail exit velocity of the rocket [m/s].
+    exitAccel : float
+        Rail exit acceleration of the rocket [m/s^2].
     totalImpulse : float
         Total impulse of the rocket [Ns].
+    maxDynamicPressure : float
+        Maximum dynamic pressure of the rocket [Pa].
+    maxMach : float
+        Maximum Mach number of the rocket [-].
     """
 
+    # Fin Chords
+    finRootChord = c.FIN_ROOT_CHORD if finRootChord is None else finRootChord  # [m]
+    finTipChord = c.FIN_TIP_CHORD if finTipChord is None else finTipChord  # [m]
+
     # Rocket Properties
-    referenceArea = (np.pi * (tankOD) ** 2 / 4) + finNumber * finHeight * c.FIN_THICKNESS # [m^2] reference area of the rocket
     mass = wetMass  # [kg] initial mass of the rocket
-
-    cD = 0.4
-    ascentDragCoeff = cD * (totalLength / 6.35) * (tankOD / 0.203)
+    dragGeometry = aerodynamics.calculate_drag_geometry(
+        tankOD, finNumber, finHeight, totalLength, finRootChord, finTipChord, exitArea
+    )  # drag areas of the design, see aerodynamics.calculate_drag_geometry
 
     # Initial Conditions
     altitude = c.FAR_ALTITUDE  # [m] initial altitude of the rocket
     velocity = 0  # [m/s] initial velocity of the rocket
     time = 0  # [s] initial time of the rocket
-    dt = 0.05  # [s] time step of the rocket
+    dt = c.TRAJECTORY_TIME_STEP  # [s] time step of the rocket
+    # Rail exit is measured from the launch site. Comparing the absolute altitude to RAIL_HEIGHT, as before, fired on
+    # the first step, so exitVelo and exitAccel were those of the first step rather than of the end of the rail
+    railExitAltitude = c.FAR_ALTITUDE + c.RAIL_HEIGHT  # [m] altitude at which the rocket leaves the rail
 
-    # Array Initialization:
-    altitudeArray = []
-    velocityArray = []
-    accelArray = []
-    timeArray = []
+    # Thrust Curve
+    curve = (
+        thrust_curve.DEFAULT_CURVE
+        if thrustCurve is None
+        else thrust_curve.load_thrust_curve(thrustCurve)
+    )
+    if curve is not None:
+        [cumulativeImpulse, cumulativeMass, burnSteps] = thrust_curve.build_thrust_tables(
+            jetThrust, mDotTotal, burnTime, curve
+        )
+        cumulativeImpulse = cumulativeImpulse[0].tolist()  # [Ns] jet impulse by the start of each step
+        cumulativeMass = cumulativeMass[0].tolist()  # [kg] propellant used by the start of each step
+        burnSteps = int(burnSteps[0])  # [1] steps with the engine on
 
-    totalImpulse = 0  # Initialize total impulse
+    # Compiled kernel for reference-drag flights without a history, when numba is installed
+    if (
+        c.TRAJECTORY_JIT
+        and trajectory_kernel.KERNEL_AVAILABLE
+        and c.DRAG_MODEL == "reference"
+        and history is None
+        and plots != 1
+    ):
+        [altitude, *outputs] = trajectory_kernel.calculate_trajectory_kernel(
+            wetMass, mDotTotal, jetThrust, exitArea, exitPressure, burnTime, dragGeometry[0], curve
+        )
+        return [float(altitude * c.APOGEE_CORRECTION_FACTOR)] + [float(output) for output in outputs]
 
-    while velocity >= 0:
+    # History Initialization
+    if history is None and plots == 1:
+        history = allocate_history(
+            wetMass, mDotTotal, jetThrust, exitArea, exitPressure, burnTime, thrustCurve=curve
+        )
+    if history is not None:
+        decimation = history.get("decimation", 1)  # [1] steps per recorded step
+        historyArrays = [history[channel] for channel in history_file.HISTORY_CHANNELS]
+        maxRows = calculate_history_rows(
+            calculate_max_steps(
+                wetMass, mDotTotal, jetThrust, exitArea, exitPressure, burnTime, curve
+            ),
+            decimation,
+        )
+        if len(historyArrays[0]) < maxRows:
+            raise ValueError(
+                f"History buffers hold {len(historyArrays[0])} steps but the flight may record {maxRows}"
+            )
 
-        index = int(altitude // 10)  # Divide altitude by 10 to find index
+    # Running Reductions
+    step = 0  # [1] number of integration steps taken
+    row = 0  # [1] number of recorded history steps
+    totalImpulse = 0  # [Ns] total impulse
+    maxAccel = -np.inf  # [m/s^2] maximum acceleration
+    maxDynamicPressure = 0  # [Pa] maximum dynamic pressure
+    maxMach = 0  # [1] maximum Mach number
+    exitVelo, exitAccel = 0, 0  # [m/s], [m/s^2] rail exit state
+    onRail = True
 
-        if index < 0:
-            pressure = atmosphereDF.iloc[0][1]
-            rho = atmosphereDF.iloc[0][2]  # Return first row if below range
-        elif index >= len(atmosphereDF):
-            pressure = atmosphereDF.iloc[-1][1]
-            rho = atmosphereDF.iloc[-1][2]  # Return last row if above range
-        else:
-            pressure = atmosphereDF.iloc[index][1]
-            rho = atmosphereDF.iloc[index][2]
+    while velocity >= 0:
 
-        if time < burnTime:
-            mass = mass - mDotTotal * dt  # [kg] mass of the rocket
+        pressure, rho, speedOfSound = atmosphere.get_atmosphere(
+            altitude
+        )  # [Pa], [kg/m^3], [m/s] interpolated atmosphere at the current altitude
+
+        burning = time < burnTime if curve is None else step < burnSteps
+        if burning and curve is None:
+            burnFraction = min((burnTime - time) / dt, 1)  # [1] part of the step before burnout
+            mass = mass - mDotTotal * dt * burnFraction  # [kg] mass of the rocket
             thrust = (
                 jetThrust + (exitPressure - pressure) * exitArea
-            )  # [N] force of thrust, accounting for pressure thrust
+            ) * burnFraction  # [N] force of thrust averaged over the step, accounting for pressure thrust
+            totalImpulse += thrust * dt  # Accumulate impulse
+        elif burning:
+            mass = wetMass - cumulativeMass[step + 1]  # [kg] mass of the rocket at the end of the step
+            jet = (
+                cumulativeImpulse[step + 1] - cumulativeImpulse[step]
+            ) / dt  # [N] average jet thrust over the step
+            thrust = max(
+                jet + (exitPressure * jet / jetThrust - pressure) * exitArea, 0
+            )  # [N] force of thrust, with the exit pressure following the chamber pressure
             totalImpulse += thrust * dt  # Accumulate impulse
         else:
             thrust = 0  # [N] total thrust of the rocket
 
-        drag = (
-            0.5 * rho * velocity**2 * ascentDragCoeff * referenceArea
+        dynamicPressure = 0.5 * rho * velocity**2  # [Pa] dynamic pressure
+        drag = dynamicPressure * aerodynamics.get_drag_area(
+            velocity / speedOfSound, velocity, altitude, rho, burning, dragGeometry
         )  # [N] force of drag
         grav = c.GRAVITY * mass  # [N] force of gravity
 
         accel = (thrust - drag - grav) / mass  # acceleration equation of motion
-        accelArray.append(accel)
 
         velocity += accel * dt  # velocity integration
-        velocityArray.append(velocity)
+        altitude = altitude + velocity * dt  # position integration
+        time = time + dt  # time step
+
+        if accel > maxAccel:
+            maxAccel = accel
+        if dynamicPressure > maxDynamicPressure:
+            maxDynamicPressure = dynamicPressure
+        if velocity / speedOfSound > maxMach:
+            maxMach = velocity / speedOfSound
+        if onRail and altitude >= railExitAltitude:
+            exitVelo = velocity
+            exitAccel = accel
+            onRail = False
+
+        if history is not None and (step % decimation == 0 or velocity < 0):
+            for array, value in zip(
+                historyArrays, (time, altitude, velocity, accel, thrust, drag)
+            ):
+                array[row] = value
+            row += 1
+        step += 1
+
+        # Coast to apogee in closed form once the engine is off, unless every step is being recorded
+        burnedOut = time >= burnTime if curve is None else step >= burnSteps
+        if c.TRAJECTORY_FAST_COAST and history is None and not onRail and burnedOut and velocity > 0:
+            [altitude, coastDynamicPressure, coastMach] = calculate_coast(
+                altitude, velocity, mass, dragGeometry
+            )
+            maxDynamicPressure = max(maxDynamicPressure, coastDynamicPressure)
+            maxMach = max(maxMach, coastMach)
+            break
+
+    altitude = altitude * c.APOGEE_CORRECTION_FACTOR
+
+    if history is not None:
+        history["steps"] = row
+        if "file" in history:
+            history_file.save_history_file(history)
+
+    if plots == 1:
+        plt.figure(1)
+        plt.title("Height v. Time")
+        plt.plot(history["time"][:row], history["altitude"][:row])
+        plt.ylabel("Height [m]")
+        plt.xlabel("Time (s)")
+        plt.grid()
+        plt.show()
+
+    return [
+        float(altitude),
+        float(maxAccel),
+        float(exitVelo),
+        float(exitAccel),
+        float(totalImpulse),
+        float(maxDynamicPressure),
+        float(maxMach),
+    ]
+
+
+def calculate_max_steps(
+    wetMass,
+    mDotTotal,
+    jetThrust,
+    exitArea,
+    exitPressure,
+    burnTime,
+    thrustCurve=None,
+):
+    """
+    Upper bound on the number of integration steps calculate_trajectory can take. Thrust is bounded by
+    its vacuum value, mass by the burnout mass, and the coast by a drag-free ballistic climb.
+
+    Parameters
+    ----------
+    wetMass : float
+        Wet mass of the rocket [kg].
+    mDotTotal : float
+        Total mass flow rate of the engine [kg/s].
+    jetThrust : float
+        Engine thrust [N].
+    exitArea : float
+        Exit area of the nozzle [m^2].
+    exitPressure : float
+        Exit pressure of the nozzle [Pa].
+    burnTime : float
+        Burn time of the engine [s].
+    thrustCurve : str or list, optional
+        Thrust and mass flow curve, see calculate_trajectory. Defaults to c.THRUST_CURVE.
+
+    Returns
+    -------
+    maxSteps : int
+        Maximum number of integration steps to apogee [-].
+    """
+
+    curve = (
+        thrust_curve.DEFAULT_CURVE
+        if thrustCurve is None
+        else thrust_curve.load_thrust_curve(thrustCurve)
+    )
+    dt = c.TRAJECTORY_TIME_STEP
+    maxBurnTime = burnTime + dt  # [s] the last burn step may run past burnTime
+    maxThrust = jetThrust + exitPressure * exitArea  # [N] vacuum thrust
+    burnoutMass = wetMass - mDotTotal * maxBurnTime  # [kg] lowest possible mass
+    if curve is not None:
+        maxBurnTime = thrust_curve.calculate_burn_time(burnTime, curve) + dt
+        maxThrust = maxThrust * max(np.max(curve[1]), 0)
+    maxVelocity = max(maxThrust * maxBurnTime / burnoutMass, 0)  # [m/s] no gravity or drag losses
+    maxFlightTime = maxBurnTime + maxVelocity / c.GRAVITY  # [s] drag-free coast to apogee
+
+    return int(np.ceil(maxFlightTime / dt)) + 2
+
+
+def calculate_history_rows(maxSteps, decimation):
+    """
+    Number of history rows needed to record a flight of at most maxSteps steps, keeping every
+    decimation-th step and the last one.
+
+    Parameters
+    ----------
+    maxSteps : int
+        Maximum number of integration steps, see calculate_max_steps [-].
+    decimation : int
+        Number of integration steps per recorded step [-].
+
+    Returns
+    -------
+    maxRows : int
+        Number of history rows [-].
+    """
+
+    return -(-maxSteps // decimation) + 1
+
+
+def allocate_history(
+    wetMass,
+    mDotTotal,
+    jetThrust,
+    exitArea,
+    exitPressure,
+    burnTime,
+    decimation=None,
+    fileName=None,
+    thrustCurve=None,
+):
+    """
+    Preallocates buffers large enough to hold the full time history of a flight. The buffers can
+    be reused for any flight that needs no more steps. With a file name, the buffers are a
+    memory-mapped .npy file that the flight streams into (see utils/history_file.py).
+
+    Parameters
+    ----------
+    wetMass : float
+        Wet mass of the rocket [kg].
+    mDotTotal : float
+        Total mass flow rate of the engine [kg/s].
+    jetThrust : float
+        Engine thrust [N].
+    exitArea : float
+        Exit area of the nozzle [m^2].
+    exitPressure : float
+        Exit pressure of the nozzle [Pa].
+    burnTime : float
+        Burn time of the engine [s].
+    decimation : int, optional
+        Number of integration steps per recorded step [-]. Defaults to c.HISTORY_DECIMATION.
+    fileName : str, optional
+        Path of the .npy file to stream the history into. Buffers are kept in RAM when omitted.
+    thrustCurve : str or list, optional
+        Thrust and mass flow curve, see calculate_trajectory. Defaults to c.THRUST_CURVE.
+
+    Returns
+    -------
+    history : dict
+        Empty time [s], altitude [m], velocity [m/s], acceleration [m/s^2], thrust [N] and drag [N]
+        buffers.
+    """
+
+    decimation = c.HISTORY_DECIMATION if decimation is None else int(decimation)
+    maxRows = calculate_history_rows(
+        calculate_max_steps(
+            wetMass, mDotTotal, jetThrust, exitArea, exitPressure, burnTime, thrustCurve
+        ),
+        decimation,
+    )
+
+    if fileName is None:
+        history = {channel: np.empty(maxRows) for channel in history_file.HISTORY_CHANNELS}
+        history["steps"] = 0
+    else:
+        history = history_file.create_history_file(fileName, maxRows)
+    history["decimation"] = decimation
+
+    return history
+
+
+def calculate_trajectory_batch(
+    wetMass,
+    mDotTotal,
+    jetThrust,
+    tankOD,
+    finNumber,
+    finHeight,
+    exitArea,
+    exitPressure,
+    burnTime,
+    totalLength,
+    dragMultiplier=1,
+    thrustCurve=None,
+    finRootChord=None,
+    finTipChord=None,
+):
+    """
+    Flies many rockets at once with the same integrator as calculate_trajectory. All vehicles are
+    stepped in lockstep as NumPy state vectors, and vehicles that reach apogee are dropped from the
+    active set, so the cost scales with the number of steps rather than the number of designs. With
+    c.TRAJECTORY_JIT, numba installed and the "reference" drag model, the rockets are flown one by
+    one in the compiled trajectory_kernel loop instead.
+
+    Parameters
+    ----------
+    wetMass : array_like
+        Wet mass of each rocket [kg].
+    mDotTotal : array_like
+        Total mass flow rate of each engine [kg/s].
+    jetThrust : array_like
+        Engine thrust [N].
+    tankOD : array_like
+        Outer diameter of the tank [m].
+    finNumber : array_like
+        Number of fins [-].
+    finHeight : array_like
+        Fin semi-span [m].
+    exitArea : array_like
+        Exit area of the nozzle [m^2].
+    exitPressure : array_like
+        Exit pressure of the nozzle [Pa].
+    burnTime : array_like
+        Burn time of the engine [s].
+    totalLength : array_like
+        Total Length of Rocket [m].
+    dragMultiplier : array_like, optional
+        Factor applied to the drag of each rocket, used for dispersions [-].
+    thrustCurve : str or list, optional
+        Thrust and mass flow curve shared by every rocket, see calculate_trajectory. Defaults to
+        c.THRUST_CURVE.
+    finRootChord : array_like, optional
+        Fin root chord [m]. Defaults to c.FIN_ROOT_CHORD.
+    finTipChord : array_like, optional
+        Fin tip chord [m]. Defaults to c.FIN_TIP_CHORD.
+
+    Returns
+    -------
+    altitude : numpy.ndarray
+        Final altitude of each rocket [m].
+    maxAccel : numpy.ndarray
+        Maximum acceleration of each rocket [m/s^2].
+    exitVelo : numpy.ndarray
+        Rail exit velocity of each rocket [m/s].
+    exitAccel : numpy.ndarray
+        Rail exit acceleration of each rocket [m/s^2].
+    totalImpulse : numpy.ndarray
+        Total impulse of each rocket [Ns].
+    maxDynamicPressure : numpy.ndarray
+        Maximum dynamic pressure of each rocket [Pa].
+    maxMach : numpy.ndarray
+        Maximum Mach number of each rocket [-].
+    """
+
+    # Fin Chords
+    finRootChord = c.FIN_ROOT_CHORD if finRootChord is None else finRootChord  # [m]
+    finTipChord = c.FIN_TIP_CHORD if finTipChord is None else finTipChord  # [m]
+
+    (
+        wetMass,
+        mDotTotal,
+        jetThrust,
+        tankOD,
+        finNumber,
+        finHeight,
+        exitArea,
+        exitPressure,
+        burnTime,
+        totalLength,
+        finRootChord,
+        finTipChord,
+        dragMultiplier,
+    ) = np.broadcast_arrays(
+        *[
+            np.atleast_1d(np.asarray(value, dtype=float))
+            for value in (
+                wetMass,
+                mDotTotal,
+                jetThrust,
+                tankOD,
+                finNumber,
+                finHeight,
+                exitArea,
+                exitPressure,
+                burnTime,
+                totalLength,
+                finRootChord,
+                finTipChord,
+                dragMultiplier,
+            )
+        ]
+    )
+    numberRockets = len(wetMass)
+
+    # Rocket Properties
+    dragGeometry = aerodynamics.calculate_drag_geometry(
+        tankOD, finNumber, finHeight, totalLength, finRootChord, finTipChord, exitArea, dragMultiplier
+    )  # drag areas of each design, see aerodynamics.calculate_drag_geometry
+
+    # Initial Conditions
+    dt = c.TRAJECTORY_TIME_STEP  # [s] time step of the rocket
+    time = 0  # [s] time shared by every rocket
+    step = 0  # [1] steps taken by every rocket
+    railExitAltitude = c.FAR_ALTITUDE + c.RAIL_HEIGHT  # [m] altitude at which the rocket leaves the rail
+
+    # Thrust Curve
+    curve = (
+        thrust_curve.DEFAULT_CURVE
+        if thrustCurve is None
+        else thrust_curve.load_thrust_curve(thrustCurve)
+    )
+
+    # Compiled kernel for reference-drag flights, when numba is installed
+    if c.TRAJECTORY_JIT and trajectory_kernel.KERNEL_AVAILABLE and c.DRAG_MODEL == "reference":
+        [apogee, *outputs] = trajectory_kernel.calculate_trajectory_kernel_batch(
+            wetMass, mDotTotal, jetThrust, exitArea, exitPressure, burnTime, dragGeometry[0], curve
+        )
+        return [apogee * c.APOGEE_CORRECTION_FACTOR] + outputs
+
+    activeTables = []  # [wetMass, cumulativeImpulse, cumulativeMass, burnSteps] of each active rocket
+    if curve is not None:
+        activeTables = [
+            wetMass,
+            *thrust_curve.build_thrust_tables(jetThrust, mDotTotal, burnTime, curve),
+        ]
+
+    # Active state, compressed whenever rockets reach apogee
+    ids = np.arange(numberRockets)  # [1] index of each active rocket in the outputs
+    mass = wetMass.copy()  # [kg]
+    altitude = np.full(numberRockets, c.FAR_ALTITUDE)  # [m]
+    velocity = np.zeros(numberRockets)  # [m/s]
+    totalImpulse = np.zeros(numberRockets)  # [Ns]
+    maxAccel = np.full(numberRockets, -np.inf)  # [m/s^2]
+    maxDynamicPressure = np.zeros(numberRockets)  # [Pa]
+    maxMach = np.zeros(numberRockets)  # [1]
+    exitVelo = np.zeros(numberRockets)  # [m/s]
+    exitAccel = np.zeros(numberRockets)  # [m/s^2]
+    onRail = np.ones(numberRockets, dtype=bool)
+    activeParameters = [
+        mDotTotal,
+        jetThrust,
+        exitArea,
+        exitPressure,
+        burnTime,
+        *dragGeometry,
+    ]
+
+    # Outputs
+    apogee = np.zeros(numberRockets)  # [m]
+    outputs = [np.zeros(numberRockets) for _ in range(6)]
+    burnoutStates = []  # [ids, altitude, velocity, mass, *dragGeometry] of rockets left to coast
+
+    while len(ids) > 0:
+        (
+            activeMassFlow,
+            activeThrust,
+            activeExitArea,
+            activeExitPressure,
+            activeBurnTime,
+            *activeDragGeometry,
+        ) = activeParameters
+
+        pressure, rho, speedOfSound = atmosphere.get_atmosphere_array(altitude)
 
+        if curve is None:
+            burning = time < activeBurnTime
+            burnFraction = np.clip((activeBurnTime - time) / dt, 0, 1)  # [1] part of the step before burnout
+            mass = mass - activeMassFlow * dt * burnFraction  # [kg] mass of the rocket
+            thrust = np.where(
+                burning,
+                (activeThrust + (activeExitPressure - pressure) * activeExitArea) * burnFraction,
+                0,
+            )  # [N] force of thrust averaged over the step, accounting for pressure thrust
+        else:
+            activeWetMass, cumulativeImpulse, cumulativeMass, burnSteps = activeTables
+            burning = step < burnSteps
+            column = min(step, cumulativeImpulse.shape[1] - 2)  # tables are padded with burnout values
+            mass = activeWetMass - cumulativeMass[:, column + 1]  # [kg] mass of the rocket at the end of the step
+            jet = (
+                cumulativeImpulse[:, column + 1] - cumulativeImpulse[:, column]
+            ) / dt  # [N] average jet thrust over the step
+            thrust = np.where(
+                burning,
+                np.maximum(
+                    jet + (activeExitPressure * jet / activeThrust - pressure) * activeExitArea,
+                    0,
+                ),
+                0,
+            )  # [N] force of thrust, with the exit pressure following the chamber pressure
+        totalImpulse += thrust * dt  # Accumulate impulse
+
+        dynamicPressure = 0.5 * rho * velocity**2  # [Pa] dynamic pressure
+        drag = dynamicPressure * aerodynamics.get_drag_area_array(
+            velocity / speedOfSound, velocity, altitude, rho, burning, activeDragGeometry
+        )  # [N] force of drag
+        grav = c.GRAVITY * mass  # [N] force of gravity
+
+        accel = (thrust - drag - grav) / mass  # acceleration equation of motion
+
+        velocity = velocity + accel * dt  # velocity integration
         altitude = altitude + velocity * dt  # position integration
-        altitudeArray.append(altitude)
+        time = time + dt  # time step
+        step += 1
+
+        np.maximum(maxAccel, accel, out=maxAccel)
+        np.maximum(maxDynamicPressure, dynamicPressure, out=maxDynamicPressure)
+        np.maximum(maxMach, velocity / speedOfSound, out=maxMach)
+        leavingRail = onRail & (altitude >= railExitAltitude)
+        exitVelo[leavingRail] = velocity[leavingRail]
+        exitAccel[leavingRail] = accel[leavingRail]
+        onRail &= ~leavingRail
+
+        atApogee = velocity < 0
+        if c.TRAJECTORY_FAST_COAST:
+            # Rockets whose engine is off leave the loop and coast to apogee in closed form afterwards
+            burnedOut = time >= activeBurnTime if curve is None else step >= activeTables[3]
+            coasting = ~atApogee & ~onRail & burnedOut
+            if coasting.any():
+                burnoutStates.append(
+                    [
+                        ids[coasting],
+                        altitude[coasting],
+                        velocity[coasting],
+                        mass[coasting],
+                        *[parameter[coasting] for parameter in activeDragGeometry],
+                    ]
+                )
+                atApogee |= coasting
+
+        if atApogee.any():
+            finishedIds = ids[atApogee]
+            apogee[finishedIds] = altitude[atApogee]
+            for output, value in zip(
+                outputs,
+                (maxAccel, exitVelo, exitAccel, totalImpulse, maxDynamicPressure, maxMach),
+            ):
+                output[finishedIds] = value[atApogee]
+
+            keep = ~atApogee
+            ids = ids[keep]
+            mass = mass[keep]
+            altitude = altitude[keep]
+            velocity = velocity[keep]
+            totalImpulse = totalImpulse[keep]
+            maxAccel = maxAccel[keep]
+            maxDynamicPressure = maxDynamicPressure[keep]
+            maxMach = maxMach[keep]
+            exitVelo = exitVelo[keep]
+            exitAccel = exitAccel[keep]
+            onRail = onRail[keep]
+            activeParameters = [parameter[keep] for parameter in activeParameters]
+            activeTables = [table[keep] for table in activeTables]
+
+    if burnoutStates:
+        coastIds, coastAltitude, coastVelocity, coastMass, *coastGeometry = [
+            np.concatenate(values) for values in zip(*burnoutStates)
+        ]
+        [apogee[coastIds], coastDynamicPressure, coastMach] = calculate_coast_batch(
+            coastAltitude, coastVelocity, coastMass, coastGeometry
+        )
+        outputs[4][coastIds] = np.maximum(outputs[4][coastIds], coastDynamicPressure)
+        outputs[5][coastIds] = np.maximum(outputs[5][coastIds], coastMach)
+
+    return [apogee * c.APOGEE_CORRECTION_FACTOR] + outputs
+
+
+def calculate_coast(altitude, velocity, mass, dragGeometry):
+    """
+    Propagates a rocket from burnout to apogee in closed form. The climb is split into layers of
+    c.COAST_LAYER_THICKNESS in which density and the drag coefficient are held constant, and the vertical motion
+    with gravity and quadratic drag is solved exactly across each layer:
+        v^2 + g/k = (v0^2 + g/k) * exp(-2 k h),  k = rho * cD * A / (2 m)
+    Dynamic pressure and Mach number are sampled at every layer boundary.
+
+    Parameters
+    ----------
+    altitude : float
+        Burnout altitude [m].
+    velocity : float
+        Upward burnout velocity [m/s].
+    mass : float
+        Burnout mass [kg].
+    dragGeometry : list
+        Drag areas of the design from aerodynamics.calculate_drag_geometry.
+
+    Returns
+    -------
+    apogee : float
+        Apogee, without c.APOGEE_CORRECTION_FACTOR [m].
+    maxDynamicPressure : float
+        Maximum dynamic pressure during the coast [Pa].
+    maxMach : float
+        Maximum Mach number during the coast [-].
+    """
+
+    velocitySquared = max(velocity, 0) ** 2
+    maxDynamicPressure = 0
+    maxMach = 0
+
+    while True:
+        _, rho, speedOfSound = atmosphere.get_atmosphere(altitude)
+        maxDynamicPressure = max(maxDynamicPressure, 0.5 * rho * velocitySquared)
+        maxMach = max(maxMach, math.sqrt(velocitySquared) / speedOfSound)
+
+        # Layer from the current altitude to the next multiple of the layer thickness
+        top = (math.floor(altitude / c.COAST_LAYER_THICKNESS) + 1) * c.COAST_LAYER_THICKNESS
+        thickness = top - altitude
+        _, layerRho, _ = atmosphere.get_atmosphere(altitude + thickness / 2)
+        speed = math.sqrt(velocitySquared)
+        dragArea = aerodynamics.get_drag_area(
+            speed / speedOfSound, speed, altitude, rho, False, dragGeometry
+        )  # [m^2] drag area at the bottom of the layer
+        k = 0.5 * layerRho * dragArea / mass  # [1/m] quadratic drag constant
+
+        # exp(-2kh) written with expm1 so thin air reduces smoothly to the drag-free result
+        x = 2 * k * thickness
+        decay = -math.expm1(-x) / x if x > 0 else 1
+        nextVelocitySquared = velocitySquared * (1 - x * decay) - 2 * c.GRAVITY * thickness * decay
 
+        if nextVelocitySquared <= 0:
+            y = k * velocitySquared / c.GRAVITY
+            climb = velocitySquared / (2 * c.GRAVITY) * (
+                math.log1p(y) / y if y > 0 else 1
+            )  # [m] closed-form climb to apogee, with the same thin-air limit
+            return [altitude + climb, maxDynamicPressure, maxMach]
+
+        altitude = top
+        velocitySquared = nextVelocitySquared
+
+
+def calculate_coast_batch(altitude, velocity, mass, dragGeometry):
+    """
+    Vectorized version of calculate_coast. All rockets climb one layer per iteration, and rockets that reach
+    apogee are dropped from the active set.
+
+    Parameters
+    ----------
+    altitude : array_like
+        Burnout altitude of each rocket [m].
+    velocity : array_like
+        Upward burnout velocity of each rocket [m/s].
+    mass : array_like
+        Burnout mass of each rocket [kg].
+    dragGeometry : list of array_like
+        Drag areas of each design from aerodynamics.calculate_drag_geometry.
+
+    Returns
+    -------
+    apogee : numpy.ndarray
+        Apogee of each rocket, without c.APOGEE_CORRECTION_FACTOR [m].
+    maxDynamicPressure : numpy.ndarray
+        Maximum dynamic pressure during the coast [Pa].
+    maxMach : numpy.ndarray
+        Maximum Mach number during the coast [-].
+    """
+
+    altitude, velocity, mass, *dragGeometry = [
+        array.astype(float)
+        for array in np.broadcast_arrays(
+            *[np.atleast_1d(value) for value in (altitude, velocity, mass, *dragGeometry)]
+        )
+    ]
+    numberRockets = len(altitude)
+    apogee = altitude.copy()
+    maxDynamicPressure = np.zeros(numberRockets)
+    maxMach = np.zeros(numberRockets)
+
+    # Active state, compressed whenever rockets reach apogee
+    ids = np.arange(numberRockets)
+    velocitySquared = np.maximum(velocity, 0) ** 2
+    while len(ids) > 0:
+        _, rho, speedOfSound = atmosphere.get_atmosphere_array(altitude)
+        maxDynamicPressure[ids] = np.maximum(maxDynamicPressure[ids], 0.5 * rho * velocitySquared)
+        maxMach[ids] = np.maximum(maxMach[ids], np.sqrt(velocitySquared) / speedOfSound)
+
+        # Layer from the current altitude to the next multiple of the layer thickness
+        top = (np.floor(altitude / c.COAST_LAYER_THICKNESS) + 1) * c.COAST_LAYER_THICKNESS
+        thickness = top - altitude
+        _, layerRho, _ = atmosphere.get_atmosphere_array(altitude + thickness / 2)
+        speed = np.sqrt(velocitySquared)
+        dragArea = aerodynamics.get_drag_area_array(
+            speed / speedOfSound, speed, altitude, rho, False, dragGeometry
+        )  # [m^2] drag area at the bottom of the layer
+        k = 0.5 * layerRho * dragArea / mass  # [1/m] quadratic drag constant
+
+        # exp(-2kh) written with expm1 so thin air reduces smoothly to the drag-free result
+        x = 2 * k * thickness
+        decay = np.where(x > 0, -np.expm1(-x) / np.where(x > 0, x, 1), 1)
+        nextVelocitySquared = velocitySquared * (1 - x * decay) - 2 * c.GRAVITY * thickness * decay
+
+        atApogee = nextVelocitySquared <= 0
+        y = k * velocitySquared / c.GRAVITY
+        climb = velocitySquared / (2 * c.GRAVITY) * np.where(
+            y > 0, np.log1p(y) / np.where(y > 0, y, 1), 1
+        )  # [m] closed-form climb to apogee, with the same thin-air limit
+        apogee[ids[atApogee]] = altitude[atApogee] + climb[atApogee]
+
+        keep = ~atApogee
+        ids = ids[keep]
+        altitude = top[keep]
+        velocitySquared = nextVelocitySquared[keep]
+        mass = mass[keep]
+        dragGeometry = [parameter[keep] for parameter in dragGeometry]
+
+    return [apogee, maxDynamicPressure, maxMach]
+
+
+def calculate_trajectory_2d_batch(
+    wetMass,
+    mDotTotal,
+    jetThrust,
+    tankOD,
+    finNumber,
+    finHeight,
+    exitArea,
+    exitPressure,
+    burnTime,
+    totalLength,
+    railAngle=None,
+    windSpeed=None,
+    thrustCurve=None,
+    finRootChord=None,
+    finTipChord=None,
+):
+    """
+    Flies many rockets at once as 2-D point masses in the vertical plane of the wind. Rockets leave a rail tilted
+    from vertical, and once off the rail they weathercock: thrust points along the velocity relative to the air,
+    and drag opposes it. The wind blows downrange and may grow with height above the launch site as a power law.
+    Stepping and active-set compression are the same as calculate_trajectory_batch, which this reproduces with a
+    vertical rail and no wind when c.TRAJECTORY_FAST_COAST is off. The coast is always stepped here, as the
+    closed-form coast is only valid for vertical flight.
+
+    Parameters
+    ----------
+    wetMass, mDotTotal, jetThrust, tankOD, finNumber, finHeight, exitArea, exitPressure, burnTime,
+    totalLength : array_like
+        See calculate_trajectory_batch.
+    railAngle : array_like, optional
+        Rail angle from vertical, tilted downrange [rad]. Defaults to c.RAIL_ANGLE.
+    windSpeed : array_like, optional
+        Wind speed at c.WIND_REFERENCE_HEIGHT, positive downrange [m/s]. Defaults to c.WIND_SPEED.
+    thrustCurve : str or list, optional
+        Thrust and mass flow curve shared by every rocket, see calculate_trajectory. Defaults to
+        c.THRUST_CURVE.
+    finRootChord, finTipChord : array_like, optional
+        See calculate_trajectory_batch.
+
+    Returns
+    -------
+    altitude : numpy.ndarray
+        Final altitude of each rocket [m].
+    maxAccel : numpy.ndarray
+        Maximum acceleration along the flight path of each rocket [m/s^2].
+    exitVelo : numpy.ndarray
+        Rail exit velocity of each rocket [m/s].
+    exitAccel : numpy.ndarray
+        Rail exit acceleration of each rocket [m/s^2].
+    totalImpulse : numpy.ndarray
+        Total impulse of each rocket [Ns].
+    maxDynamicPressure : numpy.ndarray
+        Maximum dynamic pressure of each rocket [Pa].
+    maxMach : numpy.ndarray
+        Maximum Mach number of each rocket [-].
+    downrange : numpy.ndarray
+        Horizontal distance from the rail to apogee, positive downrange [m].
+    """
+
+    # Fin Chords
+    finRootChord = c.FIN_ROOT_CHORD if finRootChord is None else finRootChord  # [m]
+    finTipChord = c.FIN_TIP_CHORD if finTipChord is None else finTipChord  # [m]
+
+    railAngle = c.RAIL_ANGLE if railAngle is None else railAngle
+    windSpeed = c.WIND_SPEED if windSpeed is None else windSpeed
+    (
+        wetMass,
+        mDotTotal,
+        jetThrust,
+        tankOD,
+        finNumber,
+        finHeight,
+        exitArea,
+        exitPressure,
+        burnTime,
+        totalLength,
+        finRootChord,
+        finTipChord,
+        railAngle,
+        windSpeed,
+    ) = np.broadcast_arrays(
+        *[
+            np.atleast_1d(np.asarray(value, dtype=float))
+            for value in (
+                wetMass,
+                mDotTotal,
+                jetThrust,
+                tankOD,
+                finNumber,
+                finHeight,
+                exitArea,
+                exitPressure,
+                burnTime,
+                totalLength,
+                finRootChord,
+                finTipChord,
+                railAngle,
+                windSpeed,
+            )
+        ]
+    )
+    numberRockets = len(wetMass)
+
+    # Rocket Properties
+    dragGeometry = aerodynamics.calculate_drag_geometry(
+        tankOD, finNumber, finHeight, totalLength, finRootChord, finTipChord, exitArea
+    )  # drag areas of each design, see aerodynamics.calculate_drag_geometry
+
+    # Initial Conditions
+    dt = c.TRAJECTORY_TIME_STEP  # [s] time step of the rocket
+    time = 0  # [s] time shared by every rocket
+    step = 0  # [1] steps taken by every rocket
+
+    # Thrust Curve
+    curve = (
+        thrust_curve.DEFAULT_CURVE
+        if thrustCurve is None
+        else thrust_curve.load_thrust_curve(thrustCurve)
+    )
+    activeTables = []  # [wetMass, cumulativeImpulse, cumulativeMass, burnSteps] of each active rocket
+    if curve is not None:
+        activeTables = [
+            wetMass,
+            *thrust_curve.build_thrust_tables(jetThrust, mDotTotal, burnTime, curve),
+        ]
+
+    # Active state, compressed whenever rockets reach apogee
+    ids = np.arange(numberRockets)  # [1] index of each active rocket in the outputs
+    mass = wetMass.copy()  # [kg]
+    downrange = np.zeros(numberRockets)  # [m]
+    altitude = np.full(numberRockets, c.FAR_ALTITUDE)  # [m]
+    horizontalVelocity = np.zeros(numberRockets)  # [m/s]
+    verticalVelocity = np.zeros(numberRockets)  # [m/s]
+    totalImpulse = np.zeros(numberRockets)  # [Ns]
+    maxAccel = np.full(numberRockets, -np.inf)  # [m/s^2]
+    maxDynamicPressure = np.zeros(numberRockets)  # [Pa]
+    maxMach = np.zeros(numberRockets)  # [1]
+    exitVelo = np.zeros(numberRockets)  # [m/s]
+    exitAccel = np.zeros(numberRockets)  # [m/s^2]
+    onRail = np.ones(numberRockets, dtype=bool)
+    activeParameters = [
+        mDotTotal,
+        jetThrust,
+        exitArea,
+        exitPressure,
+        burnTime,
+        np.sin(railAngle),
+        np.cos(railAngle),
+        c.FAR_ALTITUDE + c.RAIL_HEIGHT * np.cos(railAngle),
+        windSpeed,
+        *dragGeometry,
+    ]
+
+    # Outputs
+    apogee = np.zeros(numberRockets)  # [m]
+    outputs = [np.zeros(numberRockets) for _ in range(7)]
+
+    while len(ids) > 0:
+        (
+            activeMassFlow,
+            activeThrust,
+            activeExitArea,
+            activeExitPressure,
+            activeBurnTime,
+            railSin,
+            railCos,
+            railExitAltitude,
+            activeWindSpeed,
+            *activeDragGeometry,
+        ) = activeParameters
+
+        pressure, rho, speedOfSound = atmosphere.get_atmosphere_array(altitude)
+        wind = activeWindSpeed * (
+            np.maximum(altitude - c.FAR_ALTITUDE, 0) / c.WIND_REFERENCE_HEIGHT
+        ) ** c.WIND_SHEAR_EXPONENT  # [m/s] wind at the current height
+
+        if curve is None:
+            burning = time < activeBurnTime
+            burnFraction = np.clip((activeBurnTime - time) / dt, 0, 1)  # [1] part of the step before burnout
+            mass = mass - activeMassFlow * dt * burnFraction  # [kg] mass of the rocket
+            thrust = np.where(
+                burning,
+                (activeThrust + (activeExitPressure - pressure) * activeExitArea) * burnFraction,
+                0,
+            )  # [N] force of thrust averaged over the step, accounting for pressure thrust
+        else:
+            activeWetMass, cumulativeImpulse, cumulativeMass, burnSteps = activeTables
+            burning = step < burnSteps
+            column = min(step, cumulativeImpulse.shape[1] - 2)  # tables are padded with burnout values
+            mass = activeWetMass - cumulativeMass[:, column + 1]  # [kg] mass of the rocket at the end of the step
+            jet = (
+                cumulativeImpulse[:, column + 1] - cumulativeImpulse[:, column]
+            ) / dt  # [N] average jet thrust over the step
+            thrust = np.where(
+                burning,
+                np.maximum(
+                    jet + (activeExitPressure * jet / activeThrust - pressure) * activeExitArea,
+                    0,
+                ),
+                0,
+            )  # [N] force of thrust, with the exit pressure following the chamber pressure
+        totalImpulse += thrust * dt  # Accumulate impulse
+
+        # Velocity relative to the air, and the heading of the rocket along the rail or into the relative wind
+        airHorizontal = horizontalVelocity - wind  # [m/s]
+        airspeed = np.hypot(airHorizontal, verticalVelocity)  # [m/s]
+        moving = airspeed > 0
+        safeAirspeed = np.where(moving, airspeed, 1)
+        airSin = np.where(moving, airHorizontal / safeAirspeed, 0)  # [1] air velocity direction
+        airCos = np.where(moving, verticalVelocity / safeAirspeed, 0)
+        headingSin = np.where(onRail | ~moving, railSin, airSin)  # [1] thrust direction
+        headingCos = np.where(onRail | ~moving, railCos, airCos)
+
+        dynamicPressure = 0.5 * rho * airspeed**2  # [Pa] dynamic pressure
+        drag = dynamicPressure * aerodynamics.get_drag_area_array(
+            airspeed / speedOfSound, airspeed, altitude, rho, burning, activeDragGeometry
+        )  # [N] force of drag
+
+        horizontalAccel = (thrust * headingSin - drag * airSin) / mass
+        verticalAccel = (thrust * headingCos - drag * airCos) / mass - c.GRAVITY
+        accel = horizontalAccel * headingSin + verticalAccel * headingCos  # along the heading
+        horizontalAccel = np.where(onRail, accel * railSin, horizontalAccel)  # the rail only allows motion along it
+        verticalAccel = np.where(onRail, accel * railCos, verticalAccel)
+
+        horizontalVelocity = horizontalVelocity + horizontalAccel * dt  # velocity integration
+        verticalVelocity = verticalVelocity + verticalAccel * dt
+        downrange = downrange + horizontalVelocity * dt  # position integration
+        altitude = altitude + verticalVelocity * dt
         time = time + dt  # time step
-        timeArray.append(time)
+        step += 1
 
-    # Find the closest altitude to the RAIL_HEIGHT
-    exitVelo, exitAccel = 0, 0
-    for i in range(len(altitudeArray)):
-        if altitudeArray[i] >= c.RAIL_HEIGHT:
-            exitVelo = velocityArray[i]
-            exitAccel = accelArray[i]
+        np.maximum(maxAccel, accel, out=maxAccel)
+        np.maximum(maxDynamicPressure, dynamicPressure, out=maxDynamicPressure)
+        np.maximum(
+            maxMach,
+            np.hypot(horizontalVelocity - wind, verticalVelocity) / speedOfSound,
+            out=maxMach,
+        )
+        leavingRail = onRail & (altitude >= railExitAltitude)
+        exitVelo[leavingRail] = np.hypot(
+            horizontalVelocity[leavingRail], verticalVelocity[leavingRail]
+        )
+        exitAccel[leavingRail] = accel[leavingRail]
+        onRail &= ~leavingRail
+
+        atApogee = verticalVelocity < 0
+        if atApogee.any():
+            finishedIds = ids[atApogee]
+            apogee[finishedIds] = altitude[atApogee]
+            for output, value in zip(
+                outputs,
+                (
+                    maxAccel,
+                    exitVelo,
+                    exitAccel,
+                    totalImpulse,
+                    maxDynamicPressure,
+                    maxMach,
+                    downrange,
+                ),
+            ):
+                output[finishedIds] = value[atApogee]
+
+            keep = ~atApogee
+            ids = ids[keep]
+            mass = mass[keep]
+            downrange = downrange[keep]
+            altitude = altitude[keep]
+            horizontalVelocity = horizontalVelocity[keep]
+            verticalVelocity = verticalVelocity[keep]
+            totalImpulse = totalImpulse[keep]
+            maxAccel = maxAccel[keep]
+            maxDynamicPressure = maxDynamicPressure[keep]
+            maxMach = maxMach[keep]
+            exitVelo = exitVelo[keep]
+            exitAccel = exitAccel[keep]
+            onRail = onRail[keep]
+            activeParameters = [parameter[keep] for parameter in activeParameters]
+            activeTables = [table[keep] for table in activeTables]
+
+    return [apogee * c.APOGEE_CORRECTION_FACTOR] + outputs
+
+
+def calculate_trajectory_adaptive(
+    wetMass,
+    mDotTotal,
+    jetThrust,
+    tankOD,
+    finNumber,
+    finHeight,
+    exitArea,
+    exitPressure,
+    burnTime,
+    totalLength,
+    plots,
+    thrustCurve=None,
+    finRootChord=None,
+    finTipChord=None,
+):
+    """
+    Integrates the same 1-D ascent as calculate_trajectory with an error-controlled embedded Runge-Kutta
+    method (Dormand-Prince 5(4)) with dense output. Burnout ends the powered phase exactly, while rail
+    exit and apogee are root-found as integrator events, so the coast can take large steps. A thrust curve is
+    followed continuously rather than averaged over time steps.
+
+    Parameters
+    ----------
+    wetMass : float
+        Wet mass of the rocket [kg].
+    mDotTotal : float
+        Total mass flow rate of the engine [kg/s].
+    jetThrust : float
+        Engine thrust [N].
+    tankOD : float
+        Outer diameter of the tank [m].
+    finNumber : int
+        Number of fins [-].
+    finHeight : float
+        Fin semi-span [m].
+    exitArea : float
+        Exit area of the nozzle [m^2].
+    exitPressure : float
+        Exit pressure of the nozzle [Pa].
+    burnTime : float
+        Burn time of the engine [s].
+    totalLength : float
+        Total Length of Rocket [m].
+    plots : bool
+        Boolean for plotting, 1 = on, 0 = off [-].
+    thrustCurve : str or list, optional
+        Thrust and mass flow curve, see calculate_trajectory. Defaults to c.THRUST_CURVE.
+    finRootChord : float, optional
+        Fin root chord [m]. Defaults to c.FIN_ROOT_CHORD.
+    finTipChord : float, optional
+        Fin tip chord [m]. Defaults to c.FIN_TIP_CHORD.
+
+    Returns
+    -------
+    altitude : float
+        Final altitude of the rocket [m].
+    maxAccel : float
+        Maximum acceleration of the rocket [m/s^2].
+    exitVelo : float
+        Rail exit velocity of the rocket [m/s].
+    exitAccel : float
+        Rail exit acceleration of the rocket [m/s^2].
+    totalImpulse : float
+        Total impulse of the rocket [Ns].
+    maxDynamicPressure : float
+        Maximum dynamic pressure of the rocket [Pa].
+    maxMach : float
+        Maximum Mach number of the rocket [-].
+    """
+
+    # Fin Chords
+    finRootChord = c.FIN_ROOT_CHORD if finRootChord is None else finRootChord  # [m]
+    finTipChord = c.FIN_TIP_CHORD if finTipChord is None else finTipChord  # [m]
+
+    # Rocket Properties
+    dragGeometry = aerodynamics.calculate_drag_geometry(
+        tankOD, finNumber, finHeight, totalLength, finRootChord, finTipChord, exitArea
+    )  # drag areas of the design, see aerodynamics.calculate_drag_geometry
+    burnoutMass = wetMass - mDotTotal * burnTime  # [kg] mass of the rocket after burnout
+    railExitAltitude = c.FAR_ALTITUDE + c.RAIL_HEIGHT  # [m] altitude at which the rocket leaves the rail
+
+    # Thrust Curve
+    curve = (
+        thrust_curve.DEFAULT_CURVE
+        if thrustCurve is None
+        else thrust_curve.load_thrust_curve(thrustCurve)
+    )
+    poweredTime = burnTime if curve is None else thrust_curve.calculate_burn_time(burnTime, curve)  # [s]
+
+    def powered_thrust(times, pressures):
+        # [kg], [N] mass and thrust at the given times of the burn
+        if curve is None:
+            return [wetMass - mDotTotal * times, jetThrust + (exitPressure - pressures) * exitArea]
+        timeFractions, thrustFractions, massFlowFractions = curve
+        burnFractions = times / poweredTime  # [1]
+        masses = wetMass - mDotTotal * poweredTime * thrust_curve.cumulative_integral(
+            timeFractions, massFlowFractions, burnFractions
+        )
+        jets = jetThrust * np.interp(burnFractions, timeFractions, thrustFractions)  # [N] jet thrust
+        thrusts = np.maximum(
+            jets + (exitPressure * jets / jetThrust - pressures) * exitArea, 0
+        )  # [N] with the exit pressure following the chamber pressure, as in calculate_trajectory
+        return [masses, thrusts]
+
+    def derivatives(time, state, burning):
+        altitude, velocity, _ = state
+        pressure, rho, speedOfSound = atmosphere.get_atmosphere(altitude)
+        if burning:
+            mass, thrust = powered_thrust(time, pressure)  # [kg], [N]
+        else:
+            mass = burnoutMass
+            thrust = 0
+        drag = (
+            0.5
+            * rho
+            * velocity**2
+            * aerodynamics.get_drag_area(
+                velocity / speedOfSound, velocity, altitude, rho, burning, dragGeometry
+            )
+        )  # [N] force of drag
+        return [velocity, (thrust - drag) / mass - c.GRAVITY, thrust]
+
+    def accelerations(times, altitudes, velocities, burning):
+        pressures, densities, speedsOfSound = atmosphere.get_atmosphere_array(altitudes)
+        if burning:
+            masses, thrusts = powered_thrust(times, pressures)
+        else:
+            masses = burnoutMass
+            thrusts = 0
+        dynamicPressures = 0.5 * densities * velocities**2
+        machs = velocities / speedsOfSound
+        dragAreas = aerodynamics.get_drag_area_array(
+            machs, velocities, altitudes, densities, burning, dragGeometry
+        )
+        accels = (thrusts - dynamicPressures * dragAreas) / masses - c.GRAVITY
+        return [accels, dynamicPressures, machs]
+
+    def rail_exit(time, state, burning):
+        return state[0] - railExitAltitude
+
+    rail_exit.direction = 1
+
+    def apogee(time, state, burning):
+        return state[1]
+
+    apogee.terminal = True
+    apogee.direction = -1
+
+    # Powered phase to burnout, then coast to apogee
+    phases = []
+    state = [c.FAR_ALTITUDE, 0, 0]
+    for burning, timeSpan in ((True, (0, poweredTime)), (False, (poweredTime, np.inf))):
+        if not burning:
+            # Bound the coast by a drag-free climb from burnout
+            timeSpan = (poweredTime, poweredTime + 2 * max(state[1], 0) / c.GRAVITY + 1)
+        solution = solve_ivp(
+            derivatives,
+            timeSpan,
+            state,
+            method="RK45",
+            dense_output=True,
+            events=[rail_exit, apogee],
+            args=(burning,),
+            rtol=c.TRAJECTORY_RELATIVE_TOLERANCE,
+            atol=c.TRAJECTORY_ABSOLUTE_TOLERANCE,
+        )
+        phases.append((burning, solution))
+        state = solution.y[:, -1]
+        if solution.status == 1:  # Apogee reached
             break
 
-    altitude = altitude * 0.651
+    # Events and running reductions sampled from the dense output
+    exitVelo, exitAccel = 0, 0
+    maxAccel, maxDynamicPressure, maxMach = -np.inf, 0, 0
+    for burning, solution in phases:
+        railExitTimes = solution.t_events[0]
+        if len(railExitTimes) > 0 and exitVelo == 0:
+            railExitState = solution.y_events[0][0]
+            exitVelo = railExitState[1]
+            exitAccel = accelerations(
+                railExitTimes[0], railExitState[0], railExitState[1], burning
+            )[0]
+
+        times = np.append(
+            np.arange(solution.t[0], solution.t[-1], c.TRAJECTORY_TIME_STEP),
+            solution.t[-1],
+        )
+        altitudes, velocities, _ = solution.sol(times)
+        accels, dynamicPressures, machs = accelerations(
+            times, altitudes, velocities, burning
+        )
+        maxAccel = max(maxAccel, np.max(accels))
+        maxDynamicPressure = max(maxDynamicPressure, np.max(dynamicPressures))
+        maxMach = max(maxMach, np.max(machs))
+
+    altitude, _, totalImpulse = state
+    altitude = altitude * c.APOGEE_CORRECTION_FACTOR
 
     if plots == 1:
         plt.figure(1)
         plt.title("Height v. Time")
-        plt.plot(timeArray, altitudeArray)
+        for _, solution in phases:
+            times = np.linspace(solution.t[0], solution.t[-1], 200)
+            plt.plot(times, solution.sol(times)[0])
         plt.ylabel("Height [m]")
         plt.xlabel("Time (s)")
         plt.grid()
@@ -148,8 +1349,598 @@ def calculate_trajectory(
 
     return [
         float(altitude),
-        float(max(accelArray)),
+        float(maxAccel),
         float(exitVelo),
         float(exitAccel),
         float(totalImpulse),
+        float(maxDynamicPressure),
+        float(maxMach),
     ]
+
+
+def estimate_trajectory(
+    wetMass,
+    mDotTotal,
+    jetThrust,
+    tankOD,
+    finNumber,
+    finHeight,
+    exitArea,
+    exitPressure,
+    burnTime,
+    totalLength,
+    calibration=None,
+    finRootChord=None,
+    finTipChord=None,
+):
+    """
+    Semi-analytic, low-fidelity version of calculate_trajectory for screening large design spaces. The burn
+    uses the rocket equation with gravity loss and an average-drag correction, and the coast uses the closed-form
+    drag-only vertical climb. Every operation is vectorized, so arrays of designs are estimated at once.
+
+    The drag coefficient is held constant, so the estimate is only valid for designs that stay below about Mach 1.5.
+    There, once calibrated, the apogee is typically within 1% of the numerical result and within 3% at worst, and
+    maximum dynamic pressure and Mach number within 7%. Faster designs spend their coast in the transonic drag rise
+    and are overestimated by up to a factor of two.
+
+    Parameters
+    ----------
+    wetMass : float or array_like
+        Wet mass of the rocket [kg].
+    mDotTotal : float or array_like
+        Total mass flow rate of the engine [kg/s].
+    jetThrust : float or array_like
+        Engine thrust [N].
+    tankOD : float or array_like
+        Outer diameter of the tank [m].
+    finNumber : int or array_like
+        Number of fins [-].
+    finHeight : float or array_like
+        Fin semi-span [m].
+    exitArea : float or array_like
+        Exit area of the nozzle [m^2].
+    exitPressure : float or array_like
+        Exit pressure of the nozzle [Pa].
+    burnTime : float or array_like
+        Burn time of the engine [s].
+    totalLength : float or array_like
+        Total Length of Rocket [m].
+    calibration : list, optional
+        Correction factors for each output from calibrate_estimate [-].
+    finRootChord : float or array_like, optional
+        Fin root chord, used by the "buildup" drag model [m]. Defaults to c.FIN_ROOT_CHORD.
+    finTipChord : float or array_like, optional
+        Fin tip chord, used by the "buildup" drag model [m]. Defaults to c.FIN_TIP_CHORD.
+
+    Returns
+    -------
+    altitude : float or numpy.ndarray
+        Final altitude of the rocket [m].
+    maxAccel : float or numpy.ndarray
+        Maximum acceleration of the rocket [m/s^2].
+    exitVelo : float or numpy.ndarray
+        Rail exit velocity of the rocket [m/s].
+    exitAccel : float or numpy.ndarray
+        Rail exit acceleration of the rocket [m/s^2].
+    totalImpulse : float or numpy.ndarray
+        Total impulse of the rocket [Ns].
+    maxDynamicPressure : float or numpy.ndarray
+        Maximum dynamic pressure of the rocket [Pa].
+    maxMach : float or numpy.ndarray
+        Maximum Mach number of the rocket [-].
+    """
+
+    # Fin Chords
+    finRootChord = c.FIN_ROOT_CHORD if finRootChord is None else finRootChord  # [m]
+    finTipChord = c.FIN_TIP_CHORD if finTipChord is None else finTipChord  # [m]
+
+    isScalar = np.ndim(wetMass) == 0
+    (
+        wetMass,
+        mDotTotal,
+        jetThrust,
+        tankOD,
+        finNumber,
+        finHeight,
+        exitArea,
+        exitPressure,
+        burnTime,
+        totalLength,
+        finRootChord,
+        finTipChord,
+    ) = [
+        np.asarray(value, dtype=float)
+        for value in (
+            wetMass,
+            mDotTotal,
+            jetThrust,
+            tankOD,
+            finNumber,
+            finHeight,
+            exitArea,
+            exitPressure,
+            burnTime,
+            totalLength,
+            finRootChord,
+            finTipChord,
+        )
+    ]
+
+    # Rocket Properties
+    referenceArea = (
+        np.pi * (tankOD) ** 2 / 4
+    ) + finNumber * finHeight * c.FIN_THICKNESS  # [m^2] reference area of the rocket
+
+    cD = c.DRAG_COEFFICIENT
+    ascentDragCoeff = cD * (totalLength / 6.35) * (tankOD / 0.203)
+    dragArea = ascentDragCoeff * referenceArea  # [m^2] drag coefficient times reference area
+    if c.DRAG_MODEL == "buildup":
+        # Component buildup at Mach 0.5 at the launch site, as a representative subsonic drag area
+        _, launchDensity, launchSpeedOfSound = atmosphere.get_atmosphere_array(c.FAR_ALTITUDE)
+        dragArea = aerodynamics.get_drag_area_array(
+            0.5,
+            0.5 * launchSpeedOfSound,
+            c.FAR_ALTITUDE,
+            launchDensity,
+            False,
+            aerodynamics.calculate_drag_geometry(
+                tankOD, finNumber, finHeight, totalLength, finRootChord, finTipChord, exitArea
+            ),
+        )
+    burnoutMass = wetMass - mDotTotal * burnTime  # [kg] mass of the rocket after burnout
+    averageMass = (wetMass + burnoutMass) / 2  # [kg] average mass during the burn
+    massRatio = wetMass / burnoutMass  # [1] rocket equation mass ratio
+
+    # Launch
+    launchPressure, launchDensity, _ = atmosphere.get_atmosphere_array(c.FAR_ALTITUDE)
+    launchThrust = jetThrust + (exitPressure - launchPressure) * exitArea  # [N] thrust at the pad
+    launchAccel = launchThrust / wetMass - c.GRAVITY  # [m/s^2] acceleration off the pad
+    exitVelo = np.sqrt(2 * np.maximum(launchAccel, 0) * c.RAIL_HEIGHT)  # [m/s] drag-free rail exit velocity
+
+    # Burn: rocket equation with gravity loss, with thrust evaluated at the drag-free mid-burn altitude
+    exhaustVelocity = launchThrust / mDotTotal  # [m/s] effective exhaust velocity at the pad
+    idealAltitude = (
+        exhaustVelocity * burnTime
+        - exhaustVelocity * (burnoutMass / mDotTotal) * np.log(massRatio)
+        - 0.5 * c.GRAVITY * burnTime**2
+    )  # [m] drag-free burnout altitude
+    burnPressure, burnDensity, _ = atmosphere.get_atmosphere_array(
+        c.FAR_ALTITUDE + idealAltitude / 2
+    )
+    burnThrust = jetThrust + (exitPressure - burnPressure) * exitArea  # [N] average thrust
+    exhaustVelocity = burnThrust / mDotTotal  # [m/s] average effective exhaust velocity
+    idealVelocity = (
+        exhaustVelocity * np.log(massRatio) - c.GRAVITY * burnTime
+    )  # [m/s] drag-free burnout velocity
+    idealAltitude = (
+        exhaustVelocity * burnTime
+        - exhaustVelocity * (burnoutMass / mDotTotal) * np.log(massRatio)
+        - 0.5 * c.GRAVITY * burnTime**2
+    )  # [m] drag-free burnout altitude
+
+    # Average-drag correction: velocity grows roughly linearly, so the mean of v^2 is a third of its final value
+    dragLoss = (
+        0.5 * burnDensity * dragArea * idealVelocity**2 / 3 * burnTime / averageMass
+    )  # [m/s] velocity lost to drag during the burn
+    burnoutVelocity = np.maximum(idealVelocity - dragLoss, 0)  # [m/s]
+    burnoutAltitude = c.FAR_ALTITUDE + np.maximum(
+        idealAltitude - dragLoss * burnTime / 4, 0
+    )  # [m] drag loss grows roughly with t^3, so the altitude loss is a quarter of dragLoss * burnTime
+
+    # Coast: closed-form vertical climb with quadratic drag at a representative density
+    _, burnoutDensity, burnoutSpeedOfSound = atmosphere.get_atmosphere_array(
+        burnoutAltitude
+    )
+    coastHeight = burnoutVelocity**2 / (2 * c.GRAVITY)  # [m] drag-free coast height
+    for _ in range(2):
+        _, coastDensity, _ = atmosphere.get_atmosphere_array(
+            burnoutAltitude + coastHeight / 3
+        )
+        dragConstant = 0.5 * coastDensity * dragArea  # [kg/m] quadratic drag constant
+        coastHeight = (
+            burnoutMass
+            / (2 * dragConstant)
+            * np.log1p(dragConstant * burnoutVelocity**2 / (burnoutMass * c.GRAVITY))
+        )  # [m] drag-only coast height
+
+    altitude = (burnoutAltitude + coastHeight) * c.APOGEE_CORRECTION_FACTOR
+    burnoutAccel = (
+        burnThrust - 0.5 * burnoutDensity * burnoutVelocity**2 * dragArea
+    ) / burnoutMass - c.GRAVITY  # [m/s^2] acceleration just before burnout
+    maxAccel = np.maximum(launchAccel, burnoutAccel)
+    totalImpulse = burnThrust * burnTime
+    maxDynamicPressure = 0.5 * burnoutDensity * burnoutVelocity**2
+    maxMach = burnoutVelocity / burnoutSpeedOfSound
+
+    outputs = [
+        altitude,
+        maxAccel,
+        exitVelo,
+        launchAccel,
+        totalImpulse,
+        maxDynamicPressure,
+        maxMach,
+    ]
+    if calibration is not None:
+        outputs = [output * factor for output, factor in zip(outputs, calibration)]
+    if isScalar:
+        return [float(output) for output in outputs]
+    return [np.broadcast_to(output, wetMass.shape).astype(float) for output in outputs]
+
+
+def calibrate_estimate(
+    wetMass,
+    mDotTotal,
+    jetThrust,
+    tankOD,
+    finNumber,
+    finHeight,
+    exitArea,
+    exitPressure,
+    burnTime,
+    totalLength,
+    finRootChord=None,
+    finTipChord=None,
+):
+    """
+    Calibrates estimate_trajectory against the numerical integrator. The sample designs are flown with
+    calculate_trajectory_batch and the median ratio of numerical to estimated value is taken as the correction
+    factor for each output, which keeps a few poorly modelled designs from skewing the calibration.
+
+    Parameters
+    ----------
+    wetMass, mDotTotal, jetThrust, tankOD, finNumber, finHeight, exitArea, exitPressure, burnTime,
+    totalLength : array_like
+        Inputs of the sample designs, as in calculate_trajectory_batch.
+    finRootChord, finTipChord : array_like, optional
+        Fin chords of the sample designs, as in calculate_trajectory_batch.
+
+    Returns
+    -------
+    calibration : list
+        Correction factor for each output of estimate_trajectory [-].
+    """
+
+    inputs = [
+        wetMass,
+        mDotTotal,
+        jetThrust,
+        tankOD,
+        finNumber,
+        finHeight,
+        exitArea,
+        exitPressure,
+        burnTime,
+        totalLength,
+    ]
+    chords = {"finRootChord": finRootChord, "finTipChord": finTipChord}
+    numerical = calculate_trajectory_batch(*inputs, **chords)
+    estimated = estimate_trajectory(*[np.atleast_1d(value) for value in inputs], **chords)
+
+    calibration = []
+    for exact, estimate in zip(numerical, estimated):
+        valid = (exact > 0) & (estimate > 0)
+        calibration.append(
+            float(np.median(exact[valid] / estimate[valid])) if valid.any() else 1.0
+        )
+
+    return calibration
+
+
+def quantize_trajectory_inputs(trajectoryInputs):
+    """
+    Rounds trajectory inputs to the cache tolerances in constants.py so nearly identical designs share a key.
+
+    Parameters
+    ----------
+    trajectoryInputs : array_like
+        One row per rocket holding the calculate_trajectory inputs from wetMass to finTipChord.
+
+    Returns
+    -------
+    quantizedInputs : numpy.ndarray
+        Inputs rounded to the nearest multiple of their tolerance.
+    """
+
+    tolerances = np.array(
+        [
+            c.TRAJECTORY_CACHE_MASS_TOLERANCE,  # wetMass
+            c.TRAJECTORY_CACHE_MASS_FLOW_TOLERANCE,  # mDotTotal
+            c.TRAJECTORY_CACHE_THRUST_TOLERANCE,  # jetThrust
+            c.TRAJECTORY_CACHE_GEOMETRY_TOLERANCE,  # tankOD
+            1,  # finNumber
+            c.TRAJECTORY_CACHE_GEOMETRY_TOLERANCE,  # finHeight
+            c.TRAJECTORY_CACHE_AREA_TOLERANCE,  # exitArea
+            c.TRAJECTORY_CACHE_PRESSURE_TOLERANCE,  # exitPressure
+            c.TRAJECTORY_CACHE_TIME_TOLERANCE,  # burnTime
+            c.TRAJECTORY_CACHE_GEOMETRY_TOLERANCE,  # totalLength
+            c.TRAJECTORY_CACHE_GEOMETRY_TOLERANCE,  # finRootChord
+            c.TRAJECTORY_CACHE_GEOMETRY_TOLERANCE,  # finTipChord
+        ]
+    )
+
+    return np.round(np.asarray(trajectoryInputs, dtype=float) / tolerances) * tolerances
+
+
+def get_trajectory_cache_info():
+    """
+    Reports the trajectory cache counters.
+
+    Returns
+    -------
+    hits : int
+        Number of rockets served from the cache, including duplicates within one call [-].
+    misses : int
+        Number of unique rockets that had to be flown [-].
+    size : int
+        Number of trajectories currently cached [-].
+    """
+
+    return [trajectoryCacheStats["hits"], trajectoryCacheStats["misses"], len(trajectoryCache)]
+
+
+def get_trajectory_settings():
+    """
+    Current values of the constants in TRAJECTORY_CACHE_SETTINGS.
+
+    Returns
+    -------
+    settings : tuple
+        Value of each setting, in the order of TRAJECTORY_CACHE_SETTINGS.
+    """
+
+    return tuple(getattr(c, name) for name in TRAJECTORY_CACHE_SETTINGS)
+
+
+def clear_trajectory_cache():
+    """
+    Empties the trajectory cache and resets its counters.
+    """
+
+    trajectoryCache.clear()
+    trajectoryCacheStats["hits"] = 0
+    trajectoryCacheStats["misses"] = 0
+
+
+def calculate_trajectories(trajectoryInputs, model=None):
+    """
+    Flies a set of rockets with the selected trajectory model. Results of the numerical models are memoized in
+    a bounded LRU cache keyed on the model, the settings in TRAJECTORY_CACHE_SETTINGS and the inputs quantized to
+    the tolerances in constants.py, so repeated designs within a sweep and across the pressure-fed and pump-fed
+    branches are only flown once.
+
+    Parameters
+    ----------
+    trajectoryInputs : array_like
+        One row per rocket holding the calculate_trajectory inputs from wetMass to finTipChord.
+    model : str, optional
+        "euler" (batched calculate_trajectory), "adaptive" (calculate_trajectory_adaptive), "estimate"
+        (estimate_trajectory calibrated on a sample of numerical flights) or "surrogate" (response surface fit to a
+        sample of numerical flights, see fly_surrogate_trajectories) or "2d" (calculate_trajectory_2d_batch with
+        the rail angle and wind in constants.py). Defaults to c.TRAJECTORY_MODEL.
+
+    Returns
+    -------
+    outputs : list of numpy.ndarray
+        The seven calculate_trajectory outputs for every rocket.
+    """
+
+    model = c.TRAJECTORY_MODEL if model is None else model
+    trajectoryInputs = np.array(trajectoryInputs, dtype=float).reshape(-1, 12)
+
+    # The calibrated estimate and the surrogate depend on the whole set of rockets, so they are not cached
+    if c.TRAJECTORY_CACHE_SIZE <= 0 or model in ("estimate", "surrogate"):
+        return fly_trajectories(trajectoryInputs, model)
+
+    # Look up every rocket, grouping repeated misses so each unique design is flown once. The quantized inputs are
+    # only the key, a miss flies the first rocket of its group as given
+    quantizedInputs = quantize_trajectory_inputs(trajectoryInputs)
+    results = np.empty((len(quantizedInputs), 7))
+    missingRows = OrderedDict()  # Cache key to the rows that need it
+    settings = get_trajectory_settings()
+    for row, values in enumerate(quantizedInputs.tolist()):
+        key = (model, settings, *values)
+        if key in trajectoryCache:
+            trajectoryCache.move_to_end(key)
+            results[row] = trajectoryCache[key]
+            trajectoryCacheStats["hits"] += 1
+        elif key in missingRows:
+            missingRows[key].append(row)
+            trajectoryCacheStats["hits"] += 1
+        else:
+            missingRows[key] = [row]
+            trajectoryCacheStats["misses"] += 1
+
+    if missingRows:
+        flownInputs = trajectoryInputs[[rows[0] for rows in missingRows.values()]]
+        flownResults = np.array(fly_trajectories(flownInputs, model)).T
+        for (key, rows), flownResult in zip(missingRows.items(), flownResults):
+            results[rows] = flownResult
+            trajectoryCache[key] = flownResult
+        while len(trajectoryCache) > c.TRAJECTORY_CACHE_SIZE:
+            trajectoryCache.popitem(last=False)  # Evict the least recently used trajectory
+
+    return list(results.T)
+
+
+def fly_trajectories(trajectoryInputs, model):
+    """
+    Flies a set of rockets with the given trajectory model, bypassing the cache.
+
+    Parameters
+    ----------
+    trajectoryInputs : numpy.ndarray
+        One row per rocket holding the calculate_trajectory inputs from wetMass to finTipChord.
+    model : str
+        "euler", "adaptive", "estimate", "surrogate" or "2d", see calculate_trajectories.
+
+    Returns
+    -------
+    outputs : list of numpy.ndarray
+        The seven calculate_trajectory outputs for every rocket.
+    """
+
+    columns = list(trajectoryInputs[:, :10].T)
+    chords = {"finRootChord": trajectoryInputs[:, 10], "finTipChord": trajectoryInputs[:, 11]}
+
+    if model == "euler":
+        return calculate_trajectory_batch(*columns, **chords)
+    if model == "adaptive":
+        results = [
+            calculate_trajectory_adaptive(*row[:10], 0, finRootChord=row[10], finTipChord=row[11])
+            for row in trajectoryInputs
+        ]
+        return list(np.array(results, dtype=float).reshape(-1, 7).T)
+    if model == "estimate":
+        sample = np.unique(
+            np.linspace(
+                0, len(trajectoryInputs) - 1, c.TRAJECTORY_CALIBRATION_SAMPLES
+            ).astype(int)
+        )
+        calibration = None
+        if len(trajectoryInputs) > 0:
+            calibration = calibrate_estimate(
+                *trajectoryInputs[sample, :10].T,
+                finRootChord=trajectoryInputs[sample, 10],
+                finTipChord=trajectoryInputs[sample, 11],
+            )
+        return estimate_trajectory(*columns, calibration=calibration, **chords)
+    if model == "surrogate":
+        return fly_surrogate_trajectories(trajectoryInputs)
+    if model == "2d":
+        return calculate_trajectory_2d_batch(*columns, **chords)[:7]
+
+    raise ValueError(f"Unknown trajectory model: {model}")
+
+
+def fly_surrogate_trajectories(trajectoryInputs):
+    """
+    Flies a set of rockets with a response surface fit to a sample of them. The sample is flown with
+    c.TRAJECTORY_SURROGATE_TRAINING_MODEL, and every rocket that lies outside the bounds of the sample or whose
+    predicted apogee or maximum acceleration is less certain than c.TRAJECTORY_SURROGATE_TOLERANCE is flown
+    with the same model instead. Both the sample and the fallback go through the trajectory cache.
+
+    Parameters
+    ----------
+    trajectoryInputs : numpy.ndarray
+        One row per rocket holding the calculate_trajectory inputs from wetMass to finTipChord.
+
+    Returns
+    -------
+    outputs : list of numpy.ndarray
+        The seven calculate_trajectory outputs for every rocket.
+    """
+
+    trainingModel = c.TRAJECTORY_SURROGATE_TRAINING_MODEL
+    if len(trajectoryInputs) <= c.TRAJECTORY_SURROGATE_SAMPLES:
+        return calculate_trajectories(trajectoryInputs, trainingModel)
+
+    sample = np.unique(
+        np.linspace(0, len(trajectoryInputs) - 1, c.TRAJECTORY_SURROGATE_SAMPLES).astype(int)
+    )
+    sampleResults = np.array(
+        calculate_trajectories(trajectoryInputs[sample], trainingModel)
+    ).T
+
+    # The surface is fit in log space, so rockets that never leave the ground cannot be used for training
+    valid = np.all(sampleResults > 0, axis=1) & np.all(trajectoryInputs[sample] > 0, axis=1)
+    results = np.empty((len(trajectoryInputs), 7))
+    fallback = np.ones(len(trajectoryInputs), dtype=bool)
+    if np.any(valid):
+        fit = surrogate.fit_surrogate(trajectoryInputs[sample][valid], sampleResults[valid])
+        predictable = np.all(trajectoryInputs > 0, axis=1)
+        predictions, uncertainties, inBounds = surrogate.predict_surrogate(
+            fit, trajectoryInputs[predictable]
+        )
+        certain = inBounds & np.all(
+            uncertainties[:, :2] <= c.TRAJECTORY_SURROGATE_TOLERANCE, axis=1
+        )  # Apogee and maximum acceleration
+        results[predictable] = predictions
+        fallback[predictable] = ~certain
+
+    fallback[sample] = True  # Already flown, so keep the real results
+    if np.any(fallback):
+        results[fallback] = np.array(
+            calculate_trajectories(trajectoryInputs[fallback], trainingModel)
+        ).T
+
+    return list(results.T)
+
+
+def calculate_dispersions(trajectoryInputs, samples=None, seed=None):
+    """
+    Monte Carlo flight dispersion. Every rocket is flown many times with normally distributed thrust, specific
+    impulse, drag coefficient and dry mass errors, all samples of all rockets at once with calculate_trajectory_batch.
+    Thrust and specific impulse errors change the mass flow rate and the burn time at a fixed propellant load.
+
+    Parameters
+    ----------
+    trajectoryInputs : array_like
+        One row per rocket holding the calculate_trajectory inputs from wetMass to finTipChord.
+    samples : int, optional
+        Number of samples per rocket [-]. Defaults to c.DISPERSION_SAMPLES.
+    seed : int, optional
+        Seed of the random number generator, for repeatable dispersions.
+
+    Returns
+    -------
+    altitudePercentiles : numpy.ndarray
+        Apogee at each of c.DISPERSION_PERCENTILES, one row per rocket [m].
+    exitVeloPercentiles : numpy.ndarray
+        Rail exit velocity at each of c.DISPERSION_PERCENTILES, one row per rocket [m/s].
+    """
+
+    samples = c.DISPERSION_SAMPLES if samples is None else samples
+    trajectoryInputs = np.array(trajectoryInputs, dtype=float).reshape(-1, 12)
+    numberRockets = len(trajectoryInputs)
+    rng = np.random.default_rng(seed)
+
+    (
+        wetMass,
+        mDotTotal,
+        jetThrust,
+        tankOD,
+        finNumber,
+        finHeight,
+        exitArea,
+        exitPressure,
+        burnTime,
+        totalLength,
+        finRootChord,
+        finTipChord,
+    ) = np.repeat(trajectoryInputs, samples, axis=0).T  # Samples of each rocket are contiguous
+
+    shape = numberRockets * samples
+    thrustFactor = rng.normal(1, c.DISPERSION_THRUST_SIGMA, shape)
+    ispFactor = rng.normal(1, c.DISPERSION_ISP_SIGMA, shape)
+    dragFactor = rng.normal(1, c.DISPERSION_DRAG_SIGMA, shape)
+    massFactor = rng.normal(1, c.DISPERSION_MASS_SIGMA, shape)
+
+    propellantMass = mDotTotal * burnTime  # [kg] propellant load, held fixed
+    dispersedMassFlow = mDotTotal * thrustFactor / ispFactor  # [kg/s] mass flow for the dispersed thrust and Isp
+    dispersedWetMass = (wetMass - propellantMass) * massFactor + propellantMass  # [kg] dry mass error only
+
+    [altitude, _, exitVelo, *_] = calculate_trajectory_batch(
+        dispersedWetMass,
+        dispersedMassFlow,
+        jetThrust * thrustFactor,
+        tankOD,
+        finNumber,
+        finHeight,
+        exitArea,
+        exitPressure,
+        propellantMass / dispersedMassFlow,
+        totalLength,
+        dragMultiplier=dragFactor,
+        finRootChord=finRootChord,
+        finTipChord=finTipChord,
+    )
+
+    altitudePercentiles = np.percentile(
+        altitude.reshape(numberRockets, samples), c.DISPERSION_PERCENTILES, axis=1
+    ).T
+    exitVeloPercentiles = np.percentile(
+        exitVelo.reshape(numberRockets, samples), c.DISPERSION_PERCENTILES, axis=1
+    ).T
+
+    return [altitudePercentiles, exitVeloPercentiles]
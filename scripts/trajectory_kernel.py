@@ -0,0 +1,485 @@
+# Rocket 4 Trajectory Kernel Script
+# Description: The Euler ascent of calculate_trajectory and calculate_trajectory_batch, written as functions of plain
+# floats and arrays (atmosphere table, drag table, thrust parameters and thrust curve tables) so they can be compiled
+# with numba. The kernel covers the "reference" drag model, with constant thrust or a thrust curve; the "buildup"
+# model and flights that record a history stay on the Python integrators. When numba is installed the kernel and its
+# helpers are JIT-compiled on first use and cached on disk. Without it, KERNEL_AVAILABLE is False and the trajectory
+# functions keep their pure-Python paths. The functions still run uncompiled, which is what the parity test exercises.
+
+import math
+import os
+import sys
+
+import numpy as np
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import constants as c
+from scripts import aerodynamics, atmosphere, thrust_curve
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+KERNEL_AVAILABLE = numba is not None  # [bool] The kernel is compiled
+
+
+def interpolate_atmosphere(altitude, altitudeStart, altitudeStep, pressures, densities, speedsOfSound):
+    """
+    Same lookup as atmosphere.get_atmosphere, on tables passed in.
+
+    Parameters
+    ----------
+    altitude : float
+        Geometric altitude above sea level [m].
+    altitudeStart : float
+        First altitude in the table [m].
+    altitudeStep : float
+        Uniform altitude spacing of the table [m].
+    pressures, densities, speedsOfSound : numpy.ndarray
+        Table columns [Pa], [kg/m^3], [m/s].
+
+    Returns
+    -------
+    pressure : float
+        Static pressure [Pa].
+    density : float
+        Density [kg/m^3].
+    speedOfSound : float
+        Speed of sound [m/s].
+    """
+
+    lastIndex = len(pressures) - 1
+    position = (altitude - altitudeStart) / altitudeStep
+    if position <= 0:
+        index = 0
+        fraction = 0.0
+    elif position >= lastIndex:
+        index = lastIndex - 1
+        fraction = 1.0
+    else:
+        index = int(position)
+        fraction = position - index
+
+    pressure = pressures[index] + fraction * (pressures[index + 1] - pressures[index])
+    density = densities[index] + fraction * (densities[index + 1] - densities[index])
+    speedOfSound = speedsOfSound[index] + fraction * (speedsOfSound[index + 1] - speedsOfSound[index])
+
+    return pressure, density, speedOfSound
+
+
+def interpolate_drag(mach, machStep, coefficients):
+    """
+    Same lookup as aerodynamics.get_drag_coefficient, on a table passed in.
+
+    Parameters
+    ----------
+    mach : float
+        Mach number [-].
+    machStep : float
+        Mach spacing of the table [-].
+    coefficients : numpy.ndarray
+        Power-on or power-off drag coefficients on the uniform Mach grid [-].
+
+    Returns
+    -------
+    dragCoefficient : float
+        Drag coefficient of the reference vehicle [-].
+    """
+
+    lastIndex = len(coefficients) - 1
+    position = abs(mach) / machStep
+    if position >= lastIndex:
+        return coefficients[lastIndex]
+
+    index = int(position)
+    fraction = position - index
+    return coefficients[index] + fraction * (coefficients[index + 1] - coefficients[index])
+
+
+if numba is not None:
+    interpolate_atmosphere = numba.njit(cache=True)(interpolate_atmosphere)
+    interpolate_drag = numba.njit(cache=True)(interpolate_drag)
+
+
+def integrate_ascent(
+    wetMass,
+    mDotTotal,
+    jetThrust,
+    exitArea,
+    exitPressure,
+    burnTime,
+    dragScale,
+    cumulativeImpulse,
+    cumulativeMass,
+    burnSteps,
+    dt,
+    gravity,
+    launchAltitude,
+    railExitAltitude,
+    fastCoast,
+    layerThickness,
+    altitudeStart,
+    altitudeStep,
+    pressures,
+    densities,
+    speedsOfSound,
+    machStep,
+    powerOffCoefficients,
+    powerOnCoefficients,
+):
+    """
+    Euler ascent to apogee, stepping the same equations as calculate_trajectory and, with fastCoast, finishing with
+    the layered closed-form coast of calculate_coast.
+
+    Parameters
+    ----------
+    wetMass, mDotTotal, jetThrust, exitArea, exitPressure, burnTime : float
+        Rocket inputs, see calculate_trajectory [kg], [kg/s], [N], [m^2], [Pa], [s].
+    dragScale : float
+        Drag area per unit drag coefficient [m^2].
+    cumulativeImpulse, cumulativeMass : numpy.ndarray
+        Thrust curve tables of the rocket, see thrust_curve.build_thrust_tables [Ns], [kg]. Unused for constant thrust.
+    burnSteps : int
+        Steps with the engine on along the thrust curve, or -1 for constant thrust [-].
+    dt : float
+        Time step [s].
+    gravity : float
+        Acceleration due to gravity [m/s^2].
+    launchAltitude : float
+        Altitude of the launch site [m].
+    railExitAltitude : float
+        Altitude at which the rocket leaves the rail [m].
+    fastCoast : bool
+        Coast to apogee in closed form once the engine is off and the rocket is off the rail.
+    layerThickness : float
+        Thickness of the constant-density layers of the closed-form coast [m].
+    altitudeStart, altitudeStep, pressures, densities, speedsOfSound
+        Atmosphere table, see interpolate_atmosphere.
+    machStep, powerOffCoefficients, powerOnCoefficients
+        Drag table, see interpolate_drag.
+
+    Returns
+    -------
+    altitude : float
+        Apogee, without c.APOGEE_CORRECTION_FACTOR [m].
+    maxAccel : float
+        Maximum acceleration [m/s^2].
+    exitVelo : float
+        Rail exit velocity [m/s].
+    exitAccel : float
+        Rail exit acceleration [m/s^2].
+    totalImpulse : float
+        Total impulse [Ns].
+    maxDynamicPressure : float
+        Maximum dynamic pressure [Pa].
+    maxMach : float
+        Maximum Mach number [-].
+    """
+
+    mass = wetMass
+    altitude = launchAltitude
+    velocity = 0.0
+    time = 0.0
+    step = 0
+    lastColumn = len(cumulativeImpulse) - 2
+
+    totalImpulse = 0.0
+    maxAccel = -math.inf
+    maxDynamicPressure = 0.0
+    maxMach = 0.0
+    exitVelo = 0.0
+    exitAccel = 0.0
+    onRail = True
+
+    while velocity >= 0:
+        pressure, rho, speedOfSound = interpolate_atmosphere(
+            altitude, altitudeStart, altitudeStep, pressures, densities, speedsOfSound
+        )
+
+        burning = time < burnTime if burnSteps < 0 else step < burnSteps
+        if burning and burnSteps < 0:
+            burnFraction = min((burnTime - time) / dt, 1.0)
+            mass = mass - mDotTotal * dt * burnFraction
+            thrust = (jetThrust + (exitPressure - pressure) * exitArea) * burnFraction
+        elif burning:
+            column = min(step, lastColumn)
+            mass = wetMass - cumulativeMass[column + 1]
+            jet = (cumulativeImpulse[column + 1] - cumulativeImpulse[column]) / dt
+            thrust = max(jet + (exitPressure * jet / jetThrust - pressure) * exitArea, 0.0)
+        else:
+            thrust = 0.0
+        totalImpulse += thrust * dt
+        coefficients = powerOnCoefficients if burning else powerOffCoefficients
+
+        dynamicPressure = 0.5 * rho * velocity**2
+        drag = dynamicPressure * interpolate_drag(velocity / speedOfSound, machStep, coefficients) * dragScale
+        accel = (thrust - drag - gravity * mass) / mass
+
+        velocity += accel * dt
+        altitude = altitude + velocity * dt
+        time = time + dt
+        step += 1
+
+        if accel > maxAccel:
+            maxAccel = accel
+        if dynamicPressure > maxDynamicPressure:
+            maxDynamicPressure = dynamicPressure
+        if velocity / speedOfSound > maxMach:
+            maxMach = velocity / speedOfSound
+        if onRail and altitude >= railExitAltitude:
+            exitVelo = velocity
+            exitAccel = accel
+            onRail = False
+
+        burnedOut = time >= burnTime if burnSteps < 0 else step >= burnSteps
+        if fastCoast and not onRail and burnedOut and velocity > 0:
+            # Layered closed-form coast, as in calculate_coast
+            velocitySquared = velocity**2
+            while True:
+                _, rho, speedOfSound = interpolate_atmosphere(
+                    altitude, altitudeStart, altitudeStep, pressures, densities, speedsOfSound
+                )
+                maxDynamicPressure = max(maxDynamicPressure, 0.5 * rho * velocitySquared)
+                maxMach = max(maxMach, math.sqrt(velocitySquared) / speedOfSound)
+
+                top = (math.floor(altitude / layerThickness) + 1) * layerThickness
+                thickness = top - altitude
+                _, layerRho, _ = interpolate_atmosphere(
+                    altitude + thickness / 2, altitudeStart, altitudeStep, pressures, densities, speedsOfSound
+                )
+                cD = interpolate_drag(math.sqrt(velocitySquared) / speedOfSound, machStep, powerOffCoefficients)
+                k = 0.5 * layerRho * cD * dragScale / mass
+
+                x = 2 * k * thickness
+                decay = -math.expm1(-x) / x if x > 0 else 1.0
+                nextVelocitySquared = velocitySquared * (1 - x * decay) - 2 * gravity * thickness * decay
+
+                if nextVelocitySquared <= 0:
+                    y = k * velocitySquared / gravity
+                    altitude = altitude + velocitySquared / (2 * gravity) * (math.log1p(y) / y if y > 0 else 1.0)
+                    break
+
+                altitude = top
+                velocitySquared = nextVelocitySquared
+            break
+
+    return altitude, maxAccel, exitVelo, exitAccel, totalImpulse, maxDynamicPressure, maxMach
+
+
+if numba is not None:
+    integrate_ascent = numba.njit(cache=True)(integrate_ascent)
+
+
+def integrate_ascents(
+    wetMass,
+    mDotTotal,
+    jetThrust,
+    exitArea,
+    exitPressure,
+    burnTime,
+    dragScale,
+    cumulativeImpulse,
+    cumulativeMass,
+    burnSteps,
+    dt,
+    gravity,
+    launchAltitude,
+    railExitAltitude,
+    fastCoast,
+    layerThickness,
+    altitudeStart,
+    altitudeStep,
+    pressures,
+    densities,
+    speedsOfSound,
+    machStep,
+    powerOffCoefficients,
+    powerOnCoefficients,
+):
+    """
+    integrate_ascent for many rockets, one after the other in a single compiled loop.
+
+    Parameters
+    ----------
+    wetMass, mDotTotal, jetThrust, exitArea, exitPressure, burnTime, dragScale : numpy.ndarray
+        integrate_ascent inputs of each rocket.
+    cumulativeImpulse, cumulativeMass : numpy.ndarray
+        Thrust curve tables, one row per rocket [Ns], [kg].
+    burnSteps : numpy.ndarray
+        Steps with the engine on of each rocket, or -1 for constant thrust [-].
+    dt, gravity, launchAltitude, railExitAltitude, fastCoast, layerThickness
+        Settings shared by every rocket, see integrate_ascent.
+    altitudeStart, altitudeStep, pressures, densities, speedsOfSound, machStep, powerOffCoefficients,
+    powerOnCoefficients
+        Atmosphere and drag tables, see integrate_ascent.
+
+    Returns
+    -------
+    outputs : numpy.ndarray
+        integrate_ascent outputs, one row per output and one column per rocket.
+    """
+
+    outputs = np.zeros((7, len(wetMass)))
+    for index in range(len(wetMass)):
+        results = integrate_ascent(
+            wetMass[index],
+            mDotTotal[index],
+            jetThrust[index],
+            exitArea[index],
+            exitPressure[index],
+            burnTime[index],
+            dragScale[index],
+            cumulativeImpulse[index],
+            cumulativeMass[index],
+            burnSteps[index],
+            dt,
+            gravity,
+            launchAltitude,
+            railExitAltitude,
+            fastCoast,
+            layerThickness,
+            altitudeStart,
+            altitudeStep,
+            pressures,
+            densities,
+            speedsOfSound,
+            machStep,
+            powerOffCoefficients,
+            powerOnCoefficients,
+        )
+        for output in range(7):
+            outputs[output, index] = results[output]
+
+    return outputs
+
+
+if numba is not None:
+    integrate_ascents = numba.njit(cache=True)(integrate_ascents)
+
+
+def calculate_trajectory_kernel_batch(
+    wetMass, mDotTotal, jetThrust, exitArea, exitPressure, burnTime, dragScale, curve=None
+):
+    """
+    Flies many rockets with integrate_ascents, using the loaded atmosphere and drag tables and constants.py.
+
+    Parameters
+    ----------
+    wetMass, mDotTotal, jetThrust, exitArea, exitPressure, burnTime : array_like
+        Rocket inputs, see calculate_trajectory_batch [kg], [kg/s], [N], [m^2], [Pa], [s].
+    dragScale : array_like
+        Drag area per unit drag coefficient of each rocket [m^2].
+    curve : list of numpy.ndarray, optional
+        Thrust curve shared by every rocket, from thrust_curve.load_thrust_curve. None for constant thrust.
+
+    Returns
+    -------
+    outputs : list of numpy.ndarray
+        integrate_ascent outputs of each rocket, with the apogee not yet corrected.
+    """
+
+    wetMass, mDotTotal, jetThrust, exitArea, exitPressure, burnTime, dragScale = np.broadcast_arrays(
+        *[
+            np.atleast_1d(np.asarray(value, dtype=float))
+            for value in (wetMass, mDotTotal, jetThrust, exitArea, exitPressure, burnTime, dragScale)
+        ]
+    )
+    if curve is None:
+        cumulativeImpulse = cumulativeMass = np.zeros((len(wetMass), 2))
+        burnSteps = np.full(len(wetMass), -1)
+    else:
+        [cumulativeImpulse, cumulativeMass, burnSteps] = thrust_curve.build_thrust_tables(
+            jetThrust, mDotTotal, burnTime, curve
+        )
+
+    rockets = [
+        np.ascontiguousarray(value)
+        for value in (wetMass, mDotTotal, jetThrust, exitArea, exitPressure, burnTime, dragScale)
+    ]  # broadcast inputs are views, the compiled loop takes contiguous arrays
+
+    return list(
+        integrate_ascents(
+            *rockets,
+            np.ascontiguousarray(cumulativeImpulse),
+            np.ascontiguousarray(cumulativeMass),
+            np.ascontiguousarray(burnSteps, dtype=np.int64),
+            *get_kernel_settings(),
+        )
+    )
+
+
+def get_kernel_settings():
+    """
+    Settings and tables shared by every kernel flight, in the order integrate_ascent takes them.
+
+    Returns
+    -------
+    settings : list
+        dt to powerOnCoefficients arguments of integrate_ascent.
+    """
+
+    return [
+        float(c.TRAJECTORY_TIME_STEP),
+        float(c.GRAVITY),
+        float(c.FAR_ALTITUDE),
+        float(c.FAR_ALTITUDE + c.RAIL_HEIGHT),
+        bool(c.TRAJECTORY_FAST_COAST),
+        float(c.COAST_LAYER_THICKNESS),
+        atmosphere.ALTITUDE_START,
+        atmosphere.ALTITUDE_STEP,
+        atmosphere.PRESSURES,
+        atmosphere.DENSITIES,
+        atmosphere.SPEEDS_OF_SOUND,
+        float(c.DRAG_MACH_STEP),
+        aerodynamics.POWER_OFF_COEFFICIENTS,
+        aerodynamics.POWER_ON_COEFFICIENTS,
+    ]
+
+
+def calculate_trajectory_kernel(
+    wetMass, mDotTotal, jetThrust, exitArea, exitPressure, burnTime, dragScale, curve=None
+):
+    """
+    Flies one rocket with integrate_ascent, using the loaded atmosphere and drag tables and constants.py.
+
+    Parameters
+    ----------
+    wetMass, mDotTotal, jetThrust, exitArea, exitPressure, burnTime : float
+        Rocket inputs, see calculate_trajectory [kg], [kg/s], [N], [m^2], [Pa], [s].
+    dragScale : float
+        Drag area per unit drag coefficient [m^2].
+    curve : list of numpy.ndarray, optional
+        Thrust curve from thrust_curve.load_thrust_curve. None for constant thrust.
+
+    Returns
+    -------
+    outputs : list
+        integrate_ascent outputs, with the apogee not yet corrected.
+    """
+
+    if curve is None:
+        cumulativeImpulse = cumulativeMass = np.zeros(2)
+        burnSteps = -1
+    else:
+        [cumulativeImpulse, cumulativeMass, burnSteps] = thrust_curve.build_thrust_tables(
+            jetThrust, mDotTotal, burnTime, curve
+        )
+        [cumulativeImpulse, cumulativeMass, burnSteps] = [cumulativeImpulse[0], cumulativeMass[0], int(burnSteps[0])]
+
+    return list(
+        integrate_ascent(
+            float(wetMass),
+            float(mDotTotal),
+            float(jetThrust),
+            float(exitArea),
+            float(exitPressure),
+            float(burnTime),
+            float(dragScale),
+            cumulativeImpulse,
+            cumulativeMass,
+            burnSteps,
+            *get_kernel_settings(),
+        )
+    )
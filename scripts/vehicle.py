@@ -5,6 +5,7 @@ import numpy as np
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 import constants as c
+from scripts import fluidsystems, propulsion, structures
 
 # Rocket 4 Mass Script
 # Owners: Nick Nielsen
@@ -88,6 +89,152 @@ def calculate_length(
     return [totalLength]
 
 
+# Rocket 4 Vehicle Sizing
+# Description: Sizes a pressure-fed rocket from fluid systems through structures, the propulsion and mass closure and
+# the total length, as main does for every rocket and apogee_sizing does for every trial design
+
+# Inputs:
+#   thrustToWeight: [1] thrust-to-weight ratio at launch
+#   oxidizer, fuel: propellant names
+#   mixRatio: [1] core oxidizer to fuel mass ratio
+#   chamberPressure, exitPressure: [Pa] chamber and nozzle exit pressures
+#   cstar, specificImpulse, expansionRatio, characteristicLength: [m/s], [s], [1], [m] run_CEA results
+#   copvPressure, copvVolume, copvMass, copvLength: [Pa], [m^3], [kg], [m] COPV, with the helium volume fluids sizing may use
+#   tankOD, tankThickness: [m] tank outer diameter and wall thickness
+#   finNumber, finHeight, finTipChord, finRootChord: [1], [m] fin count and geometry
+#   avionicsMass: [kg] mass of avionics
+# Outputs:
+#   fluidsystemsResults: fluidsystems.fluids_sizing outputs
+#   structuresResults: structures.calculate_structures outputs
+#   propulsionResults: propulsion.calculate_propulsion outputs of the converged vehicle
+#   massResults: calculate_mass outputs of the converged vehicle
+#   totalLength: [m] total length of the rocket
+
+
+def size_vehicle(
+    thrustToWeight,
+    oxidizer,
+    fuel,
+    mixRatio,
+    chamberPressure,
+    exitPressure,
+    cstar,
+    specificImpulse,
+    expansionRatio,
+    characteristicLength,
+    copvPressure,
+    copvVolume,
+    copvMass,
+    copvLength,
+    tankOD,
+    tankThickness,
+    finNumber,
+    finHeight,
+    finTipChord,
+    finRootChord,
+    avionicsMass,
+):
+    # Fluid Systems
+    fluidsystemsResults = fluidsystems.fluids_sizing(
+        oxidizer,
+        fuel,
+        mixRatio,
+        chamberPressure,
+        copvPressure,
+        copvVolume,
+        copvMass,
+        tankOD,
+        tankThickness,
+    )
+    [
+        fluidsystemsMass,
+        _,
+        _,
+        upperPlumbingLength,
+        totalTankLength,
+        lowerPlumbingLength,
+        _,
+        oxPropMass,
+        fuelPropMass,
+        *_,
+    ] = fluidsystemsResults
+
+    # Structures
+    structuresResults = structures.calculate_structures(
+        lowerPlumbingLength,
+        upperPlumbingLength,
+        copvLength,
+        tankOD,
+        finNumber,
+        finHeight,
+        finTipChord,
+        finRootChord,
+    )
+    [
+        lowerAirframeLength,
+        _,
+        upperAirframeLength,
+        _,
+        _,
+        _,
+        recoveryBayLength,
+        _,
+        noseconeLength,
+        _,
+        structuresMass,
+    ] = structuresResults
+
+    # Mass closure: propulsion is sized for the vehicle mass until the mass stops changing
+    vehicleMassEstimate = 300 * c.LB2KG  # [kg] Estimate of the vehicle mass
+    vehicleMass = -np.inf  # [kg] Initialize the vehicle mass
+    while abs(vehicleMassEstimate - vehicleMass) > c.CONVERGE_TOLERANCE:
+        vehicleMass = vehicleMassEstimate
+        propulsionResults = propulsion.calculate_propulsion(
+            thrustToWeight,
+            vehicleMass,
+            chamberPressure,
+            exitPressure,
+            cstar,
+            specificImpulse,
+            expansionRatio,
+            characteristicLength,
+            mixRatio,
+            oxPropMass,
+            fuelPropMass,
+            tankOD,
+        )
+        totalPropulsionMass = propulsionResults[13]  # [kg]
+
+        massResults = calculate_mass(
+            avionicsMass,
+            fluidsystemsMass,
+            oxPropMass,
+            fuelPropMass,
+            totalPropulsionMass,
+            structuresMass,
+        )
+        vehicleMassEstimate = massResults[1]  # [kg] wet mass
+
+    thrustChamberLength = propulsionResults[5]  # [m]
+    [totalLength] = calculate_length(
+        noseconeLength,
+        copvLength,
+        recoveryBayLength,
+        upperAirframeLength,
+        totalTankLength,
+        lowerAirframeLength,
+        thrustChamberLength,
+    )
+
+    return [
+        fluidsystemsResults,
+        structuresResults,
+        propulsionResults,
+        massResults,
+        totalLength,
+    ]
+
+
 def check_limits(
     maxThrustLim,
     minThrustLim,
@@ -0,0 +1,83 @@
+import sys
+import os
+import tempfile
+import numpy as np
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import constants as c
+from scripts import aerodynamics
+
+# Test Case Inputs
+machs = [0, 0.5, 0.9, 1.0, 1.2, 3.5, 6]  # [-]
+dragTable = (
+    "Mach,Alpha,CD,CD Power-Off,CD Power-On\n"
+    "0.01,0,0.45,0.45,0.40\n"
+    "0.01,2,0.50,0.50,0.45\n"
+    "0.80,0,0.42,0.42,0.37\n"
+    "1.00,0,0.65,0.65,0.58\n"
+    "1.20,0,0.60,0.60,0.53\n"
+    "3.00,0,0.35,0.35,0.30\n"
+)  # RASAero export layout
+
+# Run Test Case
+print(f"Default drag coefficients are", aerodynamics.get_drag_coefficient_array(machs, False))
+
+with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as file:
+    file.write(dragTable)
+powerOff, powerOn = aerodynamics.load_drag_table(file.name)
+os.remove(file.name)
+
+defaultTable = [
+    aerodynamics.POWER_OFF_COEFFICIENTS,
+    aerodynamics.POWER_ON_COEFFICIENTS,
+    aerodynamics.LAST_INDEX,
+]
+aerodynamics.POWER_OFF_COEFFICIENTS, aerodynamics.POWER_ON_COEFFICIENTS = powerOff, powerOn
+aerodynamics.LAST_INDEX = len(powerOff) - 1
+for mach in machs:
+    print(
+        f"Mach {mach}: power-off {aerodynamics.get_drag_coefficient(mach, False):.3f}, "
+        f"power-on {aerodynamics.get_drag_coefficient(mach, True):.3f}"
+    )
+
+# Scalar and vectorized lookups should agree with the table
+assert np.isclose(aerodynamics.get_drag_coefficient(1.0, False), 0.65)
+assert np.isclose(aerodynamics.get_drag_coefficient(6, True), 0.30)
+assert np.allclose(
+    aerodynamics.get_drag_coefficient_array(machs, True),
+    [aerodynamics.get_drag_coefficient(mach, True) for mach in machs],
+)
+print("Scalar and vectorized lookups agree")
+
+# Restore the default table for other tests run in the same session
+[
+    aerodynamics.POWER_OFF_COEFFICIENTS,
+    aerodynamics.POWER_ON_COEFFICIENTS,
+    aerodynamics.LAST_INDEX,
+] = defaultTable
+
+# Component buildup for a 5 m rocket with four trapezoidal fins
+dragModel = c.DRAG_MODEL
+c.DRAG_MODEL = "buildup"
+dragGeometry = aerodynamics.calculate_drag_geometry(0.168275, 4, 0.1, 5, 0.3, 0.1, 0.02)
+referenceArea = np.pi * 0.168275**2 / 4  # [m^2]
+altitude = 1000  # [m]
+density = 1.11  # [kg/m^3]
+speeds = np.array(machs) * 336  # [m/s]
+buildupCoefficients = [
+    aerodynamics.get_drag_area(mach, speed, altitude, density, False, dragGeometry) / referenceArea
+    for mach, speed in zip(machs, speeds)
+]
+print(f"Buildup power-off drag coefficients are", np.round(buildupCoefficients, 3))
+assert np.allclose(
+    aerodynamics.get_drag_area_array(machs, speeds, altitude, density, False, dragGeometry) / referenceArea,
+    buildupCoefficients,
+)
+# The nozzle exit fills part of the base while the engine burns
+assert aerodynamics.get_drag_area(0.5, 168, altitude, density, True, dragGeometry) < aerodynamics.get_drag_area(
+    0.5, 168, altitude, density, False, dragGeometry
+)
+print("Buildup scalar and vectorized lookups agree")
+c.DRAG_MODEL = dragModel
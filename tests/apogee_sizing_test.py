@@ -0,0 +1,86 @@
+import sys
+import os
+import numpy as np
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import constants as c
+from scripts import apogee_sizing
+
+# Test Case Inputs
+targetApogee = 16000 * c.FT2M  # [m]
+unreachableApogee = 100000 * c.FT2M  # [m] beyond the full propellant load
+thrustToWeight = 5  # [-]
+oxidizer = "oxygen"
+fuel = "ethanol"
+mixRatio = 1.5  # [-]
+chamberPressure = 300 * c.PSI2PA  # [Pa]
+exitPressure = 10 * c.PSI2PA  # [Pa]
+cstar = 1600  # [m/s]
+specificImpulse = 220  # [s]
+expansionRatio = 4  # [-]
+characteristicLength = 45 * c.IN2M  # [m]
+copvPressure = c.BZB_COPV_PRESSURE  # [Pa]
+copvVolume = c.BZB_COPV_VOLUME  # [m^3]
+copvMass = c.BZB_COPV_MASS  # [kg]
+copvLength = 0.6  # [m]
+tankOD = 8 * c.IN2M  # [m]
+tankThickness = 0.125 * c.IN2M  # [m]
+finNumber = 4  # [-]
+finHeight = 0.15  # [m]
+finTipChord = 0.1  # [m]
+finRootChord = 0.3  # [m]
+avionicsMass = 6 * c.LB2KG  # [kg]
+
+designInputs = [
+    oxidizer,
+    fuel,
+    mixRatio,
+    chamberPressure,
+    exitPressure,
+    cstar,
+    specificImpulse,
+    expansionRatio,
+    characteristicLength,
+    copvPressure,
+    copvVolume,
+    copvMass,
+    copvLength,
+    tankOD,
+    tankThickness,
+    finNumber,
+    finHeight,
+    finTipChord,
+    finRootChord,
+    avionicsMass,
+]
+
+# Run Test Case
+fullLoadApogee = apogee_sizing.calculate_design_apogee(1, thrustToWeight, *designInputs)
+print(f"Full load apogee is", fullLoadApogee * c.M2FT, "ft")
+
+for variable in ["propellant", "thrust"]:
+    [loadFraction, solvedThrustToWeight, apogee] = apogee_sizing.size_for_apogee(
+        targetApogee, variable, thrustToWeight, *designInputs
+    )
+    print(
+        f"Solving for {variable}: load fraction {loadFraction}, "
+        f"thrust-to-weight {solvedThrustToWeight}, apogee {apogee * c.M2FT} ft"
+    )
+
+    assert abs(apogee - targetApogee) / targetApogee < c.INVERSE_SIZING_TOLERANCE
+    assert c.INVERSE_MIN_LOAD_FRACTION <= loadFraction <= 1
+    if variable == "propellant":
+        assert solvedThrustToWeight == thrustToWeight
+    else:
+        assert loadFraction == 1
+        assert c.INVERSE_MIN_THRUST_TO_WEIGHT <= solvedThrustToWeight <= c.INVERSE_MAX_THRUST_TO_WEIGHT
+
+# An unreachable target gives NaN and the apogee of the closest bound, the full propellant load
+[loadFraction, solvedThrustToWeight, apogee] = apogee_sizing.size_for_apogee(
+    unreachableApogee, "propellant", thrustToWeight, *designInputs
+)
+print(f"Unreachable target: load fraction {loadFraction}, closest apogee {apogee * c.M2FT} ft")
+assert np.isnan(loadFraction) and np.isnan(solvedThrustToWeight)
+assert np.isclose(apogee, fullLoadApogee)
@@ -0,0 +1,33 @@
+import sys
+import os
+import numpy as np
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from scripts import atmosphere
+
+# Test Case Inputs
+altitudes = [-50, 0, 615.09, 5005, 81000, 90000]  # [m]
+
+# Run Test Case
+for altitude in altitudes:
+    [pressure, density, speedOfSound] = atmosphere.get_atmosphere(altitude)
+    print(
+        f"{altitude} m: {pressure:.2f} Pa, {density:.5f} kg/m^3, {speedOfSound:.2f} m/s"
+    )
+
+# Scalar and vectorized lookups should agree
+pressures, densities, speedsOfSound = atmosphere.get_atmosphere_array(altitudes)
+for i, altitude in enumerate(altitudes):
+    assert np.allclose(
+        atmosphere.get_atmosphere(altitude),
+        [pressures[i], densities[i], speedsOfSound[i]],
+    )
+print("Scalar and vectorized lookups agree")
+
+# Dynamic viscosity
+viscosities = atmosphere.get_viscosity_array(altitudes)
+for i, altitude in enumerate(altitudes):
+    print(f"{altitude} m: {viscosities[i]:.4e} Pa-s")
+    assert np.isclose(atmosphere.get_viscosity(altitude), viscosities[i])
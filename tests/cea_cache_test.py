@@ -0,0 +1,65 @@
+import sys
+import os
+import tempfile
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import constants as c
+from scripts import propulsion
+from utils import cea_cache
+
+# Test Case Inputs
+chamberPressure = 300 * c.PSI2PA  # [Pa]
+exitPressure = 10 * c.PSI2PA  # [Pa]
+fuel = "ethanol"
+mixRatio = 1.5  # [1]
+result = [1650.0, 245.0, 4.2]  # [m/s], [s], [1] stored result
+
+# Constants changed by this test, restored at the end so other tests see the configured values
+originalCacheFile = c.CEA_CACHE_FILE
+originalEfficiencyFactor = c.CEA_EFFICIENCY_FACTOR
+
+# Run Test Case on an empty cache
+try:
+    c.CEA_CACHE_FILE = os.path.join(tempfile.mkdtemp(), "cea_cache.sqlite")
+    key = propulsion.get_CEA_key(chamberPressure, exitPressure, fuel, mixRatio)
+    conditions = [(chamberPressure, exitPressure, fuel, mixRatio)] * 2 + [
+        (chamberPressure, exitPressure, "methane", mixRatio)
+    ]
+
+    print(f"Key:", key)
+    assert cea_cache.get_cea_result(c.CEA_CACHE_FILE, key) is None
+    assert len(propulsion.prefetch_CEA(conditions)) == 2
+
+    # Stored results survive a new process, simulated by clearing the in-memory layer
+    cea_cache.put_cea_results(c.CEA_CACHE_FILE, {key: result})
+    cea_cache.cacheMemory.clear()
+    missingConditions = propulsion.prefetch_CEA(conditions)
+    print(f"Missing Conditions:", missingConditions)
+    assert missingConditions == [conditions[2]]
+
+    # Another cache file does not see results held in memory for this one
+    otherCacheFile = os.path.join(tempfile.mkdtemp(), "cea_cache.sqlite")
+    assert cea_cache.get_cea_result(c.CEA_CACHE_FILE, key) == result
+    assert cea_cache.get_cea_result(otherCacheFile, key) is None
+
+    # run_CEA returns the cached result without solving the problem
+    [cstar, specificImpulse, expansionRatio, fuelTemp, oxTemp, characteristicLength] = propulsion.run_CEA(
+        chamberPressure, exitPressure, fuel, mixRatio
+    )
+    print(f"Cached CEA Result:", [cstar, specificImpulse, expansionRatio])
+    assert [cstar, specificImpulse, expansionRatio] == result
+
+    # A sweep solves each unique problem once and looks the repeats up
+    ceaResults = propulsion.run_CEA_sweep(conditions[:2] * 3)
+    print(f"Sweep Results:", ceaResults)
+    assert list(ceaResults) == [conditions[0]]
+    assert ceaResults[conditions[0]][:3] == result
+
+    # A different efficiency factor is a different problem
+    c.CEA_EFFICIENCY_FACTOR = 0.95
+    assert propulsion.get_CEA_key(chamberPressure, exitPressure, fuel, mixRatio) != key
+finally:
+    c.CEA_CACHE_FILE = originalCacheFile
+    c.CEA_EFFICIENCY_FACTOR = originalEfficiencyFactor
@@ -0,0 +1,90 @@
+import sys
+import os
+import numpy as np
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import constants as c
+from scripts import propulsion
+
+# Test Case Inputs
+fuel = "ethanol"
+problems = [
+    [20.0, np.array([1.3, 1.5]), np.array([25.0, 30.0, 35.0])],  # [bar], [1], [1]
+    [30.0, np.array([1.4]), np.array([40.0])],
+]
+
+# Deck with one problem per chamber pressure
+deck = propulsion.make_CEA_deck(fuel, problems)
+print(deck)
+assert deck.count("problem rocket") == len(problems)
+assert "o/f = 1.30000,1.50000" in deck
+assert "pip = 25.00000,30.00000,35.00000" in deck
+
+# Synthetic .plt file in the order CEA writes it: chamber, throat and exit rows for every mixture ratio
+pltLines = ["# " + propulsion.CEA_DECK_PLOT_KEYS]
+for chamberPressure, mixRatios, pressureRatios in problems:
+    for mixRatio in mixRatios:
+        pltLines.append(f"{chamberPressure} {mixRatio} 1 0 0 0")
+        pltLines.append(f"{chamberPressure / 1.8} {mixRatio} 1.8 1100 0.65 1")
+        for pressureRatio in pressureRatios:
+            exitVelocity = 2000 + 100 * mixRatio + pressureRatio  # [m/s]
+            pltLines.append(
+                f"{chamberPressure / pressureRatio} {mixRatio} {pressureRatio} {exitVelocity} 1.4 {pressureRatio / 6}"
+            )
+
+# Run Test Case
+results = propulsion.read_CEA_deck("\n".join(pltLines), problems)
+print(f"Deck Results:", results)
+
+assert len(results) == 7
+[cstar, specificImpulse, expansionRatio] = results[(20.0, 1.5, 30.0)]
+assert np.isclose(cstar, 2180 / 1.4 * c.CEA_EFFICIENCY_FACTOR)
+assert np.isclose(specificImpulse, 2180 / c.GRAVITY * c.CEA_EFFICIENCY_FACTOR**2)
+assert np.isclose(expansionRatio, 5)
+
+# Rows missing or out of order are rejected, so the points are solved one at a time instead
+for brokenLines in [pltLines[:-1], pltLines[:3] + pltLines[4:5] + pltLines[3:4] + pltLines[5:]]:
+    try:
+        propulsion.read_CEA_deck("\n".join(brokenLines), problems)
+    except RuntimeError as error:
+        print(f"Rejected:", error)
+    else:
+        raise AssertionError("broken deck output was accepted")
+
+# Sparse points are grouped so no point is solved that was not asked for
+sparseProblems = propulsion.make_CEA_deck_problems(
+    np.array([20.0, 20.0, 20.0, 30.0]), np.array([1.3, 1.5, 1.7, 1.3]), np.array([20.0, 30.0, 30.0, 20.0])
+)
+print(f"Sparse Problems:", sparseProblems)
+sparseLists = [[pressure, list(mixRatios), list(pressureRatios)] for pressure, mixRatios, pressureRatios in sparseProblems]
+assert sparseLists == [
+    [20.0, [1.3], [20.0]],
+    [20.0, [1.5, 1.7], [30.0]],
+    [30.0, [1.3], [20.0]],
+]
+
+# A full grid at one chamber pressure stays one problem
+[gridMixRatios, gridPressureRatios] = [grid.ravel() for grid in np.meshgrid([1.3, 1.5], [25.0, 30.0, 35.0])]
+assert len(propulsion.make_CEA_deck_problems(np.full(6, 20.0), gridMixRatios, gridPressureRatios)) == 1
+
+# A deck that cannot be run or read back falls back to solving the points one at a time
+originalCacheFile = c.CEA_CACHE_FILE
+originalRunDeck = propulsion.run_CEA_deck
+originalSolve = propulsion.solve_CEA
+conditions = [(20e5, 1e5, fuel, 1.3), (20e5, 1e5, fuel, 1.5)]
+try:
+    c.CEA_CACHE_FILE = None
+    propulsion.solve_CEA = lambda chamberPressure, exitPressure, fuel, mixRatio: [mixRatio, 0.0, 0.0]
+    for error in [RuntimeError("CEA failed"), ValueError("Delimiter not found"), FileNotFoundError("no CEA")]:
+
+        def failing_deck(*arguments, error=error):
+            raise error
+
+        propulsion.run_CEA_deck = failing_deck
+        assert propulsion.solve_CEA_batch(conditions) == [[1.3, 0.0, 0.0], [1.5, 0.0, 0.0]]
+finally:
+    c.CEA_CACHE_FILE = originalCacheFile
+    propulsion.run_CEA_deck = originalRunDeck
+    propulsion.solve_CEA = originalSolve
@@ -0,0 +1,111 @@
+import sys
+import os
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import constants as c
+from scripts import cea_table, propulsion
+
+# Test Case Inputs
+ceaTableFile = "new_cea.csv"
+fuel = "ethanol"
+chamberPressure = np.array([100, 255, 300, 490, 600]) * c.PSI2PA  # [Pa], the last one outside the table
+exitPressure = np.array([8, 9.5, 10, 11, 10]) * c.PSI2PA  # [Pa]
+mixRatio = np.array([1.3, 1.45, 1.5, 1.8, 1.5])  # [1]
+
+# Constants changed by this test, restored at the end so other tests see the configured values
+originalTables = cea_table.CEA_TABLES
+originalMethod = c.CEA_TABLE_METHOD
+originalEfficiencyFactor = c.CEA_EFFICIENCY_FACTOR
+
+try:
+    # Run Test Case
+    cea_table.CEA_TABLES = cea_table.load_cea_table(ceaTableFile, fuel)
+    [cstar, specificImpulse, expansionRatio, inTable] = cea_table.get_cea_table_array(
+        chamberPressure, exitPressure, fuel, mixRatio
+    )
+
+    print(f"C* [m/s]:", cstar)
+    print(f"Isp [s]:", specificImpulse)
+    print(f"Expansion Ratio [-]:", expansionRatio)
+    print(f"In Table:", inTable)
+
+    assert list(inTable) == [True, True, True, True, False]
+
+    # Grid points reproduce the table
+    table = pd.read_csv(ceaTableFile, header=None).to_numpy()
+    row = table[
+        np.isclose(table[:, 0], 300 * c.PSI2PA * c.PA2BAR)
+        & np.isclose(table[:, 1], 1.5)
+        & np.isclose(table[:, 2], 10 * c.PSI2PA * c.PA2BAR)
+    ][0]
+    assert np.allclose([cstar[2], specificImpulse[2], expansionRatio[2]], row[3:6])
+
+    # Tabulated fuels outside their grid and other fuels are left to live CEA
+    assert cea_table.get_cea_table(chamberPressure[4], exitPressure[4], fuel, mixRatio[4]) is None
+    assert cea_table.get_cea_table(chamberPressure[2], exitPressure[2], "methane", mixRatio[2]) is None
+
+    # run_CEA and the vectorized call agree inside the table
+    [arrayCstar, arraySpecificImpulse, arrayExpansionRatio] = propulsion.run_CEA_array(
+        chamberPressure[:4], exitPressure[:4], fuel, mixRatio[:4]
+    )
+    assert np.allclose(arrayCstar, cstar[:4])
+    assert propulsion.run_CEA(chamberPressure[1], exitPressure[1], fuel, mixRatio[1])[:3] == [
+        arrayCstar[1],
+        arraySpecificImpulse[1],
+        arrayExpansionRatio[1],
+    ]
+
+    # Cubic interpolation stays close to linear on this grid
+    c.CEA_TABLE_METHOD = "cubic"
+    cea_table.CEA_TABLES = cea_table.load_cea_table(ceaTableFile, fuel)
+    cubicSpecificImpulse = cea_table.get_cea_table_array(
+        chamberPressure, exitPressure, fuel, mixRatio
+    )[1]
+    print(f"Cubic Isp [s]:", cubicSpecificImpulse)
+    assert np.allclose(cubicSpecificImpulse[:4], specificImpulse[:4], rtol=1e-2)
+
+    # The same grid in an .npz table with a second fuel reproduces the CSV and loads without parsing
+    c.CEA_TABLE_METHOD = "linear"
+    c.CEA_EFFICIENCY_FACTOR = 0.9
+    [axes, values] = cea_table.read_cea_csv(ceaTableFile)
+    npzFolder = tempfile.TemporaryDirectory()
+    npzTableFile = os.path.join(npzFolder.name, "cea_tables.npz")
+    cea_table.write_cea_npz(
+        npzTableFile,
+        {"Ethanol": [axes, values], "jet-a": [axes, values * 1.1]},
+        {"generator": "cea_table_test"},
+        c.CEA_EFFICIENCY_FACTOR,
+    )
+    startTime = time.perf_counter()
+    cea_table.CEA_TABLES = cea_table.load_cea_table(npzTableFile, "unused")
+    print(f"NPZ Load Time [s]:", time.perf_counter() - startTime)
+    assert sorted(cea_table.CEA_TABLES) == ["ethanol", "jet-a"]
+
+    npzCstar = cea_table.get_cea_table_array(chamberPressure, exitPressure, fuel, mixRatio)[0]
+    assert np.allclose(npzCstar[:4], cstar[:4])
+    assert np.isclose(cea_table.get_cea_table(chamberPressure[2], exitPressure[2], "jet-a", mixRatio[2])[0], 1.1 * cstar[2])
+
+    header = cea_table.read_cea_npz(npzTableFile, c.CEA_EFFICIENCY_FACTOR)[1]
+    print(f"NPZ Header:", header)
+    assert header["units"]["chamberPressure"] == "Pa"
+    assert header["efficiencyFactor"] == 0.9
+
+    # A table built with another efficiency factor than the one in use is rejected
+    c.CEA_EFFICIENCY_FACTOR = 0.95
+    try:
+        cea_table.load_cea_table(npzTableFile, fuel)
+    except ValueError as error:
+        print(f"Rejected:", error)
+    else:
+        raise AssertionError("table with another efficiency factor was accepted")
+    npzFolder.cleanup()
+finally:
+    cea_table.CEA_TABLES = originalTables
+    c.CEA_TABLE_METHOD = originalMethod
+    c.CEA_EFFICIENCY_FACTOR = originalEfficiencyFactor
@@ -0,0 +1,184 @@
+import sys
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import constants as c
+from scripts import cea_table, propulsion
+from utils import make_cea_file
+
+# Test Case Inputs
+fuel = "ethanol"
+gridSpec = {
+    "Chamber Pressure (psi)": [100, 200, 50],
+    "O:F Ratio": [1.3, 1.5, 0.1],
+    "Exit Pressure (psi)": [8, 10, 1],
+}  # 27 points
+chunkSize = 10  # [1] 3 chunks
+solvedBatches = []  # Conditions of every batch the stub solved
+
+
+def solve_analytic_batch(conditions):
+    """
+    Stands in for CEA with a smooth function of the conditions, recording every call.
+    """
+
+    solvedBatches.append(conditions)
+    return [
+        [1000 + chamberPressure / 1e4 + 100 * mixRatio, 200 + mixRatio, chamberPressure / exitPressure]
+        for chamberPressure, exitPressure, _, mixRatio in conditions
+    ]
+
+
+# Constants changed by this test, restored at the end so other tests see the configured values
+originalOutputFolder = make_cea_file.OUTPUT_FOLDER
+originalChunkSize = make_cea_file.CHUNK_SIZE
+originalSolveBatch = propulsion.solve_CEA_batch
+originalEfficiencyFactor = c.CEA_EFFICIENCY_FACTOR
+outputFolder = tempfile.TemporaryDirectory()
+
+try:
+    make_cea_file.OUTPUT_FOLDER = outputFolder.name
+    make_cea_file.CHUNK_SIZE = chunkSize
+    propulsion.solve_CEA_batch = solve_analytic_batch
+
+    # Run Test Case: a fresh build solves every chunk once
+    tableFile = make_cea_file.build_cea_table(fuel, gridSpec, numberWorkers=1)
+    chunkFolder = make_cea_file.get_chunk_folder(fuel, gridSpec)
+    print(f"Table File:", tableFile)
+    print(f"Chunk Folder:", chunkFolder)
+    assert len(solvedBatches) == 3
+    assert sorted(os.listdir(chunkFolder)) == [f"chunk_{index:06d}.csv" for index in range(3)]
+
+    # The chunks are joined in grid order, exit pressure varying fastest
+    table = pd.read_csv(tableFile, header=None).to_numpy()
+    points = make_cea_file.make_grid_points(make_cea_file.make_grid_axes(gridSpec))
+    assert np.allclose(table[:, 0], points[:, 0] * c.PA2BAR)
+    assert np.allclose(table[:, 1], points[:, 1])
+    assert np.allclose(table[:, 2], points[:, 2] * c.PA2BAR)
+    assert np.allclose(table[:, 5], points[:, 0] / points[:, 2])
+
+    # A restart only solves the chunks that are missing
+    os.remove(os.path.join(chunkFolder, "chunk_000001.csv"))
+    solvedBatches.clear()
+    make_cea_file.build_cea_table(fuel, gridSpec, numberWorkers=1)
+    assert len(solvedBatches) == 1
+    assert len(solvedBatches[0]) == chunkSize
+    assert np.array_equal(pd.read_csv(tableFile, header=None).to_numpy(), table)
+
+    # A finished build solves nothing
+    solvedBatches.clear()
+    make_cea_file.build_cea_table(fuel, gridSpec, numberWorkers=1)
+    assert len(solvedBatches) == 0
+
+    # Another grid or CEA setup gets its own chunk folder
+    otherGridSpec = {**gridSpec, "Exit Pressure (psi)": [8, 11, 1]}
+    assert make_cea_file.get_chunk_folder(fuel, otherGridSpec) != chunkFolder
+    c.CEA_EFFICIENCY_FACTOR = 0.95
+    assert make_cea_file.get_chunk_folder(fuel, gridSpec) != chunkFolder
+finally:
+    make_cea_file.OUTPUT_FOLDER = originalOutputFolder
+    make_cea_file.CHUNK_SIZE = originalChunkSize
+    propulsion.solve_CEA_batch = originalSolveBatch
+    c.CEA_EFFICIENCY_FACTOR = originalEfficiencyFactor
+    outputFolder.cleanup()
+
+
+def solve_curved_list(conditions, numberWorkers=1):
+    """
+    Stands in for CEA with a function curved only along chamber pressure, most strongly at low chamber pressure.
+    """
+
+    return [
+        [1500 + 2e8 / chamberPressure, 200 + 10 * mixRatio, chamberPressure / 1e6 + 10 * mixRatio]
+        for chamberPressure, exitPressure, _, mixRatio in conditions
+    ]
+
+
+def get_midpoint_errors(axes, fineAxes, axis):
+    """
+    Relative error of linear interpolation at the full grid point in the middle of every interval of a table axis
+    that can still be split, largest over the other axes and the outputs.
+    """
+
+    indices = np.searchsorted(fineAxes[axis].round(9), axes[axis].round(9))
+    intervals = np.flatnonzero(np.diff(indices) >= 2)
+    errors = []
+    for interval in intervals:
+        [lower, upper] = axes[axis][interval : interval + 2]
+        middle = fineAxes[axis][(indices[interval] + indices[interval + 1]) // 2]
+        points = make_cea_file.make_grid_points([[middle] if index == axis else axes[index] for index in range(3)])
+        [lowerPoints, upperPoints] = [points.copy(), points.copy()]
+        lowerPoints[:, axis] = lower
+        upperPoints[:, axis] = upper
+        [values, lowerValues, upperValues] = [
+            np.array(solve_curved_list([(pc, pe, fuel, mr) for pc, mr, pe in axisPoints]))
+            for axisPoints in [points, lowerPoints, upperPoints]
+        ]
+        weight = (middle - lower) / (upper - lower)
+        errors.append(np.max(np.abs((1 - weight) * lowerValues + weight * upperValues - values) / values))
+
+    return np.array(errors)
+
+
+originalSolveList = propulsion.solve_CEA_list
+outputFolder = tempfile.TemporaryDirectory()
+tolerance = 1e-3  # [1]
+
+try:
+    make_cea_file.OUTPUT_FOLDER = outputFolder.name
+    propulsion.solve_CEA_list = solve_curved_list
+
+    # Run Test Case: adaptive build of the ethanol grid
+    adaptiveTableFile = make_cea_file.build_adaptive_cea_table(
+        fuel, make_cea_file.GRID_SPECS[fuel], tolerance=tolerance, numberWorkers=1
+    )
+    [axes, values] = cea_table.read_cea_csv(adaptiveTableFile)
+    fineAxes = make_cea_file.make_grid_axes(make_cea_file.GRID_SPECS[fuel])
+    print(f"Adaptive Axis Points:", [len(axis) for axis in axes], "of", [len(axis) for axis in fineAxes])
+
+    # Nodes are only added along the curved axis, densest where it curves most
+    assert len(axes[0]) < len(fineAxes[0])
+    assert [len(axes[1]), len(axes[2])] == [make_cea_file.ADAPTIVE_START_POINTS] * 2
+    assert np.diff(axes[0])[0] < np.diff(axes[0])[-1]
+
+    # Every interval that could still be split interpolates within the tolerance
+    chamberPressureErrors = get_midpoint_errors(axes, fineAxes, 0)
+    print(f"Largest Midpoint Error:", chamberPressureErrors.max())
+    assert np.all(chamberPressureErrors <= tolerance)
+    assert np.all(get_midpoint_errors(axes, fineAxes, 1) <= tolerance)
+
+    # The table round-trips through cea_table and reproduces the solved values at its nodes
+    interpolator = cea_table.load_cea_table(adaptiveTableFile, fuel)[fuel]
+    nodes = make_cea_file.make_grid_points(axes)
+    nodeValues = np.array(solve_curved_list([(pc, pe, fuel, mr) for pc, mr, pe in nodes]))
+    assert np.allclose(interpolator(nodes), nodeValues, rtol=1e-12)
+
+    # The npz header records the axes as built, not the grid spec
+    npzTableFile = make_cea_file.write_cea_tables({fuel: adaptiveTableFile}, 0.9)
+    header = cea_table.read_cea_npz(npzTableFile, 0.9)[1]
+    assert np.allclose(header["grids"][fuel]["chamberPressure"], axes[0])
+
+    # Building another fuel later keeps the fuels already in the table
+    make_cea_file.write_cea_tables({"jet-a": adaptiveTableFile}, 0.9)
+    [grids, header] = cea_table.read_cea_npz(npzTableFile, 0.9)
+    print(f"Merged Fuels:", header["fuels"])
+    assert header["fuels"] == [fuel, "jet-a"]
+    assert sorted(header["propellants"]) == sorted(header["grids"]) == [fuel, "jet-a"]
+    assert np.array_equal(grids[fuel][1], values)
+
+    # Tables of another efficiency factor are not merged
+    try:
+        make_cea_file.write_cea_tables({"methane": adaptiveTableFile}, 0.95)
+    except ValueError as error:
+        print(f"Rejected:", error)
+    else:
+        raise AssertionError("tables of different efficiency factors were merged")
+finally:
+    make_cea_file.OUTPUT_FOLDER = originalOutputFolder
+    propulsion.solve_CEA_list = originalSolveList
+    outputFolder.cleanup()
@@ -0,0 +1,32 @@
+import sys
+import os
+import numpy as np
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import constants as c
+from scripts import recovery
+
+# Test Case Inputs
+apogee = [30000 * c.FT2M, 15000 * c.FT2M, c.FAR_ALTITUDE + 1000 * c.FT2M]  # [m]
+dryMass = [40, 35, 30]  # [kg]
+windSpeed = 5  # [m/s]
+
+# Run Test Case
+[
+    landingVelocity,
+    mainDeployVelocity,
+    descentTime,
+    driftRadius,
+] = recovery.calculate_descent_batch(apogee, dryMass, windSpeed=windSpeed)
+
+print(f"Landing Velocity [ft/s]:", landingVelocity * c.M2FT)
+print(f"Main Deploy Velocity [ft/s]:", mainDeployVelocity * c.M2FT)
+print(f"Descent Time [s]:", descentTime)
+print(f"Drift Radius [ft]:", driftRadius * c.M2FT)
+
+# Under constant wind the drift is the wind speed times the descent time
+assert np.allclose(driftRadius, windSpeed * descentTime) or c.WIND_SHEAR_EXPONENT != 0
+# A rocket whose apogee is below the main deployment height opens the main at apogee
+assert mainDeployVelocity[2] == 0
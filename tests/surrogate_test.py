@@ -0,0 +1,35 @@
+import sys
+import os
+import numpy as np
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from scripts import surrogate
+
+# Test Case Inputs
+rng = np.random.default_rng(0)
+inputs = rng.uniform(1, 10, (100, 3))  # [-]
+outputs = np.column_stack(
+    [inputs[:, 0] ** 2 * inputs[:, 1] / inputs[:, 2], np.sqrt(inputs[:, 0])]
+)  # [-] Power laws are exactly linear in log space
+
+# Run Test Case
+fit = surrogate.fit_surrogate(inputs, outputs)
+predictions, uncertainties, inBounds = surrogate.predict_surrogate(
+    fit, [[5, 5, 5], [20, 5, 5]]
+)
+print(f"Quadratic terms used: ", fit["quadratic"])
+print(f"Predictions are", predictions)
+print(f"Relative uncertainties are", uncertainties)
+print(f"Inside training bounds", inBounds)
+
+assert np.allclose(predictions[0], [25, np.sqrt(5)])
+assert list(inBounds) == [True, False]
+
+# Designs along a diagonal span the whole box, but a corner of the box is far from all of them
+diagonalInputs = np.column_stack([inputs[:, 0], inputs[:, 0] * rng.uniform(0.95, 1.05, 100)])  # [-]
+diagonalFit = surrogate.fit_surrogate(diagonalInputs, outputs[:, :1])
+[_, _, diagonalInBounds] = surrogate.predict_surrogate(diagonalFit, [[5, 5], [9, 1.1]])
+print(f"Inside training data along the diagonal", diagonalInBounds)
+assert list(diagonalInBounds) == [True, False]
@@ -0,0 +1,106 @@
+import sys
+import os
+import inspect
+import re
+import numpy as np
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import constants as c
+from scripts import aerodynamics, atmosphere, thrust_curve, trajectory, trajectory_kernel
+
+# Test Case Inputs
+rocket = [70, 3, 4000, 0.2, 4, 0.15, 0.004, 80000, 5, 6, 0.3, 0.1]  # calculate_trajectory inputs, see trajectory_test
+heavierRocket = [80, *rocket[1:]]
+lighterRocket = [60, *rocket[1:]]
+offGridRocket = [70.0042, *rocket[1:]]  # Wet mass between two cache key steps
+# Constants read by the flight modules that do not change a cached result: the key itself, the fin chord defaults
+# (cached rows always give the chords), the models that are not cached and the dispersions, which are flown outside
+# the cache
+keyConstants = [
+    "DISPERSION_DRAG_SIGMA",
+    "DISPERSION_ISP_SIGMA",
+    "DISPERSION_MASS_SIGMA",
+    "DISPERSION_PERCENTILES",
+    "DISPERSION_SAMPLES",
+    "DISPERSION_THRUST_SIGMA",
+    "FIN_ROOT_CHORD",
+    "FIN_TIP_CHORD",
+    "HISTORY_DECIMATION",
+    "TRAJECTORY_CACHE_AREA_TOLERANCE",
+    "TRAJECTORY_CACHE_GEOMETRY_TOLERANCE",
+    "TRAJECTORY_CACHE_MASS_FLOW_TOLERANCE",
+    "TRAJECTORY_CACHE_MASS_TOLERANCE",
+    "TRAJECTORY_CACHE_PRESSURE_TOLERANCE",
+    "TRAJECTORY_CACHE_SIZE",
+    "TRAJECTORY_CACHE_THRUST_TOLERANCE",
+    "TRAJECTORY_CACHE_TIME_TOLERANCE",
+    "TRAJECTORY_CALIBRATION_SAMPLES",
+    "TRAJECTORY_MODEL",
+    "TRAJECTORY_SURROGATE_SAMPLES",
+    "TRAJECTORY_SURROGATE_TOLERANCE",
+    "TRAJECTORY_SURROGATE_TRAINING_MODEL",
+]
+
+# Run Test Case: every constant the flight modules read is part of the cache key
+flightModules = [aerodynamics, atmosphere, thrust_curve, trajectory, trajectory_kernel]
+flightSource = "".join(inspect.getsource(module) for module in flightModules)
+readConstants = set(re.findall(r"\bc\.([A-Z][A-Z0-9_]*)", flightSource))
+missingSettings = readConstants - set(trajectory.TRAJECTORY_CACHE_SETTINGS) - set(keyConstants)
+print(f"Constants missing from TRAJECTORY_CACHE_SETTINGS:", sorted(missingSettings))
+assert not missingSettings
+
+# Constants changed by this test, restored at the end so other tests see the configured values
+originalCacheSize = c.TRAJECTORY_CACHE_SIZE
+originalTimeStep = c.TRAJECTORY_TIME_STEP
+
+try:
+    c.TRAJECTORY_CACHE_SIZE = 3
+    trajectory.clear_trajectory_cache()
+
+    # Run Test Case: a repeated rocket within one call is flown once
+    cachedResults = trajectory.calculate_trajectories([rocket, rocket], "euler")
+    print(f"Cache Info after first call:", trajectory.get_trajectory_cache_info())
+    assert trajectory.get_trajectory_cache_info() == [1, 1, 1]
+    assert np.array_equal(cachedResults[0][0], cachedResults[0][1])
+
+    # Cached outputs match a direct flight
+    directResults = trajectory.calculate_trajectory(*rocket[:10], 0, finRootChord=rocket[10], finTipChord=rocket[11])
+    print(f"Cached Results:", [result[0] for result in cachedResults])
+    print(f"Direct Results:", directResults)
+    assert np.allclose([result[0] for result in cachedResults], directResults, rtol=1e-9)
+
+    # A second call is served from the cache
+    trajectory.calculate_trajectories([rocket], "euler")
+    assert trajectory.get_trajectory_cache_info() == [2, 1, 1]
+
+    # Changing a setting that changes results is a miss, not a stale result
+    c.TRAJECTORY_TIME_STEP = originalTimeStep / 2
+    fineResults = trajectory.calculate_trajectories([rocket], "euler")
+    print(f"Cache Info after changing the time step:", trajectory.get_trajectory_cache_info())
+    assert trajectory.get_trajectory_cache_info() == [2, 2, 2]
+    assert fineResults[0][0] != cachedResults[0][0]
+    c.TRAJECTORY_TIME_STEP = originalTimeStep
+
+    # Past the cache size the least recently used trajectory is evicted
+    trajectory.calculate_trajectories([rocket], "euler")  # Hit, so the fine time step result is now the oldest
+    trajectory.calculate_trajectories([heavierRocket, lighterRocket], "euler")
+    print(f"Cache Info after eviction:", trajectory.get_trajectory_cache_info())
+    assert trajectory.get_trajectory_cache_info() == [3, 4, 3]
+    c.TRAJECTORY_TIME_STEP = originalTimeStep / 2
+    trajectory.calculate_trajectories([rocket], "euler")
+    assert trajectory.get_trajectory_cache_info() == [3, 5, 3]
+    c.TRAJECTORY_TIME_STEP = originalTimeStep
+
+    # A miss flies the rocket as given, not its quantized cache key
+    offGridResults = trajectory.calculate_trajectories([offGridRocket], "euler")
+    assert trajectory.get_trajectory_cache_info() == [3, 6, 3]
+    offGridDirectResults = trajectory.calculate_trajectory(
+        *offGridRocket[:10], 0, finRootChord=offGridRocket[10], finTipChord=offGridRocket[11]
+    )
+    assert np.array_equal([result[0] for result in offGridResults], offGridDirectResults)
+finally:
+    c.TRAJECTORY_CACHE_SIZE = originalCacheSize
+    c.TRAJECTORY_TIME_STEP = originalTimeStep
+    trajectory.clear_trajectory_cache()
@@ -0,0 +1,168 @@
+import sys
+import os
+import numpy as np
+
+# Add the parent directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import constants as c
+from scripts import trajectory, trajectory_kernel
+
+# Test Case Inputs
+wetMass = 70  # [kg]
+mDotTotal = 3  # [kg/s]
+jetThrust = 4000  # [N]
+tankOD = 0.2  # [m]
+finNumber = 4  # [-]
+finHeight = 0.15  # [m]
+exitArea = 0.004  # [m^2]
+exitPressure = 80000  # [Pa]
+burnTime = 5  # [s]
+totalLength = 6  # [m]
+finRootChord = 0.3  # [m]
+finTipChord = 0.1  # [m]
+
+referenceArea = np.pi * tankOD**2 / 4 + finNumber * finHeight * c.FIN_THICKNESS  # [m^2]
+dragScale = (totalLength / 6.35) * (tankOD / 0.203) * referenceArea  # [m^2]
+
+# Designs for the batch checks, spread around the rocket above
+scales = np.array([1.0, 0.8, 1.2, 0.9, 1.1])  # [1]
+designs = [
+    wetMass * scales,
+    mDotTotal * scales[::-1],
+    jetThrust * scales,
+    tankOD * scales[::-1],
+    np.full(5, finNumber),
+    finHeight * scales,
+    exitArea * scales,
+    exitPressure * scales[::-1],
+    burnTime * scales,
+    totalLength * scales,
+]
+designChords = {"finRootChord": np.full(5, finRootChord), "finTipChord": np.full(5, finTipChord)}
+designDragScales = (designs[9] / 6.35) * (designs[3] / 0.203) * (
+    np.pi * designs[3] ** 2 / 4 + designs[4] * designs[5] * c.FIN_THICKNESS
+)  # [m^2]
+blowdown = "blowdown"
+
+# Run Test Case
+print(f"Kernel compiled:", trajectory_kernel.KERNEL_AVAILABLE)
+if os.environ.get("REQUIRE_TRAJECTORY_KERNEL") == "1":
+    # Set by CI, which installs numba, so the compiled checks below cannot be skipped silently
+    assert trajectory_kernel.KERNEL_AVAILABLE
+useJit = c.TRAJECTORY_JIT
+useFastCoast = c.TRAJECTORY_FAST_COAST
+c.TRAJECTORY_JIT = False
+for fastCoast in [True, False]:
+    c.TRAJECTORY_FAST_COAST = fastCoast
+    pythonResults = trajectory.calculate_trajectory(
+        wetMass,
+        mDotTotal,
+        jetThrust,
+        tankOD,
+        finNumber,
+        finHeight,
+        exitArea,
+        exitPressure,
+        burnTime,
+        totalLength,
+        0,
+        finRootChord=finRootChord,
+        finTipChord=finTipChord,
+    )
+    kernelResults = trajectory_kernel.calculate_trajectory_kernel(
+        wetMass, mDotTotal, jetThrust, exitArea, exitPressure, burnTime, dragScale
+    )
+    kernelResults[0] *= c.APOGEE_CORRECTION_FACTOR
+
+    print(f"Fast coast {fastCoast} Python results:", pythonResults)
+    print(f"Fast coast {fastCoast} kernel results:", kernelResults)
+    assert np.allclose(kernelResults, pythonResults, rtol=1e-9, atol=0)
+
+    # calculate_trajectory through the compiled kernel, only when numba is installed
+    if trajectory_kernel.KERNEL_AVAILABLE:
+        c.TRAJECTORY_JIT = True
+        jitResults = trajectory.calculate_trajectory(
+            wetMass,
+            mDotTotal,
+            jetThrust,
+            tankOD,
+            finNumber,
+            finHeight,
+            exitArea,
+            exitPressure,
+            burnTime,
+            totalLength,
+            0,
+            finRootChord=finRootChord,
+            finTipChord=finTipChord,
+        )
+        c.TRAJECTORY_JIT = False
+        print(f"Fast coast {fastCoast} compiled results:", jitResults)
+        assert np.allclose(jitResults, pythonResults, rtol=1e-9, atol=0)
+    else:
+        print(f"Skipping the compiled kernel check: numba is not installed")
+
+    # Batch of rockets, with constant thrust and with a thrust curve
+    for thrustCurve in [None, blowdown]:
+        curve = trajectory.thrust_curve.load_thrust_curve(thrustCurve)
+        pythonBatch = np.array(trajectory.calculate_trajectory_batch(*designs, thrustCurve=thrustCurve, **designChords))
+        kernelBatch = np.array(
+            trajectory_kernel.calculate_trajectory_kernel_batch(
+                *[designs[index] for index in [0, 1, 2, 6, 7, 8]], designDragScales, curve
+            )
+        )
+        kernelBatch[0] *= c.APOGEE_CORRECTION_FACTOR
+        print(f"Fast coast {fastCoast} curve {thrustCurve} batch apogees:", pythonBatch[0], kernelBatch[0])
+        assert np.allclose(kernelBatch, pythonBatch, rtol=1e-9, atol=0)
+
+        # The scalar kernel follows the curve like calculate_trajectory
+        kernelCurveResults = trajectory_kernel.calculate_trajectory_kernel(
+            wetMass, mDotTotal, jetThrust, exitArea, exitPressure, burnTime, dragScale, curve
+        )
+        kernelCurveResults[0] *= c.APOGEE_CORRECTION_FACTOR
+        pythonCurveResults = trajectory.calculate_trajectory(
+            wetMass,
+            mDotTotal,
+            jetThrust,
+            tankOD,
+            finNumber,
+            finHeight,
+            exitArea,
+            exitPressure,
+            burnTime,
+            totalLength,
+            0,
+            thrustCurve=thrustCurve,
+            finRootChord=finRootChord,
+            finTipChord=finTipChord,
+        )
+        assert np.allclose(kernelCurveResults, pythonCurveResults, rtol=1e-9, atol=0)
+
+        # calculate_trajectory_batch, and so calculate_trajectories, through the compiled kernel
+        if trajectory_kernel.KERNEL_AVAILABLE:
+            c.TRAJECTORY_JIT = True
+            jitBatch = np.array(
+                trajectory.calculate_trajectory_batch(*designs, thrustCurve=thrustCurve, **designChords)
+            )
+            jitCurveResults = trajectory.calculate_trajectory(
+                wetMass,
+                mDotTotal,
+                jetThrust,
+                tankOD,
+                finNumber,
+                finHeight,
+                exitArea,
+                exitPressure,
+                burnTime,
+                totalLength,
+                0,
+                thrustCurve=thrustCurve,
+                finRootChord=finRootChord,
+                finTipChord=finTipChord,
+            )
+            c.TRAJECTORY_JIT = False
+            assert np.allclose(jitBatch, pythonBatch, rtol=1e-9, atol=0)
+            assert np.allclose(jitCurveResults, pythonCurveResults, rtol=1e-9, atol=0)
+c.TRAJECTORY_FAST_COAST = useFastCoast
+c.TRAJECTORY_JIT = useJit
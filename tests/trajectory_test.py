@@ -1,5 +1,6 @@
 import sys
 import os
+import numpy as np
 
 # Add the parent directory to sys.path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -11,25 +12,466 @@ wetMass = 74.69  # [kg]
 mDotTotal = 1.86  # [kg/s]
 jetThrust = 3792  # [N]
 tankOD = 0.168275  # [m]
-ascentDragCoeff = 0.48  # [-]
+finNumber = 4  # [-]
+finHeight = 0.1  # [m]
 exitArea = 0.02  # [m^2]
 exitPressure = 100000  # [Pa]
 burnTime = 13  # [s]
+totalLength = 5  # [m]
+finRootChord = 0.3  # [m]
+finTipChord = 0.1  # [m]
 plots = 0  # [-]
 
 
 # Run Test Case
-[altitude, maxAccel, exitVelo] = trajectory.calculate_trajectory(
+[
+    altitude,
+    maxAccel,
+    exitVelo,
+    exitAccel,
+    totalImpulse,
+    maxDynamicPressure,
+    maxMach,
+] = trajectory.calculate_trajectory(
     wetMass,
     mDotTotal,
     jetThrust,
     tankOD,
-    ascentDragCoeff,
+    finNumber,
+    finHeight,
     exitArea,
     exitPressure,
     burnTime,
+    totalLength,
     plots,
+    finRootChord=finRootChord,
+    finTipChord=finTipChord,
 )
 print(f"Max Altitude is: ", altitude)
 print(f"Maximum Acceleration is", maxAccel)
 print(f"Exit Velocity is", exitVelo)
+print(f"Exit Acceleration is", exitAccel)
+print(f"Total Impulse is", totalImpulse)
+print(f"Max Dynamic Pressure is", maxDynamicPressure)
+print(f"Max Mach is", maxMach)
+
+# Batched engine on random designs, reaching apogee on different steps, matches calculate_trajectory exactly
+rng = np.random.default_rng(0)
+numberDesigns = 40
+randomDesigns = np.column_stack(
+    [
+        rng.uniform(40, 120, numberDesigns),  # wetMass [kg]
+        rng.uniform(1, 5, numberDesigns),  # mDotTotal [kg/s]
+        rng.uniform(2000, 9000, numberDesigns),  # jetThrust [N]
+        rng.uniform(0.15, 0.25, numberDesigns),  # tankOD [m]
+        np.full(numberDesigns, 4),  # finNumber [-]
+        rng.uniform(0.1, 0.2, numberDesigns),  # finHeight [m]
+        rng.uniform(0.004, 0.02, numberDesigns),  # exitArea [m^2]
+        rng.uniform(6e4, 1e5, numberDesigns),  # exitPressure [Pa]
+        rng.uniform(4, 13, numberDesigns),  # burnTime [s]
+        rng.uniform(4, 7, numberDesigns),  # totalLength [m]
+        rng.uniform(0.25, 0.4, numberDesigns),  # finRootChord [m]
+        rng.uniform(0.08, 0.15, numberDesigns),  # finTipChord [m]
+    ]
+)
+
+
+def get_chords(designs):
+    """
+    Fin chord keywords of rows of calculate_trajectories inputs.
+    """
+
+    return {"finRootChord": designs[..., 10], "finTipChord": designs[..., 11]}
+
+
+batchResults = np.array(trajectory.calculate_trajectory_batch(*randomDesigns[:, :10].T, **get_chords(randomDesigns))).T
+scalarResults = np.array(
+    [trajectory.calculate_trajectory(*design[:10], 0, **get_chords(design)) for design in randomDesigns]
+)
+print(f"Random Design Apogees range over", np.ptp(scalarResults[:, 0]), "m")
+assert np.array_equal(batchResults, scalarResults)
+
+# Adaptive-step integrator on the same case
+adaptiveResults = trajectory.calculate_trajectory_adaptive(
+    wetMass,
+    mDotTotal,
+    jetThrust,
+    tankOD,
+    finNumber,
+    finHeight,
+    exitArea,
+    exitPressure,
+    burnTime,
+    totalLength,
+    plots,
+    finRootChord=finRootChord,
+    finTipChord=finTipChord,
+)
+print(f"Adaptive Max Altitude is: ", adaptiveResults[0])
+print(f"Adaptive Exit Velocity is", adaptiveResults[2])
+
+# The adaptive integrator converges to the Euler solution at a fine time step
+import constants as c
+
+timeStep = c.TRAJECTORY_TIME_STEP
+c.TRAJECTORY_TIME_STEP = 0.001
+fineEulerResults = trajectory.calculate_trajectory(
+    wetMass,
+    mDotTotal,
+    jetThrust,
+    tankOD,
+    finNumber,
+    finHeight,
+    exitArea,
+    exitPressure,
+    burnTime,
+    totalLength,
+    plots,
+    finRootChord=finRootChord,
+    finTipChord=finTipChord,
+)
+c.TRAJECTORY_TIME_STEP = timeStep
+assert np.allclose(adaptiveResults, fineEulerResults, rtol=1e-3)
+
+# Semi-analytic estimate on the same case
+estimateResults = trajectory.estimate_trajectory(
+    wetMass,
+    mDotTotal,
+    jetThrust,
+    tankOD,
+    finNumber,
+    finHeight,
+    exitArea,
+    exitPressure,
+    burnTime,
+    totalLength,
+    finRootChord=finRootChord,
+    finTipChord=finTipChord,
+)
+print(f"Estimated Max Altitude is: ", estimateResults[0])
+
+# Calibrated on half of the random designs, the estimate tracks the integrator on the other half within its
+# validity range of peak Mach numbers below 1.5
+calibrationDesigns = randomDesigns[: numberDesigns // 2]
+calibration = trajectory.calibrate_estimate(*calibrationDesigns[:, :10].T, **get_chords(calibrationDesigns))
+heldOut = np.arange(numberDesigns) >= numberDesigns // 2
+heldOut &= batchResults[:, 6] < 1.5
+calibratedResults = np.array(
+    trajectory.estimate_trajectory(
+        *randomDesigns[heldOut, :10].T, calibration=calibration, **get_chords(randomDesigns[heldOut])
+    )
+).T
+estimateErrors = np.abs(calibratedResults / batchResults[heldOut] - 1)
+print(f"Calibrated Estimate Median Errors:", np.median(estimateErrors, axis=0))
+print(f"Calibrated Estimate Max Errors:", estimateErrors.max(axis=0))
+assert heldOut.sum() >= 5
+assert np.median(estimateErrors[:, 0]) < 0.02
+assert estimateErrors[:, 0].max() < 0.05
+assert estimateErrors[:, 5].max() < 0.1
+assert estimateErrors[:, 6].max() < 0.1
+
+# Monte Carlo dispersion on the same case
+[altitudePercentiles, exitVeloPercentiles] = trajectory.calculate_dispersions(
+    [
+        [
+            wetMass,
+            mDotTotal,
+            jetThrust,
+            tankOD,
+            finNumber,
+            finHeight,
+            exitArea,
+            exitPressure,
+            burnTime,
+            totalLength,
+            finRootChord,
+            finTipChord,
+        ]
+    ],
+    seed=0,
+)
+print(f"Max Altitude Percentiles are", altitudePercentiles[0])
+print(f"Exit Velocity Percentiles are", exitVeloPercentiles[0])
+assert np.all(np.diff(altitudePercentiles[0]) >= 0) and np.all(np.diff(exitVeloPercentiles[0]) >= 0)
+
+# The same seed repeats the dispersion
+dispersionInputs = [randomDesigns[0], randomDesigns[1]]
+repeatedDispersions = [trajectory.calculate_dispersions(dispersionInputs, samples=50, seed=1) for _ in range(2)]
+assert all(np.array_equal(first, second) for first, second in zip(*repeatedDispersions))
+
+# Without errors every sample flies the nominal rocket
+# Constants changed by this test, restored at the end so other tests see the configured values
+dispersionSigmas = ["DISPERSION_THRUST_SIGMA", "DISPERSION_ISP_SIGMA", "DISPERSION_DRAG_SIGMA", "DISPERSION_MASS_SIGMA"]
+originalSigmas = [getattr(c, name) for name in dispersionSigmas]
+try:
+    for name in dispersionSigmas:
+        setattr(c, name, 0)
+    [nominalAltitudes, nominalExitVelos] = trajectory.calculate_dispersions(dispersionInputs, samples=5, seed=1)
+finally:
+    for name, sigma in zip(dispersionSigmas, originalSigmas):
+        setattr(c, name, sigma)
+assert np.allclose(nominalAltitudes, batchResults[:2, [0]], rtol=1e-9)
+assert np.allclose(nominalExitVelos, batchResults[:2, [2]], rtol=1e-9)
+
+# 2-D model on the same case with a tilted rail and wind
+trajectory2D = trajectory.calculate_trajectory_2d_batch(
+    wetMass,
+    mDotTotal,
+    jetThrust,
+    tankOD,
+    finNumber,
+    finHeight,
+    exitArea,
+    exitPressure,
+    burnTime,
+    totalLength,
+    railAngle=4 * np.pi / 180,
+    windSpeed=5,
+    finRootChord=finRootChord,
+    finTipChord=finTipChord,
+)
+print(f"2-D Max Altitude is: ", trajectory2D[0][0])
+print(f"2-D Downrange Distance is", trajectory2D[7][0])
+print(f"2-D Exit Velocity is", trajectory2D[2][0])
+
+# With a vertical rail and no wind the 2-D model reproduces the 1-D batch
+vertical2D = trajectory.calculate_trajectory_2d_batch(
+    wetMass,
+    mDotTotal,
+    jetThrust,
+    tankOD,
+    finNumber,
+    finHeight,
+    exitArea,
+    exitPressure,
+    burnTime,
+    totalLength,
+    railAngle=0,
+    windSpeed=0,
+    finRootChord=finRootChord,
+    finTipChord=finTipChord,
+)
+useFastCoast = c.TRAJECTORY_FAST_COAST
+c.TRAJECTORY_FAST_COAST = False  # The 2-D model always steps through the coast
+batch1D = trajectory.calculate_trajectory_batch(
+    wetMass,
+    mDotTotal,
+    jetThrust,
+    tankOD,
+    finNumber,
+    finHeight,
+    exitArea,
+    exitPressure,
+    burnTime,
+    totalLength,
+    finRootChord=finRootChord,
+    finTipChord=finTipChord,
+)
+c.TRAJECTORY_FAST_COAST = useFastCoast
+assert np.allclose(np.ravel(vertical2D[:7]), np.ravel(batch1D), rtol=1e-12)
+assert vertical2D[7][0] == 0
+
+# Closed-form coast against stepping through the coast
+import constants as c
+
+useFastCoast = c.TRAJECTORY_FAST_COAST
+c.TRAJECTORY_FAST_COAST = False
+steppedResults = trajectory.calculate_trajectory(
+    wetMass,
+    mDotTotal,
+    jetThrust,
+    tankOD,
+    finNumber,
+    finHeight,
+    exitArea,
+    exitPressure,
+    burnTime,
+    totalLength,
+    plots,
+    finRootChord=finRootChord,
+    finTipChord=finTipChord,
+)
+c.TRAJECTORY_FAST_COAST = True
+fastResults = trajectory.calculate_trajectory(
+    wetMass,
+    mDotTotal,
+    jetThrust,
+    tankOD,
+    finNumber,
+    finHeight,
+    exitArea,
+    exitPressure,
+    burnTime,
+    totalLength,
+    plots,
+    finRootChord=finRootChord,
+    finTipChord=finTipChord,
+)
+c.TRAJECTORY_FAST_COAST = useFastCoast
+print(f"Stepped Coast Max Altitude is: ", steppedResults[0])
+print(f"Fast Coast Max Altitude is: ", fastResults[0])
+
+# The coast only changes apogee and max Mach, within the stated tolerance
+assert np.allclose(fastResults[1:6], steppedResults[1:6], rtol=1e-12)
+for index in [0, 6]:
+    assert abs(fastResults[index] - steppedResults[index]) / steppedResults[index] < c.TRAJECTORY_FAST_COAST_TOLERANCE
+
+# The difference is the error of the stepped coast, so the two converge as the time step shrinks
+coastDifferences = []
+defaultTimeStep = c.TRAJECTORY_TIME_STEP
+for timeStep in [defaultTimeStep, defaultTimeStep / 10]:
+    coastResults = []
+    for fastCoast in [False, True]:
+        c.TRAJECTORY_TIME_STEP, c.TRAJECTORY_FAST_COAST = timeStep, fastCoast
+        coastResults.append(
+            trajectory.calculate_trajectory_batch(*randomDesigns[:, :10].T, **get_chords(randomDesigns))[0]
+        )
+    coastDifferences.append(np.max(np.abs(coastResults[1] / coastResults[0] - 1)))
+c.TRAJECTORY_TIME_STEP, c.TRAJECTORY_FAST_COAST = defaultTimeStep, useFastCoast
+print(f"Largest Fast Coast Apogee Differences:", coastDifferences)
+assert coastDifferences[0] < c.TRAJECTORY_FAST_COAST_TOLERANCE
+assert coastDifferences[1] < coastDifferences[0] / 4
+
+# Decimated history streamed to a memory-mapped file
+import tempfile
+from utils import history_file
+
+decimation = 10  # [1]
+with tempfile.TemporaryDirectory() as historyFolder:
+    historyName = os.path.join(historyFolder, "history.npy")
+    history = trajectory.allocate_history(
+        wetMass,
+        mDotTotal,
+        jetThrust,
+        exitArea,
+        exitPressure,
+        burnTime,
+        decimation=decimation,
+        fileName=historyName,
+    )
+    historyResults = trajectory.calculate_trajectory(
+        wetMass,
+        mDotTotal,
+        jetThrust,
+        tankOD,
+        finNumber,
+        finHeight,
+        exitArea,
+        exitPressure,
+        burnTime,
+        totalLength,
+        plots,
+        history,
+        finRootChord=finRootChord,
+        finTipChord=finTipChord,
+    )
+    savedHistory = history_file.load_history_file(historyName)
+    print(f"Recorded History Steps: ", savedHistory["steps"])
+    print(f"History Apogee is", savedHistory["altitude"].max())
+    print(f"History Plot saved to", history_file.plot_history_file(historyName))
+
+    # Every decimation-th step is recorded, plus the last step when it falls between them
+    steps = round(savedHistory["time"][-1] / c.TRAJECTORY_TIME_STEP)  # [1] integration steps of the flight
+    assert savedHistory["steps"] == int(np.ceil(steps / decimation)) + ((steps - 1) % decimation != 0)
+    assert savedHistory["decimation"] == decimation
+
+    # The history ends at the returned apogee before correction, within a step of its highest point
+    uncorrectedApogee = historyResults[0] / c.APOGEE_CORRECTION_FACTOR  # [m]
+    assert np.isclose(savedHistory["altitude"][-1], uncorrectedApogee, rtol=1e-12)
+    assert np.isclose(savedHistory["altitude"].max(), uncorrectedApogee, rtol=1e-3)
+    del savedHistory, history  # Release the memory maps before the folder is removed
+
+# Blowdown thrust curve
+from scripts import thrust_curve
+
+blowdownResults = trajectory.calculate_trajectory(
+    wetMass,
+    mDotTotal,
+    jetThrust,
+    tankOD,
+    finNumber,
+    finHeight,
+    exitArea,
+    exitPressure,
+    burnTime,
+    totalLength,
+    plots,
+    thrustCurve="blowdown",
+    finRootChord=finRootChord,
+    finTipChord=finTipChord,
+)
+print(f"Blowdown Max Altitude is: ", blowdownResults[0])
+print(f"Blowdown Total Impulse is: ", blowdownResults[4])
+
+# A constant curve reproduces constant thrust
+constantCurveResults = trajectory.calculate_trajectory(
+    wetMass,
+    mDotTotal,
+    jetThrust,
+    tankOD,
+    finNumber,
+    finHeight,
+    exitArea,
+    exitPressure,
+    burnTime,
+    totalLength,
+    plots,
+    thrustCurve=[[0, 1], [1, 1], [1, 1]],
+    finRootChord=finRootChord,
+    finTipChord=finTipChord,
+)
+assert np.allclose(
+    constantCurveResults,
+    [altitude, maxAccel, exitVelo, exitAccel, totalImpulse, maxDynamicPressure, maxMach],
+    rtol=1e-9,
+)
+
+# Without pressure thrust, the blowdown total impulse is the integral of the curve over the stretched burn
+jetOnlyResults = trajectory.calculate_trajectory(
+    wetMass,
+    mDotTotal,
+    jetThrust,
+    tankOD,
+    finNumber,
+    finHeight,
+    0,
+    exitPressure,
+    burnTime,
+    totalLength,
+    plots,
+    thrustCurve="blowdown",
+    finRootChord=finRootChord,
+    finTipChord=finTipChord,
+)
+blowdownCurve = thrust_curve.load_thrust_curve("blowdown")
+curveImpulse = (
+    jetThrust
+    * thrust_curve.calculate_burn_time(burnTime, blowdownCurve)
+    * np.trapezoid(blowdownCurve[1], blowdownCurve[0])
+)  # [Ns]
+print(f"Blowdown Curve Impulse is: ", curveImpulse)
+assert np.isclose(jetOnlyResults[4], curveImpulse, rtol=1e-9)
+
+# The 2-D model follows the curve like the 1-D batch, and the adaptive integrator converges to it
+blowdownInputs = [wetMass, mDotTotal, jetThrust, tankOD, finNumber, finHeight, exitArea, exitPressure, burnTime]
+blowdownInputs += [totalLength]
+blowdownChords = {"finRootChord": finRootChord, "finTipChord": finTipChord}
+useFastCoast = c.TRAJECTORY_FAST_COAST
+c.TRAJECTORY_FAST_COAST = False  # The 2-D model always steps through the coast
+blowdownBatch = trajectory.calculate_trajectory_batch(*blowdownInputs, thrustCurve="blowdown", **blowdownChords)
+blowdown2D = trajectory.calculate_trajectory_2d_batch(
+    *blowdownInputs, railAngle=0, windSpeed=0, thrustCurve="blowdown", **blowdownChords
+)
+assert np.allclose(np.ravel(blowdown2D[:7]), np.ravel(blowdownBatch), rtol=1e-12)
+
+c.TRAJECTORY_TIME_STEP = 0.001
+fineBlowdownResults = np.ravel(
+    trajectory.calculate_trajectory_batch(*blowdownInputs, thrustCurve="blowdown", **blowdownChords)
+)
+c.TRAJECTORY_TIME_STEP, c.TRAJECTORY_FAST_COAST = defaultTimeStep, useFastCoast
+adaptiveBlowdownResults = trajectory.calculate_trajectory_adaptive(
+    *blowdownInputs, plots, thrustCurve="blowdown", **blowdownChords
+)
+print(f"Adaptive Blowdown Max Altitude is: ", adaptiveBlowdownResults[0])
+assert np.allclose(adaptiveBlowdownResults, fineBlowdownResults, rtol=1e-3)
+assert adaptiveBlowdownResults[0] < adaptiveResults[0]
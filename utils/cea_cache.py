@@ -0,0 +1,185 @@
+import os
+import sqlite3
+import threading
+
+CEA_CACHE_VERSION = 1  # Bump when the CEA problem setup or the stored outputs change, so old entries are not reused
+CHUNK_SIZE = 500  # Keys per query, below SQLite's limit on bound parameters
+
+cacheMemory = {}  # Results already read or written by this process, by key, for each cache file by absolute path
+cacheConnections = threading.local()  # One connection per thread, SQLite connections are not shared across threads
+
+
+def make_cea_key(
+    fuel,
+    oxidizer,
+    chamberPressure,
+    exitPressure,
+    mixRatio,
+    fuelTemp,
+    oxTemp,
+    efficiencyFactor,
+):
+    """
+    Builds the versioned cache key of a CEA problem. Floats are written with 10 significant digits so values that
+    went through unit conversions still match.
+
+    Parameters
+    ----------
+    fuel : str
+        Fuel name as given to run_CEA.
+    oxidizer : str
+        Oxidizer name in CEA naming.
+    chamberPressure : float
+        Chamber pressure [Pa].
+    exitPressure : float
+        Nozzle exit pressure [Pa].
+    mixRatio : float
+        Oxidizer to fuel mass ratio [1].
+    fuelTemp : float
+        Fuel injection temperature [K].
+    oxTemp : float
+        Oxidizer injection temperature [K].
+    efficiencyFactor : float
+        Efficiency factor applied to the CEA outputs [1].
+
+    Returns
+    -------
+    key : str
+        Cache key.
+    """
+
+    values = [chamberPressure, exitPressure, mixRatio, fuelTemp, oxTemp, efficiencyFactor]
+    return "|".join(
+        [f"v{CEA_CACHE_VERSION}", fuel.lower(), oxidizer] + [f"{float(value):.10g}" for value in values]
+    )
+
+
+def connect_cea_cache(fileName):
+    """
+    Opens the cache database for the current thread, creating it if needed. The database uses write-ahead logging
+    and waits on locks, so several processes can read and write it at the same time.
+
+    Parameters
+    ----------
+    fileName : str
+        Path of the SQLite file.
+
+    Returns
+    -------
+    connection : sqlite3.Connection
+        Connection to the cache.
+    """
+
+    connections = getattr(cacheConnections, "connections", None)
+    if connections is None:
+        connections = cacheConnections.connections = {}
+    key = (os.getpid(), fileName)  # Connections must not be inherited by forked processes
+    if key not in connections:
+        os.makedirs(os.path.dirname(os.path.abspath(fileName)), exist_ok=True)
+        connection = sqlite3.connect(fileName, timeout=60)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS cea (key TEXT PRIMARY KEY, cstar REAL, isp REAL, ae REAL)"
+        )
+        connection.commit()
+        connections[key] = connection
+
+    return connections[key]
+
+
+def get_cache_memory(fileName):
+    """
+    In-memory results of one cache file, so results read from one database are never served for another.
+
+    Parameters
+    ----------
+    fileName : str
+        Path of the SQLite file.
+
+    Returns
+    -------
+    memory : dict
+        [cstar [m/s], specificImpulse [s], expansionRatio [-]] by key, for this file.
+    """
+
+    return cacheMemory.setdefault(os.path.abspath(fileName), {})
+
+
+def prefetch_cea_results(fileName, keys):
+    """
+    Reads the cached results of many keys at once into memory, so later lookups do not touch the database.
+
+    Parameters
+    ----------
+    fileName : str
+        Path of the SQLite file.
+    keys : iterable of str
+        Keys from make_cea_key.
+
+    Returns
+    -------
+    missingKeys : list of str
+        Unique keys that are not cached.
+    """
+
+    memory = get_cache_memory(fileName)
+    keys = [key for key in dict.fromkeys(keys) if key not in memory]
+    connection = connect_cea_cache(fileName)
+    for start in range(0, len(keys), CHUNK_SIZE):
+        chunk = keys[start : start + CHUNK_SIZE]
+        rows = connection.execute(
+            f"SELECT key, cstar, isp, ae FROM cea WHERE key IN ({','.join('?' * len(chunk))})",
+            chunk,
+        )
+        for key, *values in rows:
+            memory[key] = values
+
+    return [key for key in keys if key not in memory]
+
+
+def get_cea_result(fileName, key):
+    """
+    Looks up one CEA result, in memory first and then in the database.
+
+    Parameters
+    ----------
+    fileName : str
+        Path of the SQLite file.
+    key : str
+        Key from make_cea_key.
+
+    Returns
+    -------
+    result : list or None
+        [cstar [m/s], specificImpulse [s], expansionRatio [-]], or None if it is not cached.
+    """
+
+    memory = get_cache_memory(fileName)
+    if key not in memory:
+        prefetch_cea_results(fileName, [key])
+
+    return memory.get(key)
+
+
+def put_cea_results(fileName, results):
+    """
+    Stores CEA results in memory and in the database in a single transaction.
+
+    Parameters
+    ----------
+    fileName : str
+        Path of the SQLite file.
+    results : dict
+        [cstar [m/s], specificImpulse [s], expansionRatio [-]] by key from make_cea_key.
+    """
+
+    connection = connect_cea_cache(fileName)
+    with connection:
+        connection.executemany(
+            "INSERT OR REPLACE INTO cea (key, cstar, isp, ae) VALUES (?, ?, ?, ?)",
+            [(key, *map(float, values)) for key, values in results.items()],
+        )
+    get_cache_memory(fileName).update(
+        {key: [float(value) for value in values] for key, values in results.items()}
+    )
@@ -0,0 +1,128 @@
+import json
+import os
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+HISTORY_CHANNELS = [
+    "time",  # [s]
+    "altitude",  # [m]
+    "velocity",  # [m/s]
+    "acceleration",  # [m/s^2]
+    "thrust",  # [N]
+    "drag",  # [N]
+]
+
+
+def create_history_file(fileName, numberRows):
+    """
+    Creates a memory-mapped .npy file that a trajectory history streams into, one contiguous row per channel.
+    Pages are written back to disk by the OS as the flight runs, so long histories never have to fit in RAM.
+
+    Parameters
+    ----------
+    fileName : str
+        Path of the .npy file to create.
+    numberRows : int
+        Number of time steps the file can hold [-].
+
+    Returns
+    -------
+    history : dict
+        Memory-mapped buffer of each channel in HISTORY_CHANNELS, the underlying memmap under "file" and the
+        number of recorded steps under "steps".
+    """
+
+    buffers = np.lib.format.open_memmap(
+        fileName, mode="w+", dtype=np.float64, shape=(len(HISTORY_CHANNELS), numberRows)
+    )
+    history = {channel: buffers[i] for i, channel in enumerate(HISTORY_CHANNELS)}
+    history["file"] = buffers
+    history["steps"] = 0
+
+    return history
+
+
+def save_history_file(history):
+    """
+    Flushes a memory-mapped history to disk and records how many of its rows were used in a JSON sidecar.
+
+    Parameters
+    ----------
+    history : dict
+        History from create_history_file after a flight has been recorded into it.
+    """
+
+    buffers = history["file"]
+    buffers.flush()
+    with open(os.path.splitext(buffers.filename)[0] + ".json", "w") as file:
+        json.dump(
+            {
+                "channels": HISTORY_CHANNELS,
+                "steps": int(history["steps"]),
+                "decimation": int(history.get("decimation", 1)),
+            },
+            file,
+        )
+
+
+def load_history_file(fileName):
+    """
+    Opens a saved history lazily. Channels are read-only memory-mapped views, so only the parts that are used
+    are read from disk.
+
+    Parameters
+    ----------
+    fileName : str
+        Path of the .npy file.
+
+    Returns
+    -------
+    history : dict
+        Recorded steps of each channel in HISTORY_CHANNELS, plus "steps" and "decimation".
+    """
+
+    with open(os.path.splitext(fileName)[0] + ".json") as file:
+        metadata = json.load(file)
+
+    buffers = np.load(fileName, mmap_mode="r")
+    steps = metadata["steps"]
+    history = {
+        channel: buffers[i, :steps] for i, channel in enumerate(metadata["channels"])
+    }
+    history["steps"] = steps
+    history["decimation"] = metadata["decimation"]
+
+    return history
+
+
+def plot_history_file(fileName):
+    """
+    Plots every channel of a saved history against time into a PNG next to it.
+
+    Parameters
+    ----------
+    fileName : str
+        Path of the .npy file.
+
+    Returns
+    -------
+    plotName : str
+        Path of the PNG that was written.
+    """
+
+    history = load_history_file(fileName)
+    channels = [channel for channel in HISTORY_CHANNELS if channel != "time"]
+
+    fig, axes = plt.subplots(len(channels), 1, sharex=True, figsize=(8, 2.5 * len(channels)))
+    for ax, channel in zip(axes, channels):
+        ax.plot(history["time"], history[channel])
+        ax.set_ylabel(channel.capitalize())
+        ax.grid()
+    axes[-1].set_xlabel("Time [s]")
+
+    plotName = os.path.splitext(fileName)[0] + ".png"
+    fig.savefig(plotName)
+    plt.close(fig)
+
+    return plotName
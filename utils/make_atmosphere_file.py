@@ -14,11 +14,21 @@ with open(output_file, mode="w", newline="") as file:
         # Create an Atmosphere object for the current altitude
         atm = Atmosphere(altitude)
 
-        # Get the pressure and density at the current altitude
+        # Get the pressure, density, speed of sound and dynamic viscosity at the current altitude
         pressure = atm.pressure[0]
         density = atm.density[0]
+        speedOfSound = atm.speed_of_sound[0]
+        viscosity = atm.dynamic_viscosity[0]
 
-        # Write the altitude, pressure, and density to the CSV file in scientific notation
-        writer.writerow([f"{altitude:.18e}", f"{pressure:.18e}", f"{density:.18e}"])
+        # Write the altitude, pressure, density, speed of sound and viscosity to the CSV file in scientific notation
+        writer.writerow(
+            [
+                f"{altitude:.18e}",
+                f"{pressure:.18e}",
+                f"{density:.18e}",
+                f"{speedOfSound:.18e}",
+                f"{viscosity:.18e}",
+            ]
+        )
 
 print(f"Data successfully written to {output_file}")
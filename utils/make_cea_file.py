@@ -1,89 +1,416 @@
 import csv
-import numpy as np
-import CEA_Wrap as CEA
-import sys
+import hashlib
+import json
 import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
 from tqdm import tqdm  # Import tqdm for progress bars
 
 # Append parent directory to system path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 import constants as c
+from scripts import cea_table, propulsion
+
+OUTPUT_FOLDER = "data/cea_tables"  # Folder of the finished tables and their chunks, relative to the main folder
+TABLE_FILE = "cea_tables.npz"  # Table of every built fuel in OUTPUT_FOLDER, the one to point c.CEA_TABLE_FILE at
+GENERATOR_VERSION = 2  # Version of this builder, stored in the header of the tables it writes
+CHUNK_SIZE = 96  # [1] Grid points per chunk, the unit of work kept when a build is interrupted and solved as one CEA deck
+ADAPTIVE_START_POINTS = 3  # [1] Points along each axis of the coarse grid an adaptive build starts from
+ADAPTIVE_TOLERANCE = 1e-3  # [1] Largest relative interpolation error an adaptive build accepts at interval midpoints
+
+# Grid of each fuel as [first, last, step] along chamber pressure [psi], mixture ratio [1] and exit pressure [psi]
+GRID_SPECS = {
+    "ethanol": {
+        "Chamber Pressure (psi)": [100, 490, 10],
+        "O:F Ratio": [1.3, 1.8, 0.1],
+        "Exit Pressure (psi)": [8, 11, 1],
+    },
+    "methane": {
+        "Chamber Pressure (psi)": [100, 490, 10],
+        "O:F Ratio": [2.4, 3.6, 0.1],
+        "Exit Pressure (psi)": [8, 11, 1],
+    },
+    "jet-a": {
+        "Chamber Pressure (psi)": [100, 490, 10],
+        "O:F Ratio": [1.8, 2.8, 0.1],
+        "Exit Pressure (psi)": [8, 11, 1],
+    },
+}
+
+
+def make_grid_axes(gridSpec):
+    """
+    Expands a grid spec into its axes.
+
+    Parameters
+    ----------
+    gridSpec : dict
+        [first, last, step] of each axis, see GRID_SPECS.
+
+    Returns
+    -------
+    chamberPressures : numpy.ndarray
+        Chamber pressures of the grid [Pa].
+    mixRatios : numpy.ndarray
+        Mixture ratios of the grid [1].
+    exitPressures : numpy.ndarray
+        Exit pressures of the grid [Pa].
+    """
+
+    [chamberPressures, mixRatios, exitPressures] = [
+        np.round(np.arange(first, last + step / 2, step), 10)
+        for first, last, step in gridSpec.values()
+    ]
+
+    return [chamberPressures * c.PSI2PA, mixRatios, exitPressures * c.PSI2PA]
+
+
+def make_grid_points(axes):
+    """
+    Lists every point of a grid in table order, exit pressure varying fastest.
+
+    Parameters
+    ----------
+    axes : list of numpy.ndarray
+        Chamber pressures [Pa], mixture ratios [1] and exit pressures [Pa].
+
+    Returns
+    -------
+    points : numpy.ndarray
+        Chamber pressure [Pa], mixture ratio [1] and exit pressure [Pa] of each point, shape (points, 3).
+    """
+
+    return np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1).reshape(-1, 3)
+
+
+def get_chunk_folder(fuel, gridSpec):
+    """
+    Folder of the chunks of a build. It is named after a hash of everything that sets the results, so a restart only
+    reuses chunks of the same grid and CEA setup.
+
+    Parameters
+    ----------
+    fuel : str
+        Name of the fuel (e.g., "ethanol") [N/A].
+    gridSpec : dict
+        Grid spec of the fuel, see GRID_SPECS.
+
+    Returns
+    -------
+    chunkFolder : str
+        Path of the chunk folder.
+    """
+
+    setup = json.dumps(
+        [fuel.lower(), gridSpec, propulsion.get_propellant_settings(fuel), c.CEA_EFFICIENCY_FACTOR, CHUNK_SIZE]
+    )
+    digest = hashlib.sha1(setup.encode()).hexdigest()[:12]
+
+    return os.path.join(os.path.dirname(__file__), "..", OUTPUT_FOLDER, f"{fuel.lower()}_{digest}")
+
+
+def solve_chunk(fuel, points):
+    """
+    Solves the CEA problems of one chunk.
+
+    Parameters
+    ----------
+    fuel : str
+        Name of the fuel (e.g., "ethanol") [N/A].
+    points : numpy.ndarray
+        Chamber pressure [Pa], mixture ratio [1] and exit pressure [Pa] of each point.
+
+    Returns
+    -------
+    rows : list
+        Table rows of the points: chamber pressure [bar], mixture ratio [1], exit pressure [bar], cstar [m/s],
+        specific impulse [s] and expansion ratio [1].
+    """
+
+    conditions = [(chamberPressure, exitPressure, fuel, mixRatio) for chamberPressure, mixRatio, exitPressure in points]
+    results = propulsion.solve_CEA_batch(conditions)  # One multi-point CEA deck for the whole chunk
+
+    return [
+        [chamberPressure * c.PA2BAR, mixRatio, exitPressure * c.PA2BAR, *result]
+        for (chamberPressure, exitPressure, _, mixRatio), result in zip(conditions, results)
+    ]
+
+
+def write_rows(fileName, rows):
+    """
+    Writes table rows to a CSV file. The rows go to a temporary file that replaces fileName once complete, so an
+    interrupted write never leaves a partial file behind.
+
+    Parameters
+    ----------
+    fileName : str
+        Path of the CSV file.
+    rows : list
+        Table rows, see solve_chunk.
+    """
+
+    with open(fileName + ".tmp", mode="w", newline="") as file:
+        writer = csv.writer(file)
+        for row in rows:
+            writer.writerow([f"{value:.18e}" for value in row])
+    os.replace(fileName + ".tmp", fileName)
 
-EFFICIENCY_FACTOR = 0.9  # Efficiency factor for cstar and specific impulse
 
-# Constants
-FUEL_TEMP = c.T_AMBIENT  # [K] Fuel temperature
-FUEL_NAME = "C2H5OH(L)"  # Fuel name
-GASOLINE_NAME = "C8H18(L),n-octa"  # Gasoline name
+def build_cea_table(fuel, gridSpec, numberWorkers=None):
+    """
+    Builds the CEA table of a fuel. The grid is split into chunks that are solved on a process pool and written as
+    they finish. Chunks already on disk from an interrupted build are skipped.
 
-OX_TEMP = 90  # [K] Oxidizer temperature
-OX_NAME = "O2(L)"  # Oxidizer name
+    Parameters
+    ----------
+    fuel : str
+        Name of the fuel (e.g., "ethanol") [N/A].
+    gridSpec : dict
+        Grid spec of the fuel, see GRID_SPECS.
+    numberWorkers : int, optional
+        Number of worker processes. Defaults to the number of CPUs, 1 solves the chunks in this process.
 
-# Define the output CSV file
-output_file = "new_cea.csv"
+    Returns
+    -------
+    tableFile : str
+        Path of the finished table, in the format read by scripts/cea_table.py.
+    """
 
-# Open the file in write mode
-with open(output_file, mode="w", newline="") as file:
-    writer = csv.writer(file)
+    points = make_grid_points(make_grid_axes(gridSpec))
+    chunkFolder = get_chunk_folder(fuel, gridSpec)
+    os.makedirs(chunkFolder, exist_ok=True)
 
-    # Create arrays for chamber pressures, exit pressures, and mixture ratios
-    chamber_pressures = (
-        np.arange(100, 500, 10) * c.PSI2PA * c.PA2BAR
-    )  # Convert psi to Pa and then to Bar
-    exit_pressures = (
-        np.arange(8, 12, 1) * c.PSI2PA * c.PA2BAR
-    )  # Convert psi to Pa and then to Bar
-    mixture_ratios = np.arange(1.3, 1.9, 0.1)  # Mixture ratios from 1.2 to 2.5
+    chunks = [points[start : start + CHUNK_SIZE] for start in range(0, len(points), CHUNK_SIZE)]
+    chunkFiles = [os.path.join(chunkFolder, f"chunk_{index:06d}.csv") for index in range(len(chunks))]
+    remainingChunks = [
+        index for index, chunkFile in enumerate(chunkFiles) if not os.path.exists(chunkFile)
+    ]
+    remainingPoints = sum(len(chunks[index]) for index in remainingChunks)
 
-    # Initialize fuel, oxidizer, and water for the CEA calculations
-    ethanol = CEA.Fuel(FUEL_NAME, temp=FUEL_TEMP, wt_percent=98)
-    oxidizer = CEA.Oxidizer(OX_NAME, temp=OX_TEMP)
-    gasoline = CEA.Oxidizer(GASOLINE_NAME, temp=FUEL_TEMP, wt_percent=2)
+    with tqdm(
+        total=len(points),
+        initial=len(points) - remainingPoints,
+        desc=f"CEA Simulations ({fuel})",
+        unit="point",
+    ) as pbar:
+        if numberWorkers == 1:
+            for index in remainingChunks:
+                rows = solve_chunk(fuel, chunks[index])
+                write_rows(chunkFiles[index], rows)
+                pbar.update(len(rows))
+        else:
+            with ProcessPoolExecutor(max_workers=numberWorkers) as pool:
+                futures = {
+                    pool.submit(solve_chunk, fuel, chunks[index]): index for index in remainingChunks
+                }
+                for future in as_completed(futures):
+                    rows = future.result()
+                    write_rows(chunkFiles[futures[future]], rows)
+                    pbar.update(len(rows))
 
-    # Total number of iterations
-    total_iterations = (
-        len(chamber_pressures) * len(mixture_ratios) * len(exit_pressures)
+    # Join the chunks in grid order
+    rows = []
+    for chunkFile in chunkFiles:
+        with open(chunkFile, newline="") as file:
+            rows += [[float(value) for value in row] for row in csv.reader(file)]
+
+    tableFile = os.path.join(os.path.dirname(__file__), "..", OUTPUT_FOLDER, f"cea_{fuel.lower()}.csv")
+    write_rows(tableFile, rows)
+
+    return os.path.abspath(tableFile)
+
+
+def solve_points(fuel, points, results, numberWorkers=None):
+    """
+    Solves grid points not solved before, through the CEA cache and multi-point decks.
+
+    Parameters
+    ----------
+    fuel : str
+        Name of the fuel (e.g., "ethanol") [N/A].
+    points : numpy.ndarray
+        Chamber pressure [Pa], mixture ratio [1] and exit pressure [Pa] of each point.
+    results : dict
+        [cstar [m/s], specificImpulse [s], expansionRatio [1]] of the points solved so far, by point. Updated in place.
+    numberWorkers : int, optional
+        Number of worker processes. Defaults to the number of CPUs.
+
+    Returns
+    -------
+    values : numpy.ndarray
+        [cstar, specificImpulse, expansionRatio] of each point, shape (points, 3).
+    """
+
+    points = [tuple(point) for point in points]
+    missingPoints = [point for point in dict.fromkeys(points) if point not in results]
+    if len(missingPoints) > 0:
+        conditions = [
+            (chamberPressure, exitPressure, fuel, mixRatio)
+            for chamberPressure, mixRatio, exitPressure in missingPoints
+        ]
+        results.update(zip(missingPoints, propulsion.solve_CEA_list(conditions, numberWorkers)))
+
+    return np.array([results[point] for point in points])
+
+
+def build_adaptive_cea_table(fuel, gridSpec, tolerance=ADAPTIVE_TOLERANCE, numberWorkers=None):
+    """
+    Builds the CEA table of a fuel by refining a coarse grid where linear interpolation is not accurate enough.
+    Every pass solves the middle of each axis interval at every node of the other two axes and compares it with
+    linear interpolation between the interval's ends, which is what the table would give there. Intervals whose
+    largest relative error in cstar, specific impulse or expansion ratio exceeds the tolerance are split there. Nodes
+    are always points of the full grid of the spec, so refinement stops at its step. The table stays a rectilinear
+    grid with uneven spacing, as read by scripts/cea_table.py. Interrupted builds restart from the CEA cache.
+
+    Parameters
+    ----------
+    fuel : str
+        Name of the fuel (e.g., "ethanol") [N/A].
+    gridSpec : dict
+        Grid spec of the fuel, see GRID_SPECS. Its bounds are the table bounds and its steps the finest spacing.
+    tolerance : float, optional
+        Largest relative interpolation error accepted at interval midpoints [1]. Defaults to ADAPTIVE_TOLERANCE.
+    numberWorkers : int, optional
+        Number of worker processes. Defaults to the number of CPUs.
+
+    Returns
+    -------
+    tableFile : str
+        Path of the finished table, in the format read by scripts/cea_table.py.
+    """
+
+    fineAxes = make_grid_axes(gridSpec)
+    indices = [
+        np.unique(np.linspace(0, len(axis) - 1, ADAPTIVE_START_POINTS).round().astype(int))
+        for axis in fineAxes
+    ]  # Nodes of the table along each axis, as indices into the full grid
+    results = {}
+
+    while True:
+        axes = [fineAxis[index] for fineAxis, index in zip(fineAxes, indices)]
+        nodeValues = solve_points(fuel, make_grid_points(axes), results, numberWorkers)
+        nodeValues = nodeValues.reshape([len(axis) for axis in axes] + [3])
+
+        # Full grid points closest to the middle of every interval that can still be split, along each axis
+        splittable = [np.flatnonzero(np.diff(index) >= 2) for index in indices]
+        midpointIndices = [
+            (index[intervals] + index[intervals + 1]) // 2 for index, intervals in zip(indices, splittable)
+        ]
+        midpointGrids = []
+        for axis in range(3):
+            gridAxes = list(axes)
+            gridAxes[axis] = fineAxes[axis][midpointIndices[axis]]
+            midpointGrids.append(make_grid_points(gridAxes))
+        solve_points(fuel, np.concatenate(midpointGrids), results, numberWorkers)  # Every midpoint in one batch
+
+        newIndices = []
+        for axis in range(3):
+            intervals = splittable[axis]
+            if len(intervals) == 0:
+                newIndices.append(indices[axis])
+                continue
+
+            shape = [len(gridAxis) for gridAxis in axes]
+            shape[axis] = len(intervals)
+            midpointValues = solve_points(fuel, midpointGrids[axis], results).reshape(shape + [3])
+
+            # Linear interpolation between the ends of each interval, as the table would
+            weightShape = [1, 1, 1, 1]
+            weightShape[axis] = len(intervals)
+            weight = (
+                (fineAxes[axis][midpointIndices[axis]] - axes[axis][intervals])
+                / (axes[axis][intervals + 1] - axes[axis][intervals])
+            ).reshape(weightShape)
+            interpolatedValues = (1 - weight) * np.take(nodeValues, intervals, axis=axis) + weight * np.take(
+                nodeValues, intervals + 1, axis=axis
+            )
+
+            error = np.abs(interpolatedValues - midpointValues) / np.abs(midpointValues)
+            intervalError = np.moveaxis(error, axis, 0).reshape(len(intervals), -1).max(axis=1)
+            newIndices.append(np.union1d(indices[axis], midpointIndices[axis][intervalError > tolerance]))
+
+        if all(len(newIndex) == len(index) for newIndex, index in zip(newIndices, indices)):
+            break
+        indices = newIndices
+
+    points = make_grid_points(axes)
+    values = solve_points(fuel, points, results)
+    print(
+        f"{fuel}: {len(points)} table points from {len(results)} CEA points, "
+        f"against {len(make_grid_points(fineAxes))} for the full grid"
+    )
+
+    tableFile = os.path.join(os.path.dirname(__file__), "..", OUTPUT_FOLDER, f"cea_{fuel.lower()}.csv")
+    os.makedirs(os.path.dirname(tableFile), exist_ok=True)
+    write_rows(
+        tableFile,
+        [
+            [chamberPressure * c.PA2BAR, mixRatio, exitPressure * c.PA2BAR, *value]
+            for (chamberPressure, mixRatio, exitPressure), value in zip(points, values)
+        ],
     )
 
-    # Wrap the outermost loop in tqdm to show progress
-    with tqdm(total=total_iterations, desc="CEA Simulations", unit="step") as pbar:
-        for chamber_pressure in chamber_pressures:
-            for mixture_ratio in mixture_ratios:
-                for exit_pressure in exit_pressures:
-                    pressure_ratio = (
-                        chamber_pressure / exit_pressure
-                    )  # Calculate pressure ratio
-
-                    # Create the rocket problem instance
-                    rocket = CEA.RocketProblem(
-                        pressure=chamber_pressure,
-                        pip=pressure_ratio,
-                        materials=[ethanol, oxidizer, gasoline],
-                        o_f=mixture_ratio,
-                        filename="engineCEAoutput",
-                        pressure_units="bar",
-                    )
-
-                    # Run the simulation and retrieve data
-                    data = rocket.run()
-
-                    cstar = data.cstar * EFFICIENCY_FACTOR
-                    specific_impulse = data.isp * EFFICIENCY_FACTOR**2
-                    expansion_ratio = data.ae
-
-                    # Write results to CSV file
-                    writer.writerow(
-                        [
-                            f"{chamber_pressure:.18e}",
-                            f"{mixture_ratio:.18e}",
-                            f"{exit_pressure:.18e}",
-                            f"{cstar:.18e}",
-                            f"{specific_impulse:.18e}",
-                            f"{expansion_ratio:.18e}",
-                        ]
-                    )
-
-                    pbar.update(1)  # Update progress bar after each iteration
-
-print(f"Data successfully written to {output_file}")
+    return os.path.abspath(tableFile)
+
+
+def write_cea_tables(tableFiles, efficiencyFactor):
+    """
+    Gathers the CSV tables of several fuels into one .npz table, read by scripts/cea_table.py without parsing. Fuels
+    already in the table and not rebuilt are kept. The header records the axes of every grid as built, which for
+    adaptive tables are not those of the grid spec.
+
+    Parameters
+    ----------
+    tableFiles : dict
+        Path of the CSV table of each fuel, by fuel name.
+    efficiencyFactor : float
+        Efficiency factor the CSV tables were built with [1]. An existing table built with another one is not
+        merged, a ValueError is raised instead.
+
+    Returns
+    -------
+    tableFile : str
+        Path of the .npz table.
+    """
+
+    tableFile = os.path.join(os.path.dirname(__file__), "..", OUTPUT_FOLDER, TABLE_FILE)
+    grids = {}
+    header = {"propellants": {}, "grids": {}}
+    if os.path.exists(tableFile):
+        [grids, oldHeader] = cea_table.read_cea_npz(tableFile, efficiencyFactor)
+        header = {"propellants": oldHeader.get("propellants", {}), "grids": oldHeader.get("grids", {})}
+
+    for fuel, fileName in tableFiles.items():
+        [axes, values] = cea_table.read_cea_csv(fileName)
+        grids[fuel.lower()] = [axes, values]
+        header["propellants"][fuel.lower()] = propulsion.get_propellant_settings(fuel)
+        header["grids"][fuel.lower()] = {
+            name: axis.tolist() for name, axis in zip(cea_table.CEA_TABLE_AXES[1:], axes)
+        }
+    header["generator"] = "utils/make_cea_file.py"
+    header["generatorVersion"] = GENERATOR_VERSION
+
+    os.makedirs(os.path.dirname(tableFile), exist_ok=True)
+    cea_table.write_cea_npz(tableFile, grids, header, efficiencyFactor)
+
+    return os.path.abspath(tableFile)
+
+
+if __name__ == "__main__":
+    # Fuels to build, all of GRID_SPECS by default, with --adaptive to refine a coarse grid instead
+    adaptive = "--adaptive" in sys.argv[1:]
+    fuels = [argument for argument in sys.argv[1:] if argument != "--adaptive"] or list(GRID_SPECS)
+
+    tableFiles = {}
+    for fuel in fuels:
+        if adaptive:
+            tableFiles[fuel] = build_adaptive_cea_table(fuel, GRID_SPECS[fuel.lower()])
+        else:
+            tableFiles[fuel] = build_cea_table(fuel, GRID_SPECS[fuel.lower()])
+        print(f"Data successfully written to {tableFiles[fuel]}")
+
+    # Every fuel built in one indexed binary table, with the fuels built before
+    print(f"Data successfully written to {write_cea_tables(tableFiles, c.CEA_EFFICIENCY_FACTOR)}")